@@ -1,4 +1,5 @@
 import asyncio
+import io
 import json
 import os
 import uvicorn
@@ -25,13 +26,23 @@ from models.user import User
 
 from services.apis.model.speech_to_text import SpeechToTextChatService
 
-from start_utils import Base, engine, redis_session, peer_connection_store, websockets_store, trigger_event, websocket_router
+from constants.websocket_event import WebsocketEvent
+
+from errors.service_busy_error import ServiceBusyError
+
+from repositories.nosql.redis.conversation import ConversationRepository
+
+from start_utils import Base, cassandra_utility, cross_encoder_reranker, embeddings_function, engine, chat_context_builder, message_journal, message_writer, vector_store_cache, redis_connection_pool, redis_pubsub_session, peer_connection_store, websocket_registry, websocket_session_store, websocket_configuration, event_router, inference_scheduler, trigger_event
 
 from utilities.audio import AudioUtility
+from utilities.cache import CacheUtility
+from utilities.websocket_session import WebsocketSessionQueue
+from utilities.websocket_upload import WebsocketUploadBuffer
+from utilities.websockets import WebsocketUtility
 
-logger.debug("Updating websocket router")
-websocket_router.update(WebSocketMessageEventRouter)
-logger.debug("Updating websocket router")
+logger.debug("Binding websocket event router")
+event_router.bind(WebSocketMessageEventRouter)
+logger.debug("Bound websocket event router")
 
 logger.debug("Creating model schema")
 Base.metadata.create_all(engine)
@@ -41,6 +52,15 @@ logger.debug("Creating model schema")
 async def lifespan(app: FastAPI):
 
     logger.debug("Starting up the app...")
+    try:
+        await asyncio.get_running_loop().run_in_executor(None, cassandra_utility.connect)
+        await asyncio.get_running_loop().run_in_executor(None, message_writer.prepare)
+    except Exception as err:
+        logger.error(f"Cassandra is not reachable, messages are unavailable: {err}")
+    await message_journal.start()
+    if not await CacheUtility().ping():
+        logger.warning("Redis is not reachable, conversation state is unavailable until it recovers")
+    await websocket_registry.start()
 
     yield
 
@@ -48,6 +68,11 @@ async def lifespan(app: FastAPI):
     coros = [peer_connection.close() for key, peer_connection in peer_connection_store.items()]
     await asyncio.gather(*coros)
     peer_connection_store.clear()
+    await websocket_registry.stop()
+    await redis_pubsub_session.aclose()
+    await redis_connection_pool.disconnect()
+    await message_journal.stop()
+    cassandra_utility.shutdown()
 
 app = FastAPI(lifespan=lifespan)
 
@@ -97,145 +122,280 @@ app.include_router(UserRouter)
 app.include_router(APIRouter)
 logger.debug("Initialised routers")
 
+def build_message_event_name(data: dict) -> str:
+    """
+    Build the router event name for a websocket message event.
+    """
+    if data.get("type") == "audio":
+        return f'message/text/{data.get("task")}'
+
+    if data.get("chat_type") == "rag":
+        return f'message/{data.get("type")}/{data.get("chat_type")}/{data.get("task")}'
+
+    if data.get("type") == "image":
+        return "message/image/captioning"
+
+    return f'message/{data.get("type")}/{data.get("task")}'
+
+async def transcribe_audio_message_event(data: dict) -> dict:
+    """
+    Transcribe an audio message event and turn it into the equivalent text message event.
+    """
+    session_id: str = data.get("session_id")
+
+    if data.get("audio_buffer") is not None:
+
+        logger.debug("Converting audio buffer to wav")
+        audio_buffer: io.BytesIO = await AudioUtility(
+            urn=ulid()
+        ).convert_buffer_to_wav(
+            audio_buffer=data.get("audio_buffer")
+        )
+        logger.debug("Converted audio buffer to wav")
+
+        data.update(
+            {
+                "session_id": session_id,
+                "audio_buffer": audio_buffer
+            }
+        )
+
+    else:
+
+        file_name: str = data.get("file_name")
+        audio_base64: str = data.get("audio_base64")
+        audio_base64: str = audio_base64.split(",")[1]
+
+        logger.debug("Converting audio base64 to wav")
+        audio_file_path: str = await AudioUtility(
+            urn=ulid()
+        ).convert_base64_to_wav(
+            audio_base64=audio_base64,
+            filename=file_name
+        )
+        logger.debug("Converted audio base64 to wav")
+
+        data.update(
+            {
+                "session_id": session_id,
+                "audio_file_path": audio_file_path
+            }
+        )
+
+    logger.debug("Running Speech to Text Chat Service")
+    speech_to_text_chat_service = SpeechToTextChatService(
+        urn=ulid(),
+        priority=data.get("priority", 0)
+    )
+    speech_to_text_response_data: dict = await speech_to_text_chat_service.run(
+        data=data
+    )
+    logger.debug("Completed Speech to Text Chat Service")
+
+    prompt: str = speech_to_text_response_data.get("message")
+
+    if "image" in prompt.lower() or "images" in prompt.lower():
+        task = "image_generation"
+    else:
+        task = "text_generation"
+
+    data.update(
+        {
+            "task": task,
+            "text": prompt
+        }
+    )
+
+    return data
+
+def build_busy_event(data: dict, reason: str, message: str, backend: str = None, retry_after: float = None) -> dict:
+    """
+    Build the busy event sent when a message event is rejected by admission control.
+    """
+    return {
+        "event": WebsocketEvent.BUSY,
+        "reason": reason,
+        "text": message,
+        "backend": backend,
+        "retry_after": retry_after,
+        "chat_urn": data.get("chat_urn")
+    }
+
+def client_priority(data: dict) -> int:
+    """
+    Scheduler priority of a client's message event. Clients may lower their own
+    priority for background work, down to ``min_client_priority``, but never
+    raise it above the default 0; anything that is not an int counts as 0.
+    """
+    priority = data.get("priority", 0)
+    if isinstance(priority, bool) or not isinstance(priority, int):
+        return 0
+
+    return max(websocket_configuration.min_client_priority, min(0, priority))
+
+async def handle_message_event(data: dict) -> None:
+    """
+    Run a websocket message event. Executed by the session work queue workers.
+    """
+    try:
+
+        data["priority"] = client_priority(data=data)
+
+        if data.get("type") == "audio":
+            data = await transcribe_audio_message_event(data=data)
+
+        event_name: str = build_message_event_name(data=data)
+        logger.debug(f"Triggering websocket event for event: {event_name}")
+        await trigger_event(
+            event_name=event_name,
+            data=data
+        )
+        logger.debug(f"Triggered websocket event for event: {event_name}")
+
+    except ServiceBusyError as err:
+
+        logger.debug(f"Rejected websocket event, {err.backend} backend is busy")
+        await WebsocketUtility(urn=ulid()).send_json(
+            session_id=data.get("session_id"),
+            event_data=build_busy_event(
+                data=data,
+                reason=err.response_key,
+                message=err.response_message,
+                backend=err.backend,
+                retry_after=err.retry_after
+            )
+        )
+
+    except Exception as err:
+        logger.error(f"Failed websocket event: {err}")
+
 @app.websocket("/ws/{session_id}")
 async def websocket_endpoint(websocket: WebSocket, session_id: str):
 
     await websocket.accept()
     logger.debug(f"Accepted connect request from user with session id: {session_id}")
 
-    websockets_store[session_id] = websocket
-    logger.debug(websockets_store)
+    await websocket_registry.register(session_id=session_id, websocket=websocket)
+
+    websocket_utility = WebsocketUtility(urn=ulid())
+    session_queue = WebsocketSessionQueue(
+        urn=ulid(),
+        session_id=session_id,
+        handler=handle_message_event,
+        queue_size=websocket_configuration.queue_size,
+        workers=websocket_configuration.workers
+    )
+    session_queue.start()
+    websocket_session_store[session_id] = session_queue
+
+    async def submit_message_event(data: dict) -> None:
+
+        logger.debug(f"Queueing websocket message event for {session_id}")
+        if not session_queue.submit(data=data):
+
+            logger.debug(f"Rejected websocket message event for {session_id}")
+            await websocket_utility.send_json(
+                websocket=websocket,
+                event_data=build_busy_event(
+                    data=data,
+                    reason="error_session_queue_full",
+                    message="Too many pending messages, please wait for the current ones to finish."
+                )
+            )
+        logger.debug(f"Queued websocket message event for {session_id}")
+
+    async def reject_upload(reason: str) -> None:
+
+        logger.debug(f"Rejected websocket upload from {session_id}: {reason}")
+        await websocket_utility.send_json(
+            websocket=websocket,
+            event_data={
+                "event": WebsocketEvent.UPLOAD_REJECTED,
+                "reason": reason
+            }
+        )
+
+    upload: WebsocketUploadBuffer = None
 
     try:
 
         while True:
 
-            data = await websocket.receive_text()
+            frame: dict = await websocket.receive()
+            if frame.get("type") == "websocket.disconnect":
+                raise WebSocketDisconnect(code=frame.get("code", 1000))
+
+            if frame.get("bytes") is not None:
+
+                if upload is None:
+                    await reject_upload(reason="Binary frame received without an upload header.")
+                    continue
+
+                try:
+                    is_complete: bool = upload.feed(chunk=frame.get("bytes"))
+                except ValueError as err:
+                    upload = None
+                    await reject_upload(reason=str(err))
+                    continue
+
+                if is_complete:
+                    logger.debug(f"Received {upload.size} byte {upload.media_type} upload from {session_id}")
+                    await submit_message_event(data=upload.to_message_event())
+                    upload = None
+
+                continue
+
             logger.debug(f"Message received from {session_id}")
-            data = json.loads(data)
+            data = json.loads(frame.get("text"))
             data.update({
                 "session_id": session_id
             })
-            logger.debug(data)
             logger.debug(data.keys())
-            if data.get("event") == "message":
-
-                if data.get("chat_type") == "rag":
-
-                    try:
-
-                        event_name: str = f'message/{data.get("type")}/{data.get("chat_type")}/{data.get("task")}'
-                        logger.debug(f"Triggering websocket event for event:{event_name}")
-                        await trigger_event(
-                            event_name=event_name,
-                            data=data
-                        )
-                        logger.debug(f"Triggering websocket event for event:{event_name}")
-                    
-                    except Exception:
-                        logger.error(f"Failed websocket event")
-                
-                elif data.get("type") == "text":
-
-                    try:
-
-                        event_name: str = f'message/{data.get("type")}/{data.get("task")}'
-                        logger.debug(f"Triggering websocket event for event:{event_name}")
-                        await trigger_event(
-                            event_name=event_name,
-                            data=data
-                        )
-                        logger.debug(f"Triggering websocket event for event:{event_name}")
-                    
-                    except Exception:
-                        logger.error(f"Failed websocket event")
-                        
-                if data.get("type") == "image":
-
-                    try:
-
-                        event_name: str = f'message/{data.get("type")}/{"captioning"}'
-                        logger.debug(f"Triggering websocket event for event:{event_name}")
-                        await trigger_event(
-                            event_name=event_name,
-                            data=data
-                        )
-                        logger.debug(f"Triggering websocket event for event:{event_name}")
-                    
-                    except Exception:
-                        logger.error(f"Failed websocket event")
-
-                if data.get("type") == "audio":
-                        
-                    try:
-
-                        file_name: str = data.get("file_name")
-                        audio_base64: str = data.get("audio_base64")
-                        audio_base64: str = audio_base64.split(",")[1]
-
-                        logger.debug("Converting audio base64 to wav")
-                        audio_file_path: str = await AudioUtility(
-                            urn=ulid()
-                        ).convert_base64_to_wav(
-                            audio_base64=audio_base64,
-                            filename=file_name
-                        )
-                        logger.debug("Converted audio base64 to wav")
-
-                        logger.debug("Running Speech to Text Chat Service")
-                        speech_to_text_chat_service = SpeechToTextChatService(
-                            urn=ulid()
-                        )
-                        data.update(
-                            {
-                                "session_id": session_id,
-                                "audio_file_path": audio_file_path
-                            }
-                        )
-                        speech_to_text_response_data: dict = await speech_to_text_chat_service.run(
-                            data=data
-                        )
-                        logger.debug("Completed Speech to Text Chat Service")
-
-                        prompt: str = speech_to_text_response_data.get("message")
-
-                        if "image" in prompt.lower() or "images" in prompt.lower():
-                            task = "image_generation"
-                        else:
-                            task = "text_generation"
-
-                        data.update(
-                            {
-                                "task": task,
-                                "text": prompt
-                            }
-                        )
-
-                        event_name: str = f'message/{"text"}/{data.get("task")}'
-                        logger.debug(f"Triggering websocket event for event: {event_name}")
-                        await trigger_event(
-                            event_name=event_name,
-                            data=data
-                        )
-                        logger.debug(f"Triggering websocket event for event: {event_name}")
-
-                    except Exception:
-                        logger.error(f"Failed websocket event")
-            
-            elif data.get("event") == "acknowledgement":
+
+            if data.get("event") == WebsocketEvent.MESSAGE:
+
+                await submit_message_event(data=data)
+
+            elif data.get("event") == WebsocketEvent.UPLOAD:
+
+                try:
+                    upload = WebsocketUploadBuffer(
+                        urn=ulid(),
+                        header=data,
+                        max_upload_bytes=websocket_configuration.max_upload_bytes,
+                        max_chunk_bytes=websocket_configuration.max_chunk_bytes
+                    )
+                except ValueError as err:
+                    upload = None
+                    await reject_upload(reason=str(err))
+
+            elif data.get("event") == WebsocketEvent.ACKNOWLEDGEMENT:
 
                 logger.debug(f"Recieved acknowledegment from {session_id}: {data.get('text')}")
             
-            elif data.get("event") == "clear":
+            elif data.get("event") == WebsocketEvent.CLEAR:
 
                 try:
 
                     logger.debug("Clear session chat")
-                    redis_session.set(f"{session_id}_{data.get('chat_urn')}_{data.get('chat_type')}", json.dumps([]))
+                    await ConversationRepository(urn=session_id).delete(data.get("chat_urn"))
                     logger.debug("Cleared session chat")
                 
                 except Exception:
                     logger.error(f"Failed websocket event")
+
+            elif data.get("event") == WebsocketEvent.CANCEL:
+
+                logger.debug(f"Cancelling websocket message events for {session_id}")
+                cancelled: int = await session_queue.cancel_in_flight()
+                await websocket_utility.send_json(
+                    websocket=websocket,
+                    event_data={
+                        "event": WebsocketEvent.CANCELLED,
+                        "count": cancelled
+                    }
+                )
+                logger.debug(f"Cancelled websocket message events for {session_id}")
             
             else:
                 pass
@@ -243,7 +403,56 @@ async def websocket_endpoint(websocket: WebSocket, session_id: str):
     except WebSocketDisconnect:
 
         logger.debug(f"WebSocket disconnected for user {session_id}")
-        websockets_store.pop(session_id, None)
+
+    finally:
+
+        await websocket_registry.unregister(session_id=session_id, websocket=websocket)
+        if websocket_session_store.get(session_id) is session_queue:
+            websocket_session_store.pop(session_id, None)
+        await session_queue.close()
+
+@app.get("/metrics/websocket")
+async def websocket_metrics():
+
+    sessions: list = [session_queue.metrics() for session_queue in websocket_session_store.values()]
+
+    return {
+        "sessions": len(sessions),
+        "total_queue_depth": sum(metrics.get("queue_depth") for metrics in sessions),
+        "total_in_flight": sum(metrics.get("in_flight") for metrics in sessions),
+        "total_rejected": sum(metrics.get("rejected") for metrics in sessions),
+        "total_failed": sum(metrics.get("failed") for metrics in sessions)
+    }
+
+@app.get("/metrics/inference")
+async def inference_metrics():
+
+    return inference_scheduler.metrics()
+
+@app.get("/metrics/context")
+async def context_metrics():
+
+    return chat_context_builder.metrics()
+
+@app.get("/metrics/vector_store")
+async def vector_store_metrics():
+
+    return vector_store_cache.metrics()
+
+@app.get("/metrics/embeddings")
+async def embeddings_metrics():
+
+    return embeddings_function.metrics()
+
+@app.get("/metrics/rerank")
+async def rerank_metrics():
+
+    return cross_encoder_reranker.metrics()
+
+@app.get("/metrics/journal")
+async def journal_metrics():
+
+    return message_journal.metrics()
 
 class Offer(BaseModel):
     sdp: str
@@ -33,5 +33,12 @@ class CacheConfiguration:
         return CacheConfigurationDTO(
             host=self.config.get("host", "redis"),
             port=self.config.get("port", 6379),
-            password=self.config.get("password", None)
+            password=self.config.get("password", None),
+            max_connections=self.config.get("max_connections", 64),
+            pool_timeout_seconds=self.config.get("pool_timeout_seconds", 5),
+            socket_timeout_seconds=self.config.get("socket_timeout_seconds", 5),
+            health_check_interval_seconds=self.config.get("health_check_interval_seconds", 30),
+            conversation_max_messages=self.config.get("conversation_max_messages", 500),
+            conversation_window_messages=self.config.get("conversation_window_messages", 100),
+            conversation_ttl_seconds=self.config.get("conversation_ttl_seconds", 604800)
         )
\ No newline at end of file
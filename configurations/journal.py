@@ -0,0 +1,44 @@
+import json
+#
+from dtos.configurations.journal import JournalConfigurationDTO
+#
+from start_utils import logger
+
+
+class JournalConfiguration:
+    _instance = None
+
+    def __new__(cls):
+
+        if cls._instance is None:
+            cls._instance = super(JournalConfiguration, cls).__new__(cls)
+            cls._instance.config = {}
+            cls._instance.load_config()
+        return cls._instance
+
+    def load_config(self):
+
+        try:
+
+            with open('configs/journal/config.json', 'r') as file:
+                self.config = json.load(file)
+
+        except FileNotFoundError:
+            logger.debug('Config file not found.')
+
+        except json.JSONDecodeError:
+            logger.debug('Error decoding config file.')
+
+    def get_config(self):
+        return JournalConfigurationDTO(
+            write_behind=self.config.get("write_behind", True),
+            directory=self.config.get("directory", "journal"),
+            slots=self.config.get("slots", 8),
+            fsync_interval_ms=self.config.get("fsync_interval_ms", 5),
+            flush_batch_size=self.config.get("flush_batch_size", 256),
+            batch_max_bytes=self.config.get("batch_max_bytes", 32768),
+            segment_max_bytes=self.config.get("segment_max_bytes", 67108864),
+            retry_backoff_ms=self.config.get("retry_backoff_ms", 500),
+            retry_backoff_max_ms=self.config.get("retry_backoff_max_ms", 30000),
+            shutdown_flush_timeout_seconds=self.config.get("shutdown_flush_timeout_seconds", 10)
+        )
\ No newline at end of file
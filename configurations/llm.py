@@ -0,0 +1,38 @@
+import json
+#
+from dtos.configurations.llm import LLMConfigurationDTO
+#
+from start_utils import logger
+
+
+class LLMConfiguration:
+    _instance = None
+
+    def __new__(cls):
+
+        if cls._instance is None:
+            cls._instance = super(LLMConfiguration, cls).__new__(cls)
+            cls._instance.config = {}
+            cls._instance.load_config()
+        return cls._instance
+
+    def load_config(self):
+
+        try:
+
+            with open('configs/llm/config.json', 'r') as file:
+                self.config = json.load(file)
+
+        except FileNotFoundError:
+            logger.debug('Config file not found.')
+
+        except json.JSONDecodeError:
+            logger.debug('Error decoding config file.')
+
+    def get_config(self):
+        return LLMConfigurationDTO(
+            timeout_seconds=self.config.get("timeout_seconds", 60),
+            context_token_budget=self.config.get("context_token_budget", 8000),
+            context_max_chats=self.config.get("context_max_chats", 1024),
+            chars_per_token=self.config.get("chars_per_token", 4)
+        )
@@ -0,0 +1,79 @@
+import json
+#
+from dtos.configurations.rag import RAGConfigurationDTO
+#
+from start_utils import logger
+
+
+class RAGConfiguration:
+    _instance = None
+
+    def __new__(cls):
+
+        if cls._instance is None:
+            cls._instance = super(RAGConfiguration, cls).__new__(cls)
+            cls._instance.config = {}
+            cls._instance.load_config()
+        return cls._instance
+
+    def load_config(self):
+
+        try:
+
+            with open('configs/rag/config.json', 'r') as file:
+                self.config = json.load(file)
+
+        except FileNotFoundError:
+            logger.debug('Config file not found.')
+
+        except json.JSONDecodeError:
+            logger.debug('Error decoding config file.')
+
+    def get_config(self):
+
+        build_lock_ttl_seconds: int = self.config.get("build_lock_ttl_seconds", 3600)
+        build_time_limit_seconds: int = self.config.get("build_time_limit_seconds", 3300)
+        build_heartbeat_seconds: int = self.config.get("build_heartbeat_seconds", 30)
+        build_stale_seconds: int = self.config.get("build_stale_seconds", 120)
+        if build_time_limit_seconds >= build_lock_ttl_seconds:
+            raise ValueError(f"RAG build_time_limit_seconds ({build_time_limit_seconds}) must be below build_lock_ttl_seconds ({build_lock_ttl_seconds})")
+        if build_heartbeat_seconds >= build_stale_seconds:
+            raise ValueError(f"RAG build_heartbeat_seconds ({build_heartbeat_seconds}) must be below build_stale_seconds ({build_stale_seconds})")
+
+        return RAGConfigurationDTO(
+            vector_store_cache_max_bytes=self.config.get("vector_store_cache_max_bytes", 536870912),
+            vector_store_cache_max_entries=self.config.get("vector_store_cache_max_entries", 64),
+            embedding_model=self.config.get("embedding_model", "models/embedding-001"),
+            embedding_cache_path=self.config.get("embedding_cache_path", "vector_store/embedding_cache.sqlite3"),
+            embedding_cache_max_bytes=self.config.get("embedding_cache_max_bytes", 1073741824),
+            embedding_batch_size=self.config.get("embedding_batch_size", 100),
+            embedding_batch_max_chars=self.config.get("embedding_batch_max_chars", 100000),
+            embedding_concurrency=self.config.get("embedding_concurrency", 4),
+            embedding_requests_per_minute=self.config.get("embedding_requests_per_minute", 300),
+            embedding_max_retries=self.config.get("embedding_max_retries", 5),
+            embedding_backoff_seconds=self.config.get("embedding_backoff_seconds", 2),
+            embedding_max_backoff_seconds=self.config.get("embedding_max_backoff_seconds", 60),
+            ingestion_window_pages=self.config.get("ingestion_window_pages", 8),
+            build_job_ttl_seconds=self.config.get("build_job_ttl_seconds", 86400),
+            build_lock_ttl_seconds=build_lock_ttl_seconds,
+            build_time_limit_seconds=build_time_limit_seconds,
+            build_heartbeat_seconds=build_heartbeat_seconds,
+            build_stale_seconds=build_stale_seconds,
+            index_flat_max_vectors=self.config.get("index_flat_max_vectors", 20000),
+            index_hnsw_max_vectors=self.config.get("index_hnsw_max_vectors", 200000),
+            index_hnsw_m=self.config.get("index_hnsw_m", 32),
+            index_hnsw_ef_search=self.config.get("index_hnsw_ef_search", 64),
+            index_ivf_nprobe=self.config.get("index_ivf_nprobe", 16),
+            index_compression=self.config.get("index_compression", "SQ8"),
+            retrieval_k=self.config.get("retrieval_k", 6),
+            retrieval_fetch_k=self.config.get("retrieval_fetch_k", 20),
+            hybrid_retrieval=self.config.get("hybrid_retrieval", True),
+            rrf_k=self.config.get("rrf_k", 60),
+            rerank_enabled=self.config.get("rerank_enabled", False),
+            rerank_model=self.config.get("rerank_model", "cross-encoder/ms-marco-MiniLM-L-6-v2"),
+            rerank_fetch_k=self.config.get("rerank_fetch_k", 20),
+            rerank_top_n=self.config.get("rerank_top_n", 3),
+            rerank_budget_ms=self.config.get("rerank_budget_ms", 300),
+            rerank_max_length=self.config.get("rerank_max_length", 512),
+            rerank_cache_max_entries=self.config.get("rerank_cache_max_entries", 10000)
+        )
\ No newline at end of file
@@ -0,0 +1,44 @@
+import json
+#
+from dtos.configurations.scheduler import SchedulerConfigurationDTO
+#
+from start_utils import logger
+
+
+class SchedulerConfiguration:
+    _instance = None
+
+    def __new__(cls):
+
+        if cls._instance is None:
+            cls._instance = super(SchedulerConfiguration, cls).__new__(cls)
+            cls._instance.config = {}
+            cls._instance.load_config()
+        return cls._instance
+
+    def load_config(self):
+
+        try:
+
+            with open('configs/scheduler/config.json', 'r') as file:
+                self.config = json.load(file)
+
+        except FileNotFoundError:
+            logger.debug('Config file not found.')
+
+        except json.JSONDecodeError:
+            logger.debug('Error decoding config file.')
+
+    def get_config(self):
+
+        lanes: dict = self.config.get("lanes", {})
+        for name, lane in lanes.items():
+            if int(lane.get("concurrency", 1)) < 1:
+                raise ValueError(f"Scheduler lane {name} needs a concurrency of at least 1, got {lane.get('concurrency')}")
+            if int(lane.get("queue_size", 0)) < 0:
+                raise ValueError(f"Scheduler lane {name} needs a non negative queue_size, got {lane.get('queue_size')}")
+
+        return SchedulerConfigurationDTO(
+            max_wait_seconds=self.config.get("max_wait_seconds", 30),
+            lanes=lanes
+        )
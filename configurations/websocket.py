@@ -0,0 +1,39 @@
+import json
+#
+from dtos.configurations.websocket import WebsocketConfigurationDTO
+#
+from start_utils import logger
+
+
+class WebsocketConfiguration:
+    _instance = None
+
+    def __new__(cls):
+
+        if cls._instance is None:
+            cls._instance = super(WebsocketConfiguration, cls).__new__(cls)
+            cls._instance.config = {}
+            cls._instance.load_config()
+        return cls._instance
+
+    def load_config(self):
+
+        try:
+
+            with open('configs/websocket/config.json', 'r') as file:
+                self.config = json.load(file)
+
+        except FileNotFoundError:
+            logger.debug('Config file not found.')
+
+        except json.JSONDecodeError:
+            logger.debug('Error decoding config file.')
+
+    def get_config(self):
+        return WebsocketConfigurationDTO(
+            queue_size=self.config.get("queue_size", 16),
+            workers=self.config.get("workers", 1),
+            max_upload_bytes=self.config.get("max_upload_bytes", 10485760),
+            max_chunk_bytes=self.config.get("max_chunk_bytes", 1048576),
+            min_client_priority=self.config.get("min_client_priority", -10)
+        )
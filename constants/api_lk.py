@@ -8,8 +8,13 @@ class APILK:
     CHAT_INITIATE: Final[str] = "CHAT_INITIATE"
     CHAT_CONVERSATE: Final[str] = "CHAT_CONVERSATE"
     
+    RAG_BUILD: Final[str] = "RAG_BUILD"
+    RAG_BUILD_STATUS: Final[str] = "RAG_BUILD_STATUS"
+    RAG_REMOVE_DOCUMENT: Final[str] = "RAG_REMOVE_DOCUMENT"
+    
     DELETE_CHAT: Final[str] = "DELETE_CHAT"
     FETCH_CHATS: Final[str] = "FETCH_CHATS"
+    FETCH_CHAT_MESSAGES: Final[str] = "FETCH_CHAT_MESSAGES"
     
 
     REGISTER: Final[str] = "REGISTER"
@@ -0,0 +1,9 @@
+from typing import Final
+
+
+class RAGBuildStatus:
+
+    QUEUED: Final[str] = "queued"
+    RUNNING: Final[str] = "running"
+    SUCCEEDED: Final[str] = "succeeded"
+    FAILED: Final[str] = "failed"
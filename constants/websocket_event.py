@@ -0,0 +1,20 @@
+from typing import Final
+
+
+class WebsocketEvent:
+
+    MESSAGE: Final[str] = "message"
+    ACKNOWLEDGEMENT: Final[str] = "acknowledgement"
+    CLEAR: Final[str] = "clear"
+    CANCEL: Final[str] = "cancel"
+    CANCELLED: Final[str] = "cancelled"
+    BUSY: Final[str] = "busy"
+    UPLOAD: Final[str] = "upload"
+    UPLOAD_REJECTED: Final[str] = "upload_rejected"
+
+    PARTIAL: Final[str] = "partial"
+    COMPLETE: Final[str] = "complete"
+
+    RAG_BUILD_PROGRESS: Final[str] = "rag/build/progress"
+    RAG_BUILD_COMPLETE: Final[str] = "rag/build/complete"
+    RAG_BUILD_FAILED: Final[str] = "rag/build/failed"
@@ -2,8 +2,11 @@ from fastapi import APIRouter
 
 from controllers.apis.chat.delete import DeleteChatController
 from controllers.apis.chat.fetch import FetchChatsController
+from controllers.apis.chat.fetch_messages import FetchChatMessagesController
 from controllers.apis.chat.match import MatchUsersChatController
 from controllers.apis.rag.build import BuildRAGController
+from controllers.apis.rag.remove_document import RemoveRAGDocumentController
+from controllers.apis.rag.status import RAGBuildStatusController
 
 from start_utils import logger
 
@@ -17,6 +20,22 @@ router.add_api_route(
 )
 logger.debug(f"Registered {BuildRAGController.__name__} route.")
 
+logger.debug(f"Registering {RAGBuildStatusController.__name__} route.")
+router.add_api_route(
+    path="/rag/build/{job_id}",
+    endpoint=RAGBuildStatusController().get,
+    methods=["GET"]
+)
+logger.debug(f"Registered {RAGBuildStatusController.__name__} route.")
+
+logger.debug(f"Registering {RemoveRAGDocumentController.__name__} route.")
+router.add_api_route(
+    path="/rag/documents/{session_id}/{chat_urn}/{document_id}",
+    endpoint=RemoveRAGDocumentController().delete,
+    methods=["DELETE"]
+)
+logger.debug(f"Registered {RemoveRAGDocumentController.__name__} route.")
+
 logger.debug(f"Registering {FetchChatsController.__name__} route.")
 router.add_api_route(
     path="/chat/fetch/{user_urn}",
@@ -25,6 +44,14 @@ router.add_api_route(
 )
 logger.debug(f"Registered {FetchChatsController.__name__} route.")
 
+logger.debug(f"Registering {FetchChatMessagesController.__name__} route.")
+router.add_api_route(
+    path="/chat/fetch/{user_urn}/{chat_urn}",
+    endpoint=FetchChatMessagesController().post,
+    methods=["POST"]
+)
+logger.debug(f"Registered {FetchChatMessagesController.__name__} route.")
+
 logger.debug(f"Registering {DeleteChatController.__name__} route.")
 router.add_api_route(
     path="/chat/delete/{user_urn}",
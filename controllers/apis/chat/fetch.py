@@ -116,7 +116,10 @@ class FetchChatsController(IController):
 
             return FetchChatRequestDTO(
                 reference_number=self.request_payload.get("reference_number"),
-                chat_type=self.request_payload.get("chat_type")
+                chat_type=self.request_payload.get("chat_type"),
+                page_size=self.request_payload.get("page_size", 20),
+                messages_page_size=self.request_payload.get("messages_page_size", 50),
+                cursor=self.request_payload.get("cursor")
             )
 
         except ValidationError as err:
@@ -1,3 +1,4 @@
+import hashlib
 import os
 
 from datetime import datetime
@@ -6,6 +7,7 @@ from fastapi.responses import JSONResponse
 from http import HTTPStatus
 from pydantic import ValidationError
 from typing_extensions import Annotated
+from ulid import ulid
 
 from abstractions.controller import IController
 
@@ -18,7 +20,7 @@ from dtos.responses.base import BaseResponseDTO
 
 from errors.bad_input_error import BadInputError
 
-from services.apis.rag.build import BuildRetrievalAugmentedGenerationService
+from services.apis.rag.submit import SubmitRAGBuildService
 
 from start_utils import TEMP_FOLDER
 
@@ -27,7 +29,7 @@ class BuildRAGController(IController):
 
     def __init__(self, urn: str = None) -> None:
         super().__init__(urn)
-        self.api_name = APILK.CHAT_CONVERSATE
+        self.api_name = APILK.RAG_BUILD
         self.payload_type = PayloadType.FORM
 
     async def post(self, request: Request, session_id: Annotated[str, Path(title="The sessin id")], chat_urn: Annotated[str, Path(title="The chat urn")])-> dict:
@@ -58,20 +60,20 @@ class BuildRAGController(IController):
             )
             self.logger.debug("Prepared request payload for service")
 
-            self.logger.debug("Running Build RAG Service")
-            build_rag_service: BuildRetrievalAugmentedGenerationService = BuildRetrievalAugmentedGenerationService(
+            self.logger.debug("Running Submit RAG Build Service")
+            submit_rag_build_service: SubmitRAGBuildService = SubmitRAGBuildService(
                 urn=self.urn
             )
-            build_rag_response_data: dict = await build_rag_service.run(
+            response_dto: BaseResponseDTO = await submit_rag_build_service.run(
                 data=request_payload
             )
-            self.logger.debug("Completed Build RAG Service")
+            self.logger.debug("Completed Submit RAG Build Service")
 
-            http_status_code = HTTPStatus.OK
-            self.logger.debug("Preparing response payload.")
-            self.logger.debug("Prepared response payload.")
-
-            return build_rag_response_data
+            http_status_code = HTTPStatus.ACCEPTED
+            return JSONResponse(
+                content=response_dto.__dict__,
+                status_code=http_status_code
+            )
 
         except BadInputError as err:
 
@@ -121,13 +123,17 @@ class BuildRAGController(IController):
         try:
 
             file = self.request_payload.get("document")
-            file_path = os.path.join(TEMP_FOLDER, file.filename)
+            file_path = os.path.join(TEMP_FOLDER, f"{ulid()}_{os.path.basename(file.filename)}")
+            document_hash = hashlib.sha256()
             with open(file_path, "wb") as buffer:
-                buffer.write(await file.read())
+                while chunk := await file.read(1024 * 1024):
+                    document_hash.update(chunk)
+                    buffer.write(chunk)
 
             return BuildRAGRequestDTO(
                 reference_number=self.request_payload.get("reference_number"),
-                document_file_path=file_path
+                document_file_path=file_path,
+                document_hash=document_hash.hexdigest()
             )
 
         except ValidationError as err:
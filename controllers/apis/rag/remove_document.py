@@ -0,0 +1,101 @@
+from datetime import datetime
+from fastapi import Request, Path
+from fastapi.responses import JSONResponse
+from http import HTTPStatus
+from typing_extensions import Annotated
+
+from abstractions.controller import IController
+
+from constants.api_lk import APILK
+from constants.api_status import APIStatus
+
+from dtos.responses.base import BaseResponseDTO
+
+from errors.bad_input_error import BadInputError
+
+from services.apis.rag.remove_document import RemoveRAGDocumentService
+
+
+class RemoveRAGDocumentController(IController):
+
+    def __init__(self, urn: str = None) -> None:
+        super().__init__(urn)
+        self.api_name = APILK.RAG_REMOVE_DOCUMENT
+        self.payload_type = None
+
+    async def delete(
+        self,
+        request: Request,
+        session_id: Annotated[str, Path(title="The sessin id")],
+        chat_urn: Annotated[str, Path(title="The chat urn")],
+        document_id: Annotated[str, Path(title="The document id returned by the build job")]
+    )-> dict:
+
+        self.logger.debug("Starting Remove RAG Document Controller Execution.")
+        start_time = datetime.now()
+
+        try:
+
+            self.urn = request.state.urn
+
+            self.logger.debug("Running Remove RAG Document Service")
+            remove_rag_document_service: RemoveRAGDocumentService = RemoveRAGDocumentService(
+                urn=self.urn
+            )
+            response_dto: BaseResponseDTO = await remove_rag_document_service.run(
+                data={
+                    "session_id": session_id,
+                    "chat_urn": chat_urn,
+                    "document_id": document_id
+                }
+            )
+            self.logger.debug("Completed Remove RAG Document Service")
+
+            http_status_code = HTTPStatus.OK
+            return JSONResponse(
+                content=response_dto.__dict__,
+                status_code=http_status_code
+            )
+
+        except BadInputError as err:
+
+            self.logger.error(f"{err.__class__} error occured while removing rag document: {err}", urn=self.urn)
+            self.logger.debug("Preparing response metadata")
+            response_dto: BaseResponseDTO = BaseResponseDTO(
+                transaction_urn=self.urn,
+                status=APIStatus.FAILED,
+                response_message=err.response_message,
+                response_key=err.response_key,
+            )
+            http_status_code = err.http_status_code
+            self.logger.debug("Prepared response metadata", urn=self.urn)
+
+            return JSONResponse(
+                content=response_dto.__dict__,
+                status_code=http_status_code
+            )
+
+        except Exception as err:
+
+            self.logger.error(f"{err.__class__} error occured while removing rag document: {err}", urn=self.urn)
+
+            self.logger.debug("Preparing response metadata", urn=self.urn)
+            response_dto: BaseResponseDTO = BaseResponseDTO(
+                transaction_urn=self.urn,
+                status=APIStatus.FAILED,
+                response_message="Failed to remove document.",
+                response_key="error_internal_server_error",
+            )
+            http_status_code = HTTPStatus.INTERNAL_SERVER_ERROR
+            self.logger.debug("Prepared response metadata", urn=self.urn)
+
+            return JSONResponse(
+                content=response_dto.__dict__,
+                status_code=http_status_code
+            )
+
+        finally:
+
+            end_time: datetime = datetime.now()
+            self.logger.debug("Completed Remove RAG Document Controller Execution.")
+            self.logger.debug(f"Execution took {str(end_time-start_time)}")
@@ -0,0 +1,93 @@
+from datetime import datetime
+from fastapi import Request, Path
+from fastapi.responses import JSONResponse
+from http import HTTPStatus
+from typing_extensions import Annotated
+
+from abstractions.controller import IController
+
+from constants.api_lk import APILK
+from constants.api_status import APIStatus
+
+from dtos.responses.base import BaseResponseDTO
+
+from errors.bad_input_error import BadInputError
+
+from services.apis.rag.status import RAGBuildStatusService
+
+
+class RAGBuildStatusController(IController):
+
+    def __init__(self, urn: str = None) -> None:
+        super().__init__(urn)
+        self.api_name = APILK.RAG_BUILD_STATUS
+        self.payload_type = None
+
+    async def get(self, request: Request, job_id: Annotated[str, Path(title="The build job id")])-> dict:
+       
+        self.logger.debug("Starting RAG Build Status Controller Execution.")
+        start_time = datetime.now()
+
+        try:
+
+            self.urn = request.state.urn
+
+            self.logger.debug("Running RAG Build Status Service")
+            rag_build_status_service: RAGBuildStatusService = RAGBuildStatusService(
+                urn=self.urn
+            )
+            response_dto: BaseResponseDTO = await rag_build_status_service.run(
+                data={
+                    "job_id": job_id
+                }
+            )
+            self.logger.debug("Completed RAG Build Status Service")
+
+            http_status_code = HTTPStatus.OK
+            return JSONResponse(
+                content=response_dto.__dict__,
+                status_code=http_status_code
+            )
+
+        except BadInputError as err:
+
+            self.logger.error(f"{err.__class__} error occured while fetching build status: {err}", urn=self.urn)
+            self.logger.debug("Preparing response metadata")
+            response_dto: BaseResponseDTO = BaseResponseDTO(
+                transaction_urn=self.urn,
+                status=APIStatus.FAILED,
+                response_message=err.response_message,
+                response_key=err.response_key,
+            )
+            http_status_code = err.http_status_code
+            self.logger.debug("Prepared response metadata", urn=self.urn)
+
+            return JSONResponse(
+                content=response_dto.__dict__,
+                status_code=http_status_code
+            )
+
+        except Exception as err:
+
+            self.logger.error(f"{err.__class__} error occured while fetching build status: {err}", urn=self.urn)
+
+            self.logger.debug("Preparing response metadata", urn=self.urn)
+            response_dto: BaseResponseDTO = BaseResponseDTO(
+                transaction_urn=self.urn,
+                status=APIStatus.FAILED,
+                response_message="Failed to fetch build status.",
+                response_key="error_internal_server_error",
+            )
+            http_status_code = HTTPStatus.INTERNAL_SERVER_ERROR
+            self.logger.debug("Prepared response metadata", urn=self.urn)
+    
+            return JSONResponse(
+                content=response_dto.__dict__,
+                status_code=http_status_code
+            )
+        
+        finally:
+
+            end_time: datetime = datetime.now()
+            self.logger.debug("Completed RAG Build Status Controller Execution.")
+            self.logger.debug(f"Execution took {str(end_time-start_time)}")
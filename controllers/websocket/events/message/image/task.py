@@ -2,6 +2,8 @@ from ulid import ulid
 
 from abstractions.event import IEvent
 
+from errors.service_busy_error import ServiceBusyError
+
 from services.apis.model.image_captioning import ImageCaptioningChatService
 
 from start_utils import on_event
@@ -16,17 +18,23 @@ class WebSocketMessageImageEvent(IEvent):
 
             cls.logger.debug("Running image captioning service")
             image_captioning_chat_service = ImageCaptioningChatService(
-                urn=ulid()
+                urn=ulid(),
+                priority=data.get("priority", 0)
             )
             _ = await image_captioning_chat_service.run(
                 data={
                     "chat_type": data.get("chat_type"),
                     "session_id": data.get("session_id"),
                     "chat_urn": data.get("chat_urn"),
-                    "image": data.get("text")
+                    "image": data.get("text"),
+                    "image_buffer": data.get("image_buffer"),
+                    "mime_type": data.get("mime_type")
                 }
             )
             cls.logger.debug("Completed image captioning service")
 
+        except ServiceBusyError:
+            raise
+
         except Exception:
-            cls.logger("Failed to run image captioning service")
\ No newline at end of file
+            cls.logger.error("Failed to run image captioning service")
\ No newline at end of file
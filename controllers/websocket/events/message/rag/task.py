@@ -2,6 +2,8 @@ from ulid import ulid
 
 from abstractions.event import IEvent
 
+from errors.service_busy_error import ServiceBusyError
+
 from services.apis.rag.query import QueryRetrivalAugmentedGenerationService
 
 from start_utils import on_event
@@ -16,7 +18,8 @@ class WebSocketMessageRAGEvent(IEvent):
 
             cls.logger.debug("Running query rag service")
             query_rag_chat_service = QueryRetrivalAugmentedGenerationService(
-                urn=ulid()
+                urn=ulid(),
+                priority=data.get("priority", 0)
             )
 
             _ = await query_rag_chat_service.run(
@@ -24,10 +27,15 @@ class WebSocketMessageRAGEvent(IEvent):
                     "chat_type": data.get("chat_type"),
                     "session_id": data.get("session_id"),
                     "chat_urn": data.get("chat_urn"),
-                    "prompt": data.get("text")
+                    "prompt": data.get("text"),
+                    "rerank": data.get("rerank"),
+                    "rerank_budget_ms": data.get("rerank_budget_ms")
                 }
             )
             cls.logger.debug("Running query rag service")
 
+        except ServiceBusyError:
+            raise
+
         except Exception:
-            cls.logger("Failed to run query rag service")
\ No newline at end of file
+            cls.logger.error("Failed to run query rag service")
\ No newline at end of file
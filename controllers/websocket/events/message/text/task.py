@@ -2,6 +2,8 @@ from ulid import ulid
 
 from abstractions.event import IEvent
 
+from errors.service_busy_error import ServiceBusyError
+
 from services.apis.model.text_to_image import TextToImageChatService
 from services.apis.model.text_to_code import TextToCodeChatService
 from services.apis.model.text_to_speech import TextToSpeechChatService
@@ -19,7 +21,8 @@ class WebSocketMessageTextEvent(IEvent):
 
             cls.logger.debug("Running Text to Image service")
             text_to_image_chat_service = TextToImageChatService(
-                urn=ulid()
+                urn=ulid(),
+                priority=data.get("priority", 0)
             )
 
             _ = await text_to_image_chat_service.run(
@@ -32,8 +35,11 @@ class WebSocketMessageTextEvent(IEvent):
             )
             cls.logger.debug("Completed Text to Image service")
         
+        except ServiceBusyError:
+            raise
+
         except Exception:
-            cls.logger("Failed to run text to speech service")
+            cls.logger.error("Failed to run text to speech service")
 
     @on_event(r'^message/text/text_generation$')
     async def text_generation(cls, data: dict):
@@ -42,7 +48,8 @@ class WebSocketMessageTextEvent(IEvent):
 
             cls.logger.debug("Running Text to Speech service")
             text_chat_service = TextToSpeechChatService(
-                urn=ulid()
+                urn=ulid(),
+                priority=data.get("priority", 0)
             )
 
             _ = await text_chat_service.run(
@@ -50,22 +57,27 @@ class WebSocketMessageTextEvent(IEvent):
                     "chat_type": data.get("chat_type"),
                     "session_id": data.get("session_id"),
                     "chat_urn": data.get("chat_urn"),
-                    "message": data.get("text")
+                    "message": data.get("text"),
+                    "stream": data.get("stream", False)
                 }
             )
             cls.logger.debug("Running Text to Speech service")
 
+        except ServiceBusyError:
+            raise
+
         except Exception:
-            cls.logger("Failed to run text to speech service")
+            cls.logger.error("Failed to run text to speech service")
 
     @on_event(r'^message/text/code_generation$')
-    async def text_generation(cls, data: dict):
+    async def code_generation(cls, data: dict):
 
         try:
 
             cls.logger.debug("Running Text to Code service")
             text_chat_service = TextToCodeChatService(
-                urn=ulid()
+                urn=ulid(),
+                priority=data.get("priority", 0)
             )
 
             _ = await text_chat_service.run(
@@ -78,5 +90,8 @@ class WebSocketMessageTextEvent(IEvent):
             )
             cls.logger.debug("Running Text to Code service")
 
+        except ServiceBusyError:
+            raise
+
         except Exception:
-            cls.logger("Failed to run text to Code service")
\ No newline at end of file
+            cls.logger.error("Failed to run text to Code service")
\ No newline at end of file
@@ -6,4 +6,11 @@ class CacheConfigurationDTO:
 
     host: str
     port: int
-    password: str
\ No newline at end of file
+    password: str
+    max_connections: int
+    pool_timeout_seconds: float
+    socket_timeout_seconds: float
+    health_check_interval_seconds: int
+    conversation_max_messages: int
+    conversation_window_messages: int
+    conversation_ttl_seconds: int
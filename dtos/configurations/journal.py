@@ -0,0 +1,16 @@
+from dataclasses import dataclass
+
+
+@dataclass
+class JournalConfigurationDTO:
+
+    write_behind: bool
+    directory: str
+    slots: int
+    fsync_interval_ms: int
+    flush_batch_size: int
+    batch_max_bytes: int
+    segment_max_bytes: int
+    retry_backoff_ms: int
+    retry_backoff_max_ms: int
+    shutdown_flush_timeout_seconds: float
@@ -0,0 +1,10 @@
+from dataclasses import dataclass
+
+
+@dataclass
+class LLMConfigurationDTO:
+
+    timeout_seconds: float
+    context_token_budget: int
+    context_max_chats: int
+    chars_per_token: int
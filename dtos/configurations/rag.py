@@ -0,0 +1,41 @@
+from dataclasses import dataclass
+
+
+@dataclass
+class RAGConfigurationDTO:
+
+    vector_store_cache_max_bytes: int
+    vector_store_cache_max_entries: int
+    embedding_model: str
+    embedding_cache_path: str
+    embedding_cache_max_bytes: int
+    embedding_batch_size: int
+    embedding_batch_max_chars: int
+    embedding_concurrency: int
+    embedding_requests_per_minute: int
+    embedding_max_retries: int
+    embedding_backoff_seconds: float
+    embedding_max_backoff_seconds: float
+    ingestion_window_pages: int
+    build_job_ttl_seconds: int
+    build_lock_ttl_seconds: int
+    build_time_limit_seconds: int
+    build_heartbeat_seconds: int
+    build_stale_seconds: int
+    index_flat_max_vectors: int
+    index_hnsw_max_vectors: int
+    index_hnsw_m: int
+    index_hnsw_ef_search: int
+    index_ivf_nprobe: int
+    index_compression: str
+    retrieval_k: int
+    retrieval_fetch_k: int
+    hybrid_retrieval: bool
+    rrf_k: int
+    rerank_enabled: bool
+    rerank_model: str
+    rerank_fetch_k: int
+    rerank_top_n: int
+    rerank_budget_ms: int
+    rerank_max_length: int
+    rerank_cache_max_entries: int
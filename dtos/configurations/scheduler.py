@@ -0,0 +1,9 @@
+from dataclasses import dataclass
+from typing import Dict
+
+
+@dataclass
+class SchedulerConfigurationDTO:
+
+    max_wait_seconds: float
+    lanes: Dict[str, Dict[str, int]]
@@ -0,0 +1,11 @@
+from dataclasses import dataclass
+
+
+@dataclass
+class WebsocketConfigurationDTO:
+
+    queue_size: int
+    workers: int
+    max_upload_bytes: int
+    max_chunk_bytes: int
+    min_client_priority: int
@@ -1,7 +1,16 @@
+from pydantic import Field
 from typing import Optional
 from dtos.requests.apis.base import BaseRequestDTO
 
 
 class FetchChatRequestDTO(BaseRequestDTO):
-    
-    chat_type: Optional[str] = None
\ No newline at end of file
+    """
+    One page of ``page_size`` chats, ordered by chat type and chat urn rather
+    than most recent first; each chat's ``lastMessageAt`` gives its recency.
+    ``cursor`` is the previous response's ``next_cursor``.
+    """
+
+    chat_type: Optional[str] = None
+    page_size: int = Field(default=20, ge=1, le=100)
+    messages_page_size: int = Field(default=50, ge=1, le=200)
+    cursor: Optional[str] = None
@@ -0,0 +1,10 @@
+from pydantic import Field
+from typing import Optional
+from dtos.requests.apis.base import BaseRequestDTO
+
+
+class FetchChatMessagesRequestDTO(BaseRequestDTO):
+    
+    chat_type: Optional[str] = None
+    page_size: int = Field(default=50, ge=1, le=200)
+    cursor: Optional[str] = None
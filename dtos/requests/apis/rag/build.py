@@ -3,4 +3,5 @@ from dtos.requests.apis.base import BaseRequestDTO
 
 class BuildRAGRequestDTO(BaseRequestDTO):
     
-    document_file_path: str
\ No newline at end of file
+    document_file_path: str
+    document_hash: str
\ No newline at end of file
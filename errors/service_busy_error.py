@@ -0,0 +1,13 @@
+from abstractions.error import IError
+
+
+class ServiceBusyError(IError):
+
+    def __init__(self, response_message: str, response_key: str, http_status_code: int, backend: str = None, retry_after: float = None) -> None:
+
+        super().__init__()
+        self.response_message = response_message
+        self.response_key = response_key
+        self.http_status_code = http_status_code
+        self.backend = backend
+        self.retry_after = retry_after
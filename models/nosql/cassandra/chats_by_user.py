@@ -0,0 +1,19 @@
+from cassandra.cqlengine import columns
+from cassandra.cqlengine.models import Model
+
+
+class ChatsByUser(Model):
+    """
+    One row per chat a user takes part in, upserted with every message, so the
+    chat list is paged from a single partition without reading the messages.
+    Expires with the chat's last message; chats without a chat type are stored
+    under "" as in ``MessagesByUser``.
+    """
+
+    __keyspace__ = "chat"
+    __table_name__ = "chats_by_user"
+
+    user_urn = columns.Text(partition_key=True)
+    chat_type = columns.Text(primary_key=True, clustering_order="ASC")
+    chat_urn = columns.Text(primary_key=True, clustering_order="ASC")
+    last_message_at = columns.DateTime()
@@ -0,0 +1,32 @@
+from cassandra.cqlengine import columns
+from cassandra.cqlengine.models import Model
+
+
+class MessagesByUser(Model):
+    """
+    Copy of ``Messages`` keyed by the participants of each message, one row for
+    the sender and one for the receiver, so a user's history is read from a
+    single partition instead of the ``sender_urn``/``receiver_urn`` secondary
+    indexes. ``chat_type`` leads the clustering key so filtering on it is a
+    prefix slice of the partition; messages without a chat type are stored
+    under "".
+    """
+
+    __keyspace__ = "chat"
+    __table_name__ = "messages_by_user"
+
+    user_urn = columns.Text(partition_key=True)
+    chat_type = columns.Text(primary_key=True, clustering_order="ASC")
+    chat_urn = columns.Text(primary_key=True, clustering_order="ASC")
+    time_stamp = columns.DateTime(primary_key=True, clustering_order="DESC")
+    urn = columns.Text(primary_key=True, clustering_order="ASC")
+    text = columns.Text()
+    sender_urn = columns.Text()
+    receiver_urn = columns.Text()
+    sender_name = columns.Text()
+    receiver_name = columns.Text()
+    message_type = columns.Text()
+    metadata = columns.Map(columns.Text, columns.Text)
+    is_deleted = columns.Boolean(default=False)
+    is_read = columns.Boolean(default=False)
+    priority = columns.Integer(default=0)
@@ -1,106 +1,153 @@
-from cassandra.cqlengine.management import sync_table
+from cassandra.query import SimpleStatement
+from typing import Dict, List, Optional, Set, Tuple
 
 from abstractions.repository import IRepository
 
+from models.nosql.cassandra.chats_by_user import ChatsByUser
 from models.nosql.cassandra.messages import Messages
+from models.nosql.cassandra.messages_by_user import MessagesByUser
 
-from start_utils import casssandra_connection, MESSAGE_TTL
+from start_utils import cassandra_utility
+
+from utilities.message_writer import MessageWriter
 
 
 class MessagesRepository(IRepository):
+    """
+    Message queries over the process wide Cassandra session, opened in the app
+    lifespan or Celery worker init; constructing a repository does no I/O.
+    Messages are written by ``MessageWriter``, through the ``MessageJournal``.
+    """
 
     def __init__(self, urn: str = None):
         super().__init__(urn)
         self.urn = urn
         self.key_space = "chat"
 
-        try:
-            self.session = casssandra_connection()
-            sync_table(Messages)
-        except Exception as err:
-            self.logger.error(f"Error occured while connection cassanda key space: {self.key_space}. err: {str(err)}")
+    def fetch_user_messages(self, user_urn: str, chat_type: str = None):
+        """
+        Fetch all messages where user_urn is either the sender or the receiver.
 
-        self.logger.info(f"Connected to Cassandra keyspace: {self.key_space}")
+        Reads the user's ``messages_by_user`` partition, so the rows come back
+        grouped by chat type and chat, newest first within each chat.
 
-    def create_record(
-        self,
-        urn: str,
-        chat_urn: str,
-        text: str, 
-        sender_urn: str, 
-        receiver_urn: str, 
-        sender_name: str, 
-        receiver_name: str, 
-        message_type: str, 
-        chat_type: str, 
-        metadata: dict,
-        is_deleted: bool = False,
-        is_read: bool = False,
-        priority: int = 0
-    ):
+        :param user_urn: The urn of the user (could be sender or receiver)
+        :return: List of matching records
+        """
 
         try:
-    
-            message = Messages.ttl(MESSAGE_TTL).create(
-                urn=urn,
-                chat_urn=chat_urn,
-                text=text,
-                sender_urn=sender_urn,
-                receiver_urn=receiver_urn,
-                sender_name=sender_name,
-                receiver_name=receiver_name,
-                message_type=message_type,
-                chat_type=chat_type,
-                metadata=metadata,
-                is_deleted=is_deleted,
-                is_read=is_read,
-                priority=priority
-            )
-            self.logger.info(f"Message created with URN: {message.urn}")
 
-            return message
-    
+            messages_query = MessagesByUser.objects.filter(user_urn=user_urn)
+            if chat_type is not None:
+                messages_query = messages_query.filter(chat_type=chat_type)
+            all_messages = list(messages_query.all())
+
+            self.logger.info(f"Fetched {len(all_messages)} messages for user_urn: {user_urn} and chat_type: {chat_type}")
+            
+            return all_messages
+
         except Exception as err:
-            self.logger.error(f"Error creating message: {err}")
+            self.logger.error(f"Error fetching messages for user_urn: {user_urn} and chat_type: {chat_type}. Error: {err}")
             raise
 
-    def fetch_user_messages(self, user_urn: str, chat_type: str = None):
+    async def __page(
+        self,
+        query: str,
+        parameters: List[str],
+        page_size: int,
+        paging_state: Optional[bytes] = None
+    ) -> Tuple[List[Dict], Optional[bytes]]:
         """
-        Fetch all messages where user_urn is either the sender or the receiver.
-        
-        :param user_urn: The urn of the user (could be sender or receiver)
-        :return: Query set of matching records
+        Run ``query`` for one page of at most ``page_size`` rows, resuming from
+        ``paging_state``. Returns the rows and the paging state of the next
+        page, None when the query is exhausted.
+        """
+
+        statement = SimpleStatement(query, fetch_size=page_size)
+
+        return await cassandra_utility.execute_page(statement, parameters, paging_state=paging_state)
+
+    async def fetch_user_chats(
+        self,
+        user_urn: str,
+        chat_type: str = None,
+        page_size: int = 20,
+        paging_state: Optional[bytes] = None
+    ) -> Tuple[List[ChatsByUser], Optional[bytes]]:
+        """
+        Fetch one page of the chats user_urn takes part in, ordered by chat
+        type and chat urn rather than by recency: rows are upserted per
+        message, so a recency ordered clustering key would leave one stale row
+        per chat behind. Each row carries ``last_message_at`` to sort by.
         """
 
         try:
 
-            sent_messages_query = Messages.objects.filter(sender_urn=user_urn)
+            query = f"SELECT * FROM {ChatsByUser.column_family_name()} WHERE user_urn = %s"
+            parameters = [user_urn]
             if chat_type is not None:
-                sent_messages_query = sent_messages_query.filter(chat_type=chat_type)
-            sent_messages = sent_messages_query.all()
+                query += " AND chat_type = %s"
+                parameters.append(chat_type)
 
-            received_messages_query = Messages.objects.filter(receiver_urn=user_urn)
-            if chat_type is not None:
-                received_messages_query = received_messages_query.filter(chat_type=chat_type)
-            recieved_messages = received_messages_query.all()
+            rows, next_paging_state = await self.__page(query=query, parameters=parameters, page_size=page_size, paging_state=paging_state)
+            chats = [ChatsByUser(**row) for row in rows]
+            self.logger.info(f"Fetched {len(chats)} chats for user_urn: {user_urn} and chat_type: {chat_type}")
 
-            all_messages = list(sent_messages) + list(recieved_messages)
-            all_messages.sort(key=lambda x: x.time_stamp, reverse=True)
+            return chats, next_paging_state
 
-            self.logger.info(f"Fetched {len(all_messages)} messages for user_urn: {user_urn} and chat_type: {chat_type}")
-            
-            return all_messages
+        except Exception as err:
+            self.logger.error(f"Error fetching chats for user_urn: {user_urn} and chat_type: {chat_type}. Error: {err}")
+            raise
+
+    async def fetch_chat_messages(
+        self,
+        user_urn: str,
+        chat_type: str,
+        chat_urn: str,
+        page_size: int = 50,
+        paging_state: Optional[bytes] = None
+    ) -> Tuple[List[MessagesByUser], Optional[bytes]]:
+        """
+        Fetch one page of a chat's messages from user_urn's partition, newest
+        first, so following pages go back in time.
+        """
+
+        try:
+
+            query = (
+                f"SELECT * FROM {MessagesByUser.column_family_name()} "
+                "WHERE user_urn = %s AND chat_type = %s AND chat_urn = %s"
+            )
+            rows, next_paging_state = await self.__page(
+                query=query,
+                parameters=[user_urn, chat_type or "", chat_urn],
+                page_size=page_size,
+                paging_state=paging_state
+            )
+            messages = [MessagesByUser(**row) for row in rows]
+            self.logger.info(f"Fetched {len(messages)} messages for user_urn: {user_urn} and chat_urn: {chat_urn}")
+
+            return messages, next_paging_state
 
         except Exception as err:
-            self.logger.error(f"Error fetching messages for user_urn: {user_urn} and chat_type: {chat_type}. Error: {err}")
+            self.logger.error(f"Error fetching messages for user_urn: {user_urn} and chat_urn: {chat_urn}. Error: {err}")
             raise
 
     def delete_messages_by_chat_urn(self, chat_urn: str) -> bool:
         """
-        Delete all messages in a specific chat identified by chat_urn.
+        Delete all messages in a specific chat identified by chat_urn, along
+        with their copies in the participants' ``messages_by_user`` partitions.
         """
         try:
 
+            chat_keys: Set[Tuple[str, str]] = set()
+            for message in Messages.objects.filter(chat_urn=chat_urn).only(["sender_urn", "receiver_urn", "chat_type"]):
+                for user_urn in MessageWriter.participants(sender_urn=message.sender_urn, receiver_urn=message.receiver_urn):
+                    chat_keys.add((user_urn, message.chat_type or ""))
+
+            for user_urn, chat_type in chat_keys:
+                MessagesByUser.objects.filter(user_urn=user_urn, chat_type=chat_type, chat_urn=chat_urn).delete()
+                ChatsByUser.objects.filter(user_urn=user_urn, chat_type=chat_type, chat_urn=chat_urn).delete()
             Messages.objects.filter(chat_urn=chat_urn).delete()
             self.logger.debug(f"Deleted chat for chat_urn: {chat_urn}")
     
@@ -0,0 +1,161 @@
+import json
+
+from typing_extensions import Dict, List, Optional, Tuple
+
+from abstractions.repository import IRepository
+
+from start_utils import cache_configuration, redis_session
+
+
+class ConversationRepository(IRepository):
+    """
+    Conversation turns stored as a Redis list per chat. Appends push only the new
+    turns, so a turn costs the same on the wire regardless of history length, and
+    concurrent turns on the same chat never overwrite each other.
+
+    A sequence counter next to each list counts every turn ever appended, which
+    lets readers fetch only the turns added since their last read. Clearing or
+    re-seeding a chat moves the counter past any window so stale readers reload.
+    """
+
+    KEY: str = "conversation:{chat_urn}"
+    SEQUENCE_KEY: str = "conversation:{chat_urn}:sequence"
+
+    SEED_SCRIPT: str = """
+    if redis.call('EXISTS', KEYS[1]) == 1 then
+        return 0
+    end
+    redis.call('RPUSH', KEYS[1], unpack(ARGV, 3))
+    redis.call('LTRIM', KEYS[1], -tonumber(ARGV[1]), -1)
+    redis.call('EXPIRE', KEYS[1], tonumber(ARGV[2]))
+    redis.call('INCRBY', KEYS[2], tonumber(ARGV[1]) + #ARGV - 1)
+    redis.call('EXPIRE', KEYS[2], tonumber(ARGV[2]))
+    return 1
+    """
+
+    SINCE_SCRIPT: str = """
+    local sequence = tonumber(redis.call('GET', KEYS[2]) or '0')
+    local last_sequence = tonumber(ARGV[1])
+    local count = sequence - last_sequence
+    local full = 0
+    if last_sequence < 0 or count < 0 or count > tonumber(ARGV[2]) then
+        count = tonumber(ARGV[2])
+        full = 1
+    end
+    if count == 0 then
+        return {sequence, full, {}}
+    end
+    return {sequence, full, redis.call('LRANGE', KEYS[1], -count, -1)}
+    """
+
+    CLEAR_SCRIPT: str = """
+    local deleted = redis.call('DEL', KEYS[1])
+    redis.call('INCRBY', KEYS[2], tonumber(ARGV[1]) + 1)
+    redis.call('EXPIRE', KEYS[2], tonumber(ARGV[2]))
+    return deleted
+    """
+
+    def __init__(self, urn: str = None):
+        super().__init__(urn)
+        self.urn = urn
+        self.max_messages = cache_configuration.conversation_max_messages
+        self.window_messages = cache_configuration.conversation_window_messages
+        self.ttl_seconds = cache_configuration.conversation_ttl_seconds
+        self.seed_script = redis_session.register_script(self.SEED_SCRIPT)
+        self.since_script = redis_session.register_script(self.SINCE_SCRIPT)
+        self.clear_script = redis_session.register_script(self.CLEAR_SCRIPT)
+
+    def key(self, chat_urn: str) -> str:
+        return self.KEY.format(chat_urn=chat_urn)
+
+    def sequence_key(self, chat_urn: str) -> str:
+        return self.SEQUENCE_KEY.format(chat_urn=chat_urn)
+
+    async def append(self, chat_urn: str, *turns: Dict[str, str]) -> int:
+        """
+        Append ``turns`` to the conversation, trim it to the configured maximum and refresh its TTL.
+
+        Returns:
+            int: Sequence number of the last appended turn.
+        """
+        if not turns:
+            return 0
+
+        key: str = self.key(chat_urn=chat_urn)
+        sequence_key: str = self.sequence_key(chat_urn=chat_urn)
+        async with redis_session.pipeline(transaction=True) as pipeline:
+            pipeline.rpush(key, *[json.dumps(turn) for turn in turns])
+            pipeline.ltrim(key, -self.max_messages, -1)
+            pipeline.expire(key, self.ttl_seconds)
+            pipeline.incrby(sequence_key, len(turns))
+            pipeline.expire(sequence_key, self.ttl_seconds)
+            _, _, _, sequence, _ = await pipeline.execute()
+
+        return sequence
+
+    async def window(self, chat_urn: str, last_n: int = None) -> List[Dict[str, str]]:
+        """
+        Fetch the last ``last_n`` turns, oldest first. Defaults to the configured window.
+        """
+        last_n: int = last_n or self.window_messages
+        turns: List[bytes] = await redis_session.lrange(self.key(chat_urn=chat_urn), -last_n, -1)
+
+        return [json.loads(turn) for turn in turns]
+
+    async def since(self, chat_urn: str, sequence: Optional[int] = None, last_n: int = None) -> Tuple[int, bool, List[Dict[str, str]]]:
+        """
+        Fetch the turns appended after ``sequence``. When ``sequence`` is unknown, stale,
+        or further back than ``last_n`` turns, the full window is returned instead.
+
+        Returns:
+            Tuple[int, bool, List[Dict[str, str]]]: Current sequence, whether the turns are the
+            full window rather than a delta, and the turns oldest first.
+        """
+        last_n: int = last_n or self.window_messages
+        current_sequence, full, turns = await self.since_script(
+            keys=[self.key(chat_urn=chat_urn), self.sequence_key(chat_urn=chat_urn)],
+            args=[-1 if sequence is None else sequence, last_n]
+        )
+
+        return int(current_sequence), bool(full), [json.loads(turn) for turn in turns]
+
+    async def length(self, chat_urn: str) -> int:
+        return await redis_session.llen(self.key(chat_urn=chat_urn))
+
+    async def seed_many(self, conversations: Dict[str, List[Dict[str, str]]]) -> Dict[str, bool]:
+        """
+        Store each conversation only if the chat has no cached turns yet, in a single round-trip.
+
+        Returns:
+            Dict[str, bool]: Whether each chat was seeded.
+        """
+        conversations = {chat_urn: turns for chat_urn, turns in conversations.items() if turns}
+        if not conversations:
+            return {}
+
+        async with redis_session.pipeline(transaction=False) as pipeline:
+            for chat_urn, turns in conversations.items():
+                await self.seed_script(
+                    keys=[self.key(chat_urn=chat_urn), self.sequence_key(chat_urn=chat_urn)],
+                    args=[self.max_messages, self.ttl_seconds, *[json.dumps(turn) for turn in turns]],
+                    client=pipeline
+                )
+            results: List[int] = await pipeline.execute()
+
+        return {chat_urn: bool(result) for chat_urn, result in zip(conversations.keys(), results)}
+
+    async def delete(self, *chat_urns: str) -> int:
+
+        if not chat_urns:
+            return 0
+
+        async with redis_session.pipeline(transaction=False) as pipeline:
+            for chat_urn in chat_urns:
+                await self.clear_script(
+                    keys=[self.key(chat_urn=chat_urn), self.sequence_key(chat_urn=chat_urn)],
+                    args=[self.max_messages, self.ttl_seconds],
+                    client=pipeline
+                )
+            results: List[int] = await pipeline.execute()
+
+        return sum(results)
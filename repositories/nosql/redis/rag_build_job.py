@@ -0,0 +1,162 @@
+import json
+import time
+
+from typing_extensions import Any, Dict, Optional, Tuple
+from ulid import ulid
+
+from abstractions.repository import IRepository
+
+from constants.rag_build_status import RAGBuildStatus
+
+from start_utils import rag_configuration, redis_session
+
+
+class RAGBuildJobRepository(IRepository):
+    """
+    Status of background RAG builds, kept as a Redis hash per job.
+
+    A lock per chat holds the id and document hash of the build in progress, so
+    a second build for the same chat either joins the running job (same
+    document) or is refused (different document) until the first one finishes.
+    The running build renews the lock and its ``heartbeat_at`` every few
+    seconds; a lock whose job has finished, expired or stopped heartbeating
+    (its worker died) is taken over by the next build.
+    """
+
+    JOB_KEY: str = "rag:build:job:{job_id}"
+    LOCK_KEY: str = "rag:build:lock:{session_id}:{chat_urn}"
+
+    RELEASE_SCRIPT: str = """
+    local value = redis.call('GET', KEYS[1])
+    if value and cjson.decode(value)['job_id'] == ARGV[1] then
+        return redis.call('DEL', KEYS[1])
+    end
+    return 0
+    """
+
+    RENEW_SCRIPT: str = """
+    local value = redis.call('GET', KEYS[1])
+    if value and cjson.decode(value)['job_id'] == ARGV[1] then
+        return redis.call('EXPIRE', KEYS[1], ARGV[2])
+    end
+    return 0
+    """
+
+    def __init__(self, urn: str = None):
+        super().__init__(urn)
+        self.urn = urn
+        self.job_ttl_seconds = rag_configuration.build_job_ttl_seconds
+        self.lock_ttl_seconds = rag_configuration.build_lock_ttl_seconds
+        self.stale_seconds = rag_configuration.build_stale_seconds
+        self.release_script = redis_session.register_script(self.RELEASE_SCRIPT)
+        self.renew_script = redis_session.register_script(self.RENEW_SCRIPT)
+
+    def job_key(self, job_id: str) -> str:
+        return self.JOB_KEY.format(job_id=job_id)
+
+    def lock_key(self, session_id: str, chat_urn: str) -> str:
+        return self.LOCK_KEY.format(session_id=session_id, chat_urn=chat_urn)
+
+    async def create(self, session_id: str, chat_urn: str, document_hash: str) -> Tuple[str, bool, Optional[str]]:
+        """
+        Create a queued job unless a build is already running for the chat.
+
+        Returns:
+            Tuple[str, bool, Optional[str]]: The job id, whether it was created, and the
+            document hash of the running job when it was not.
+        """
+        job_id: str = str(ulid())
+        lock_key: str = self.lock_key(session_id=session_id, chat_urn=chat_urn)
+        acquired: bool = await redis_session.set(
+            lock_key,
+            json.dumps({"job_id": job_id, "document_hash": document_hash}),
+            nx=True,
+            ex=self.lock_ttl_seconds
+        )
+
+        if not acquired:
+            running = await redis_session.get(lock_key)
+            if running is None:
+                return await self.create(session_id=session_id, chat_urn=chat_urn, document_hash=document_hash)
+
+            running: Dict[str, str] = json.loads(running)
+            if not await self.stale(job_id=running.get("job_id")):
+                return running.get("job_id"), False, running.get("document_hash")
+
+            self.logger.warning(f"Taking over the build lock of stale rag build job: {running.get('job_id')}")
+            await self.update(
+                job_id=running.get("job_id"),
+                status=RAGBuildStatus.FAILED,
+                finished_at=time.time(),
+                error="The build worker stopped responding."
+            )
+            await self.release(session_id=session_id, chat_urn=chat_urn, job_id=running.get("job_id"))
+            return await self.create(session_id=session_id, chat_urn=chat_urn, document_hash=document_hash)
+
+        await self.update(
+            job_id=job_id,
+            session_id=session_id,
+            chat_urn=chat_urn,
+            document_hash=document_hash,
+            status=RAGBuildStatus.QUEUED,
+            created_at=time.time()
+        )
+
+        return job_id, True, None
+
+    async def update(self, job_id: str, **fields: Any) -> None:
+
+        key: str = self.job_key(job_id=job_id)
+        async with redis_session.pipeline(transaction=True) as pipeline:
+            pipeline.hset(key, mapping={name: json.dumps(value) for name, value in fields.items()})
+            pipeline.expire(key, self.job_ttl_seconds)
+            await pipeline.execute()
+
+        return None
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+
+        fields: Dict[Any, Any] = await redis_session.hgetall(self.job_key(job_id=job_id))
+        if not fields:
+            return None
+
+        return {
+            (name.decode("utf-8") if isinstance(name, bytes) else name): json.loads(value)
+            for name, value in fields.items()
+        }
+
+    async def stale(self, job_id: str) -> bool:
+        """
+        Whether the job holding a build lock will never release it: the job is
+        gone, has finished, or is running without a heartbeat for
+        ``stale_seconds``. Queued jobs are never stale, their task waits in the
+        broker.
+        """
+        job: Optional[Dict[str, Any]] = await self.get(job_id=job_id)
+        if job is None or job.get("status") in (RAGBuildStatus.SUCCEEDED, RAGBuildStatus.FAILED):
+            return True
+
+        if job.get("status") != RAGBuildStatus.RUNNING:
+            return False
+
+        return time.time() - (job.get("heartbeat_at") or job.get("started_at") or 0) > self.stale_seconds
+
+    async def heartbeat(self, session_id: str, chat_urn: str, job_id: str) -> bool:
+        """
+        Renew the build lock and the job's ``heartbeat_at``.
+
+        Returns:
+            bool: False when the lock is no longer held by ``job_id``.
+        """
+        renewed: bool = bool(await self.renew_script(
+            keys=[self.lock_key(session_id=session_id, chat_urn=chat_urn)],
+            args=[job_id, self.lock_ttl_seconds]
+        ))
+        if renewed:
+            await self.update(job_id=job_id, heartbeat_at=time.time())
+
+        return renewed
+
+    async def release(self, session_id: str, chat_urn: str, job_id: str) -> bool:
+
+        return bool(await self.release_script(keys=[self.lock_key(session_id=session_id, chat_urn=chat_urn)], args=[job_id]))
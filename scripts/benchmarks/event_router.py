@@ -0,0 +1,116 @@
+"""
+Micro-benchmark for websocket event dispatch.
+
+Compares the legacy linear regex scan with the EventRouter dict lookup for the
+event names the app actually dispatches. Run from the repository root:
+
+    python scripts/benchmarks/event_router.py --iterations 200000
+"""
+import argparse
+import asyncio
+import os
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from loguru import logger
+
+from utilities.event_router import EventRouter
+
+EVENT_PATTERNS = [
+    r'^message/text/image_generation$',
+    r'^message/text/text_generation$',
+    r'^message/text/code_generation$',
+    r'^message/text/rag/query$',
+    r'^message/image/captioning$',
+]
+
+EVENT_NAMES = [
+    "message/text/image_generation",
+    "message/text/text_generation",
+    "message/text/code_generation",
+    "message/text/rag/query",
+    "message/image/captioning",
+]
+
+
+def build_handler_class(patterns, register):
+
+    namespace = {}
+    for index, pattern in enumerate(patterns):
+
+        async def handler(cls, data: dict):
+            return None
+
+        handler.__name__ = f"handler_{index}"
+        handler.__qualname__ = f"BenchmarkEvent.handler_{index}"
+        namespace[handler.__name__] = register(pattern, handler)
+
+    return type("BenchmarkEvent", (), namespace)
+
+
+def legacy_resolve(event_registry, handler_classes, event_name):
+
+    for pattern, func in event_registry.items():
+        match = pattern.match(event_name)
+        if match:
+            class_name = func.__qualname__.split(".")[0]
+            return func, handler_classes.get(class_name), match.groupdict()
+    return None, None, {}
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=200000)
+    parser.add_argument("--extra-routes", type=int, default=0, help="Additional exact routes registered ahead of the real ones.")
+    arguments = parser.parse_args()
+
+    logger.remove()
+
+    patterns = [rf'^message/padding/route_{index}$' for index in range(arguments.extra_routes)] + EVENT_PATTERNS
+
+    event_registry = {}
+    def legacy_register(pattern, func):
+        event_registry[re.compile(pattern)] = func
+        return func
+    legacy_class = build_handler_class(patterns, legacy_register)
+    legacy_classes = {legacy_class.__name__: legacy_class}
+
+    event_router = EventRouter()
+    router_class = build_handler_class(patterns, lambda pattern, func: event_router.register(event_pattern=pattern, func=func))
+    event_router.bind({router_class.__name__: router_class})
+
+    total_events = arguments.iterations * len(EVENT_NAMES)
+
+    legacy_seconds = timeit.timeit(
+        lambda: [legacy_resolve(event_registry, legacy_classes, event_name) for event_name in EVENT_NAMES],
+        number=arguments.iterations
+    )
+    router_seconds = timeit.timeit(
+        lambda: [event_router.resolve(event_name) for event_name in EVENT_NAMES],
+        number=arguments.iterations
+    )
+
+    async def dispatch_all():
+        for _ in range(arguments.iterations):
+            for event_name in EVENT_NAMES:
+                await event_router.dispatch(event_name, data={})
+
+    loop = asyncio.new_event_loop()
+    start = timeit.default_timer()
+    loop.run_until_complete(dispatch_all())
+    dispatch_seconds = timeit.default_timer() - start
+    loop.close()
+
+    print(f"routes registered:        {len(patterns)}")
+    print(f"events resolved:          {total_events}")
+    print(f"legacy linear scan:       {legacy_seconds / total_events * 1e9:8.1f} ns/event")
+    print(f"router resolve:           {router_seconds / total_events * 1e9:8.1f} ns/event")
+    print(f"router dispatch (await):  {dispatch_seconds / total_events * 1e9:8.1f} ns/event")
+
+
+if __name__ == "__main__":
+    main()
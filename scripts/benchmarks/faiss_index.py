@@ -0,0 +1,112 @@
+"""
+Benchmark for RAG index types.
+
+Builds flat, HNSW and IVF (with the configured compression) indexes over
+synthetic clustered embeddings and reports build time, query latency,
+recall@k against exact flat search and serialized index size. Use it to pick
+the ``index_*`` thresholds in configs/rag. Run from the repository root:
+
+    python scripts/benchmarks/faiss_index.py --sizes 10000 50000 200000 --dim 768
+"""
+import argparse
+import os
+import sys
+import time
+
+import faiss
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from utilities.faiss_index import FAISSIndexUtility
+
+
+def generate_vectors(n_vectors: int, dim: int, n_clusters: int, seed: int) -> np.ndarray:
+
+    rng = np.random.default_rng(seed)
+    centroids = rng.normal(size=(n_clusters, dim)).astype(np.float32)
+    assignments = rng.integers(0, n_clusters, size=n_vectors)
+    vectors = centroids[assignments] + 0.3 * rng.normal(size=(n_vectors, dim)).astype(np.float32)
+
+    return np.ascontiguousarray(vectors, dtype=np.float32)
+
+
+def recall_at_k(ground_truth: np.ndarray, results: np.ndarray) -> float:
+
+    hits = sum(len(set(truth) & set(result)) for truth, result in zip(ground_truth, results))
+
+    return hits / ground_truth.size
+
+
+def measure(index_utility: FAISSIndexUtility, spec: str, vectors: np.ndarray, queries: np.ndarray, k: int, ground_truth: np.ndarray) -> dict:
+
+    start = time.perf_counter()
+    index = faiss.index_factory(vectors.shape[1], spec, faiss.METRIC_L2)
+    if not index.is_trained:
+        index.train(vectors)
+    index.add(vectors)
+    index = index_utility.configure(index=index)
+    build_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    _, results = index.search(queries, k)
+    query_ms = (time.perf_counter() - start) * 1000 / len(queries)
+
+    return {
+        "spec": spec,
+        "build_s": build_seconds,
+        "query_ms": query_ms,
+        "recall": recall_at_k(ground_truth=ground_truth, results=results),
+        "size_mb": index_utility.memory_bytes(index=index) / 1024 / 1024
+    }
+
+
+def main() -> None:
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 50000, 200000])
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=6)
+    parser.add_argument("--clusters", type=int, default=256)
+    parser.add_argument("--hnsw-m", type=int, default=32)
+    parser.add_argument("--ef-search", type=int, default=64)
+    parser.add_argument("--nprobe", type=int, default=16)
+    parser.add_argument("--compression", nargs="+", default=["Flat", "SQ8", "PQ32"])
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    index_utility = FAISSIndexUtility(
+        flat_max_vectors=0,
+        hnsw_max_vectors=0,
+        hnsw_m=args.hnsw_m,
+        hnsw_ef_search=args.ef_search,
+        ivf_nprobe=args.nprobe
+    )
+
+    print(f"{'vectors':>9} {'index':<16} {'build s':>9} {'query ms':>9} {'recall@' + str(args.k):>9} {'size MB':>9}")
+    for n_vectors in args.sizes:
+
+        vectors = generate_vectors(n_vectors=n_vectors, dim=args.dim, n_clusters=args.clusters, seed=args.seed)
+        queries = generate_vectors(n_vectors=args.queries, dim=args.dim, n_clusters=args.clusters, seed=args.seed + 1)
+
+        exact = faiss.IndexFlatL2(args.dim)
+        exact.add(vectors)
+        _, ground_truth = exact.search(queries, args.k)
+
+        nlist = index_utility.nlist(n_vectors=n_vectors)
+        specs = ["Flat", f"HNSW{args.hnsw_m}"] + [f"IVF{nlist},{compression}" for compression in args.compression]
+        for spec in specs:
+            result = measure(
+                index_utility=index_utility,
+                spec=spec,
+                vectors=vectors,
+                queries=queries,
+                k=args.k,
+                ground_truth=ground_truth
+            )
+            print(f"{n_vectors:>9} {result['spec']:<16} {result['build_s']:>9.2f} {result['query_ms']:>9.3f} {result['recall']:>9.3f} {result['size_mb']:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Benchmark for hybrid (dense + BM25) retrieval.
+
+Runs every query of a JSONL file against a built vector store, once with dense
+FAISS search only and once with reciprocal rank fusion of dense and keyword
+search, and reports hit rate@k and the latency each adds on top of the query
+embedding. A query is a hit when one of the retrieved chunks contains its
+``expected`` text. Each line of the queries file looks like:
+
+    {"query": "What does error E1042 mean?", "expected": "E1042"}
+
+Run from the repository root (needs GOOGLE_API_KEY for the query embeddings):
+
+    python scripts/benchmarks/hybrid_retrieval.py --vector-store vector_store/<session>_<chat>_vector_store --queries queries.jsonl
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+import faiss
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from dotenv import load_dotenv
+from langchain_community.vectorstores import FAISS
+from langchain_google_genai import GoogleGenerativeAIEmbeddings
+from loguru import logger
+
+from configurations.rag import RAGConfiguration
+
+from utilities.docstore import SQLiteDocstore
+from utilities.hybrid_retriever import HybridRetriever
+
+
+def is_hit(documents, expected: str) -> bool:
+    return any(expected.lower() in document.page_content.lower() for document in documents)
+
+
+def percentile(samples, fraction: float) -> float:
+    return sorted(samples)[min(len(samples) - 1, int(len(samples) * fraction))]
+
+
+def main() -> None:
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--vector-store", required=True, help="Directory holding index.faiss and docstore.sqlite3.")
+    parser.add_argument("--queries", required=True, help="JSONL file of {\"query\", \"expected\"} objects.")
+    parser.add_argument("--k", type=int, default=6)
+    parser.add_argument("--fetch-k", type=int, default=20)
+    parser.add_argument("--rrf-k", type=int, default=60)
+    arguments = parser.parse_args()
+
+    logger.remove()
+    load_dotenv()
+
+    embeddings = GoogleGenerativeAIEmbeddings(
+        model=RAGConfiguration().get_config().embedding_model,
+        google_api_key=os.getenv("GOOGLE_API_KEY")
+    )
+    docstore = SQLiteDocstore(path=os.path.join(arguments.vector_store, SQLiteDocstore.FILE_NAME))
+    vector_store = FAISS(
+        embedding_function=embeddings,
+        index=faiss.read_index(os.path.join(arguments.vector_store, "index.faiss"), faiss.IO_FLAG_READ_ONLY),
+        docstore=docstore,
+        index_to_docstore_id=docstore.index_to_docstore_id()
+    )
+    retriever = HybridRetriever(
+        vector_store=vector_store,
+        max_position=docstore.next_position(),
+        k=arguments.k,
+        fetch_k=arguments.fetch_k,
+        rrf_k=arguments.rrf_k
+    )
+
+    with open(arguments.queries) as queries_file:
+        queries = [json.loads(line) for line in queries_file if line.strip()]
+
+    hits = {"dense": 0, "hybrid": 0}
+    latencies = {"embedding": [], "dense": [], "hybrid": []}
+    for query in queries:
+
+        start = time.perf_counter()
+        embedding = embeddings.embed_query(query["query"])
+        latencies["embedding"].append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        ids = retriever.dense_search(embedding=embedding)[:arguments.k]
+        dense_documents = [docstore.search(id) for id in ids]
+        latencies["dense"].append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        hybrid_documents = retriever.retrieve(query=query["query"], embedding=embedding)
+        latencies["hybrid"].append(time.perf_counter() - start)
+
+        hits["dense"] += is_hit(documents=dense_documents, expected=query["expected"])
+        hits["hybrid"] += is_hit(documents=hybrid_documents, expected=query["expected"])
+
+    print(f"{len(queries)} queries, {vector_store.index.ntotal} chunks, k={arguments.k}")
+    print(f"{'':<10} {'hit@' + str(arguments.k):>8} {'mean ms':>9} {'p95 ms':>9}")
+    for name in ("embedding", "dense", "hybrid"):
+        hit_rate = f"{hits[name] / len(queries):.3f}" if name in hits else "-"
+        mean_ms = statistics.mean(latencies[name]) * 1000
+        p95_ms = percentile(latencies[name], 0.95) * 1000
+        print(f"{name:<10} {hit_rate:>8} {mean_ms:>9.2f} {p95_ms:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Backfill of ``chat.messages_by_user`` and ``chat.chats_by_user`` from
+``chat.messages``.
+
+Pages through every message and writes one copy per participant (sender and
+receiver, as ``MessagesRepository.create_record`` does), keeping the
+remaining TTL of the source row, and upserts the participant's chat row with
+the message time as write time, so the latest message of each chat wins. Rows are keyed by the message's primary key,
+so the script is idempotent and safe to re-run while the app is writing. Run
+from the repository root, after ``migrate.py``:
+
+    python scripts/nosql/cassandra/backfill_messages_by_user.py --page-size 500 --concurrency 50
+"""
+import argparse
+import os
+import sys
+
+from datetime import timezone
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "..")))
+
+from cassandra.concurrent import execute_concurrent_with_args
+from cassandra.query import SimpleStatement
+from dotenv import load_dotenv
+from loguru import logger
+
+from models.nosql.cassandra.chats_by_user import ChatsByUser
+from models.nosql.cassandra.messages import Messages
+from models.nosql.cassandra.messages_by_user import MessagesByUser
+
+from utilities.cassandra import CassandraUtility
+
+COPIED_COLUMNS = [
+    "urn",
+    "chat_urn",
+    "time_stamp",
+    "chat_type",
+    "text",
+    "sender_urn",
+    "receiver_urn",
+    "sender_name",
+    "receiver_name",
+    "message_type",
+    "metadata",
+    "is_deleted",
+    "is_read",
+    "priority",
+]
+
+
+def main() -> None:
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--page-size", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=50)
+    arguments = parser.parse_args()
+
+    load_dotenv()
+    cassandra_utility = CassandraUtility(
+        hosts=[os.getenv("CASSANDRA_HOST")],
+        keyspace=os.getenv("CASSANDRA_DEFAULT_KEYSPACE"),
+        username=os.getenv("CASSANDRA_USER"),
+        password=os.getenv("CASSANDRA_PASSWORD")
+    )
+    session = cassandra_utility.session()
+
+    try:
+
+        select_statement = SimpleStatement(
+            f"SELECT {', '.join(COPIED_COLUMNS)}, TTL(text) AS ttl FROM {Messages.column_family_name()}",
+            fetch_size=arguments.page_size
+        )
+        columns = ["user_urn", *COPIED_COLUMNS]
+        insert_statement = session.prepare(
+            f"INSERT INTO {MessagesByUser.column_family_name()} ({', '.join(columns)}) "
+            f"VALUES ({', '.join('?' for _ in columns)}) USING TTL ?"
+        )
+        chat_insert_statement = session.prepare(
+            f"INSERT INTO {ChatsByUser.column_family_name()} (user_urn, chat_type, chat_urn, last_message_at) "
+            "VALUES (?, ?, ?, ?) USING TTL ? AND TIMESTAMP ?"
+        )
+
+        messages_count, copies_count = 0, 0
+        result = session.execute(select_statement)
+        while True:
+
+            parameters, chat_parameters = [], []
+            for row in result.current_rows:
+                row["chat_type"] = row["chat_type"] or ""
+                write_time = int(row["time_stamp"].replace(tzinfo=timezone.utc).timestamp() * 1_000_000)
+                for user_urn in dict.fromkeys(user_urn for user_urn in (row["sender_urn"], row["receiver_urn"]) if user_urn):
+                    parameters.append((user_urn, *(row[column] for column in COPIED_COLUMNS), row["ttl"] or 0))
+                    chat_parameters.append((user_urn, row["chat_type"], row["chat_urn"], row["time_stamp"], row["ttl"] or 0, write_time))
+
+            for statement, statement_parameters in ((insert_statement, parameters), (chat_insert_statement, chat_parameters)):
+                execute_concurrent_with_args(
+                    session,
+                    statement,
+                    statement_parameters,
+                    concurrency=arguments.concurrency,
+                    raise_on_first_error=True
+                )
+            messages_count += len(result.current_rows)
+            copies_count += len(parameters)
+            logger.info(f"Backfilled {messages_count} messages, {copies_count} rows")
+
+            if not result.has_more_pages:
+                break
+            result.fetch_next_page()
+
+        logger.info(f"Backfill complete: {messages_count} messages, {copies_count} rows written to {MessagesByUser.column_family_name()} and {ChatsByUser.column_family_name()}")
+
+    finally:
+
+        cassandra_utility.shutdown()
+
+
+if __name__ == "__main__":
+    main()
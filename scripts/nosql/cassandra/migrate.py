@@ -0,0 +1,69 @@
+"""
+Cassandra schema migration.
+
+Creates the keyspaces of the cqlengine models and syncs their tables and
+indexes. The app no longer changes the schema at runtime, so run this once per
+deploy, before starting the app and the Celery workers. Run from the
+repository root:
+
+    python scripts/nosql/cassandra/migrate.py --replication-factor 3
+"""
+import argparse
+import os
+import sys
+
+os.environ.setdefault("CQLENG_ALLOW_SCHEMA_MANAGEMENT", "1")
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "..")))
+
+from cassandra.cqlengine.management import create_keyspace_simple, sync_table
+from dotenv import load_dotenv
+from loguru import logger
+
+from models.nosql.cassandra.chats_by_user import ChatsByUser
+from models.nosql.cassandra.messages import Messages
+from models.nosql.cassandra.messages_by_user import MessagesByUser
+
+from utilities.cassandra import CassandraUtility
+
+MODELS = [
+    Messages,
+    MessagesByUser,
+    ChatsByUser,
+]
+
+
+def main() -> None:
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--replication-factor", type=int, default=3)
+    arguments = parser.parse_args()
+
+    load_dotenv()
+    cassandra_utility = CassandraUtility(
+        hosts=[os.getenv("CASSANDRA_HOST")],
+        keyspace=os.getenv("CASSANDRA_DEFAULT_KEYSPACE"),
+        username=os.getenv("CASSANDRA_USER"),
+        password=os.getenv("CASSANDRA_PASSWORD")
+    )
+    cassandra_utility.connect()
+
+    try:
+
+        for keyspace in sorted({model.__keyspace__ for model in MODELS}):
+            logger.info(f"Creating keyspace: {keyspace}")
+            create_keyspace_simple(keyspace, replication_factor=arguments.replication_factor)
+
+        for model in MODELS:
+            logger.info(f"Syncing table: {model.column_family_name()}")
+            sync_table(model)
+
+        logger.info("Cassandra schema is up to date")
+
+    finally:
+
+        cassandra_utility.shutdown()
+
+
+if __name__ == "__main__":
+    main()
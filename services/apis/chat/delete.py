@@ -7,8 +7,7 @@ from constants.api_status import APIStatus
 from dtos.responses.base import BaseResponseDTO
 
 from repositories.nosql.cassandra.messages import MessagesRepository
-
-from start_utils import redis_session
+from repositories.nosql.redis.conversation import ConversationRepository
 
 from utilities.websockets import WebsocketUtility
 
@@ -21,6 +20,7 @@ class DeleteChatService(IService):
         super().__init__(urn, **kwargs)
         
         self.messages_repository = MessagesRepository(urn=self.urn)
+        self.conversation_repository = ConversationRepository(urn=self.urn)
         self.websocket_utility = WebsocketUtility(urn=self.urn)
         self.logger.debug("Initializing Ftech chats API service")
     
@@ -34,13 +34,9 @@ class DeleteChatService(IService):
             )
             self.logger.debug(f"Deleted chat with chat urn: {chat_urn}")
 
-            if redis_session.exists(chat_urn):
-                self.logger.debug("Chat exists in cache")
-
-                self.logger.debug("Deleting chat from cache")
-                redis_session.delete(chat_urn)
+            self.logger.debug("Deleting chat from cache")
+            if await self.conversation_repository.delete(chat_urn):
                 self.logger.debug("Chat successfully deleted from cache")
-
             else:
                 self.logger.debug("Chat does not exist in cache")
 
@@ -1,9 +1,8 @@
-import json
-import pandas as pd
-import numpy as np
+import asyncio
 
+from http import HTTPStatus
 from langchain_core.messages import AIMessage, HumanMessage
-from typing import Any, List, Dict
+from typing import Any, List, Dict, Optional, Tuple
 
 from abstractions.service import IService
 
@@ -11,10 +10,17 @@ from constants.api_status import APIStatus
 
 from dtos.responses.base import BaseResponseDTO
 
-from repositories.nosql.cassandra.messages import Messages, MessagesRepository
+from errors.bad_input_error import BadInputError
 
-from start_utils import AI_USER_URN, redis_session
+from models.nosql.cassandra.chats_by_user import ChatsByUser
+from models.nosql.cassandra.messages_by_user import MessagesByUser
 
+from repositories.nosql.cassandra.messages import MessagesRepository
+from repositories.nosql.redis.conversation import ConversationRepository
+
+from start_utils import AI_USER_URN, SECRET_KEY
+
+from utilities.cursor import CursorUtility
 from utilities.websockets import WebsocketUtility
 
 
@@ -26,10 +32,25 @@ class FetchChatsService(IService):
         super().__init__(urn, **kwargs)
         
         self.messages_repository = MessagesRepository(urn=self.urn)
+        self.conversation_repository = ConversationRepository(urn=self.urn)
         self.websocket_utility = WebsocketUtility(urn=self.urn)
+        self.cursor_utility = CursorUtility(secret_key=SECRET_KEY, urn=self.urn)
         self.logger.debug("Initializing Ftech chats API service")
 
-    def serialize_message(self, message: Messages, user_urn: str) -> dict:
+    def decode_cursor(self, cursor: Optional[str], **scope: str) -> Optional[bytes]:
+
+        try:
+            return self.cursor_utility.decode(cursor, **scope)
+
+        except ValueError as err:
+            self.logger.error(f"Rejected cursor: {err}")
+            raise BadInputError(
+                response_message="Invalid or expired cursor.",
+                response_key="error_invalid_cursor",
+                http_status_code=HTTPStatus.BAD_REQUEST
+            )
+
+    def serialize_message(self, message: MessagesByUser, user_urn: str) -> dict:
         """
         Serialize a Messages object to a dictionary that can be returned as JSON.
         """
@@ -44,8 +65,8 @@ class FetchChatsService(IService):
             "sender_name": message.sender_name,
             "receiver_name": message.receiver_name,
             "message_type": message.message_type,
-            "chat_type": message.chat_type,
-            **message.metadata
+            "chat_type": message.chat_type or None,
+            **(message.metadata or {})
         }
 
     async def build_conversation(self, messages: List[Dict[str, str]]):
@@ -69,58 +90,104 @@ class FetchChatsService(IService):
         self.logger.debug("Prepared conversation.")
         return conversation
     
-    async def fetch_chats(self, user_urn: str, chat_type: str = None):
-        messages = self.messages_repository.fetch_user_messages(
+    async def fetch_messages_page(
+        self,
+        user_urn: str,
+        chat_type: Optional[str],
+        chat_urn: str,
+        page_size: int,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        Fetch one page of a chat's messages, oldest first within the page. The
+        returned cursor continues with the page of older messages.
+        """
+
+        scope: Dict[str, str] = {"kind": "messages", "user_urn": user_urn, "chat_type": chat_type or "", "chat_urn": chat_urn}
+        paging_state: Optional[bytes] = self.decode_cursor(cursor, **scope)
+
+        self.logger.debug(f"Fetching messages page for chat_urn: {chat_urn}")
+        messages, next_paging_state = await self.messages_repository.fetch_chat_messages(
             user_urn=user_urn,
-            chat_type=chat_type
+            chat_type=chat_type,
+            chat_urn=chat_urn,
+            page_size=page_size,
+            paging_state=paging_state
         )
+        self.logger.debug(f"Fetched messages page for chat_urn: {chat_urn}")
 
-        chats = {}
-        if messages:
-
-            self.logger.debug("Serialising merssages")
-            serialized_messages = [self.serialize_message(message, user_urn) for message in messages]
-            self.logger.debug("Serialised merssages")
-
-            self.logger.debug("Fetching chat groups")
-            df = pd.DataFrame(data=serialized_messages)
-            df = df.replace({np.nan: None})
-            group_by_gen = df.groupby(["chat_urn"])
-
-            chats = {}
-            for group_id, df_group in group_by_gen:
-                
-                self.logger.debug("Fetching chat urn")
-                chat_urn: str = str(group_id[0])
-                self.logger.debug("Fetched chat urn")
-
-                self.logger.debug(f"Preparing chat with chat_urn: {chat_urn}")
-                df_group_sorted = df_group.sort_values(by='timestamp', ascending=True)
-                df_group_sorted.fillna(value="")
-                messages: List[Dict[str, str]] = df_group_sorted.to_dict("records")
-                chats[chat_urn] = {
-                    "urn": messages[0].get("chat_urn", ""),
-                    "messageKey": messages[0].get("chat_urn", ""),
-                    "timestamp": messages[0].get("timestamp", ""),
-                    "messages": messages,
-                    "chatType": messages[0].get("chat_type", "")
-                }
-                self.logger.debug(f"Prepared chat with chat_urn: {chat_urn}")
-                
-                if not redis_session.exists(chat_urn):
-                    self.logger.debug("Converstaion does not exist in cache")
-
-                    self.logger.debug("Build conversation")
-                    conversation = await self.build_conversation(messages=messages)
-                    redis_session.set(chat_urn, json.dumps(conversation))
-                    self.logger.debug("Built conversation")
-                
-                else:
+        serialized_messages = [self.serialize_message(message, user_urn) for message in reversed(messages)]
+
+        return serialized_messages, self.cursor_utility.encode(next_paging_state, **scope)
+
+    async def fetch_chats(
+        self,
+        user_urn: str,
+        chat_type: str = None,
+        page_size: int = 20,
+        messages_page_size: int = 50,
+        cursor: Optional[str] = None
+    ) -> Tuple[Dict[str, Dict[str, Any]], Optional[str]]:
+        """
+        Fetch one page of the user's chats, each with its latest page of
+        messages and the cursor of its older messages. The message pages are
+        read concurrently. Chats come in chat type and chat urn order, which
+        keeps the cursor stable; clients sort by ``lastMessageAt`` for recency.
+        """
+
+        scope: Dict[str, str] = {"kind": "chats", "user_urn": user_urn, "chat_type": chat_type or ""}
+        paging_state: Optional[bytes] = self.decode_cursor(cursor, **scope)
+
+        self.logger.debug("Fetching chats page")
+        chat_rows: List[ChatsByUser]
+        chat_rows, next_paging_state = await self.messages_repository.fetch_user_chats(
+            user_urn=user_urn,
+            chat_type=chat_type,
+            page_size=page_size,
+            paging_state=paging_state
+        )
+        self.logger.debug(f"Fetched {len(chat_rows)} chats")
+
+        self.logger.debug(f"Fetching messages pages for {len(chat_rows)} chats")
+        pages: List[Tuple[List[Dict[str, Any]], Optional[str]]] = await asyncio.gather(*(
+            self.fetch_messages_page(
+                user_urn=user_urn,
+                chat_type=chat.chat_type,
+                chat_urn=chat.chat_urn,
+                page_size=messages_page_size
+            )
+            for chat in chat_rows
+        ))
+        self.logger.debug(f"Fetched messages pages for {len(chat_rows)} chats")
+
+        chats: Dict[str, Dict[str, Any]] = {}
+        conversations: Dict[str, List[Dict[str, str]]] = {}
+        for chat, (messages, messages_cursor) in zip(chat_rows, pages):
+
+            self.logger.debug(f"Preparing chat with chat_urn: {chat.chat_urn}")
+            last_message_at: Optional[str] = chat.last_message_at.isoformat() if chat.last_message_at else None
+            chats[chat.chat_urn] = {
+                "urn": chat.chat_urn,
+                "messageKey": chat.chat_urn,
+                "timestamp": messages[0].get("timestamp") if messages else last_message_at,
+                "lastMessageAt": last_message_at,
+                "messages": messages,
+                "chatType": chat.chat_type or None,
+                "nextCursor": messages_cursor
+            }
+            self.logger.debug(f"Prepared chat with chat_urn: {chat.chat_urn}")
+
+            self.logger.debug("Build conversation")
+            conversations[chat.chat_urn] = await self.build_conversation(messages=messages)
+            self.logger.debug("Built conversation")
+
+        if conversations:
 
-                    self.logger.debug("Converstaion already exists in cache")
-                    pass
+            self.logger.debug("Caching conversations missing from cache")
+            cached: Dict[str, bool] = await self.conversation_repository.seed_many(conversations=conversations)
+            self.logger.debug(f"Cached {sum(cached.values())} of {len(cached)} conversations")
 
-        return chats
+        return chats, self.cursor_utility.encode(next_paging_state, **scope)
 
     async def run(self, data: dict) -> dict:
             
@@ -129,18 +196,27 @@ class FetchChatsService(IService):
             self.logger.debug("Fetching user urn")
             user_urn: str = data.get("user_urn")
             chat_type: str = data.get("chat_type")
+            page_size: int = data.get("page_size")
+            messages_page_size: int = data.get("messages_page_size")
             self.logger.debug("Fetching user urn")
 
-            self.logger.debug("Fetching messages")
-            messages: List[Dict[str, str]] = await self.fetch_chats(
+            self.logger.debug("Fetching chats")
+            chats, next_cursor = await self.fetch_chats(
                 user_urn=user_urn,
-                chat_type=chat_type
+                chat_type=chat_type,
+                page_size=page_size,
+                messages_page_size=messages_page_size,
+                cursor=data.get("cursor")
             )
 
             self.logger.debug("Preparing Fetch Chats response DTO")
             response_payload = {
-                "chats": messages,
-                "user_urn": user_urn
+                "chats": chats,
+                "user_urn": user_urn,
+                "page_size": page_size,
+                "messages_page_size": messages_page_size,
+                "next_cursor": next_cursor,
+                "has_more": next_cursor is not None
             }
             response_dto: BaseResponseDTO = BaseResponseDTO(
                 transaction_urn=self.urn,
@@ -153,6 +229,11 @@ class FetchChatsService(IService):
 
             return response_dto
 
+        except BadInputError as err:
+
+            self.logger.error(f"Rejected fetch chats request: {err.response_message}")
+            raise err
+
         except Exception as err:
 
             self.logger.error(f"Exception occurred while running ftech chats service: {err}")
@@ -0,0 +1,78 @@
+from typing import Any, List, Dict
+
+from constants.api_status import APIStatus
+
+from dtos.responses.base import BaseResponseDTO
+
+from errors.bad_input_error import BadInputError
+
+from services.apis.chat.fetch import FetchChatsService
+
+
+class FetchChatMessagesService(FetchChatsService):
+    """
+    Pages back through one chat's history with the ``nextCursor`` returned for
+    the chat by the fetch chats API.
+    """
+
+    def __init__(self, urn: str, **kwargs: Any) -> 'FetchChatMessagesService':
+
+        self.urn = urn
+        super().__init__(urn, **kwargs)
+        self.logger.debug("Initializing Fetch chat messages API service")
+
+    async def run(self, data: dict) -> dict:
+
+        try:
+
+            self.logger.debug("Fetching user urn and chat urn")
+            user_urn: str = data.get("user_urn")
+            chat_urn: str = data.get("chat_urn")
+            chat_type: str = data.get("chat_type")
+            page_size: int = data.get("page_size")
+            self.logger.debug("Fetched user urn and chat urn")
+
+            self.logger.debug("Fetching messages")
+            messages: List[Dict[str, Any]]
+            messages, next_cursor = await self.fetch_messages_page(
+                user_urn=user_urn,
+                chat_type=chat_type,
+                chat_urn=chat_urn,
+                page_size=page_size,
+                cursor=data.get("cursor")
+            )
+            self.logger.debug(f"Fetched {len(messages)} messages")
+
+            self.logger.debug("Preparing Fetch Chat Messages response DTO")
+            response_payload = {
+                "messages": messages,
+                "user_urn": user_urn,
+                "chat_urn": chat_urn,
+                "page_size": page_size,
+                "next_cursor": next_cursor,
+                "has_more": next_cursor is not None
+            }
+            response_dto: BaseResponseDTO = BaseResponseDTO(
+                transaction_urn=self.urn,
+                status=APIStatus.SUCCESS,
+                response_message="Successfully fetched chat messages.",
+                response_key="success_fetch_chat_messages",
+                data=response_payload
+            )
+            self.logger.debug("Prepared Fetch Chat Messages response DTO")
+
+            return response_dto
+
+        except BadInputError as err:
+
+            self.logger.error(f"Rejected fetch chat messages request: {err.response_message}")
+            raise err
+
+        except Exception as err:
+
+            self.logger.error(f"Exception occurred while running fetch chat messages service: {err}")
+            raise err
+
+        finally:
+
+            self.logger.debug("Completed fetch Chat Messages Service")
@@ -1,4 +1,3 @@
-import json
 import random
 
 from typing import Any, List, Dict
@@ -12,8 +11,9 @@ from dtos.responses.base import BaseResponseDTO
 
 from repositories.nosql.cassandra.messages import MessagesRepository
 
-from start_utils import redis_session, websockets_store
+from start_utils import websocket_registry
 
+from utilities.cache import CacheUtility
 from utilities.websockets import WebsocketUtility
 
 
@@ -26,12 +26,13 @@ class MatchUsersChatService(IService):
         
         self.messages_repository = MessagesRepository(urn=self.urn)
         self.websocket_utility = WebsocketUtility(urn=self.urn)
+        self.cache_utility = CacheUtility(urn=self.urn)
         self.logger.debug("Initializing Ftech chats API service")
     
     async def match(self, user_urn: str) -> bool:
 
         self.logger.debug("Fetching available wesocket connections")
-        available_keys = [key for key in websockets_store.keys() if key != user_urn]
+        available_keys = [key for key in await websocket_registry.sessions() if key != user_urn]
         self.logger.debug("Fetched available wesocket connections")
 
         self.logger.debug("Matching with random connection")
@@ -55,11 +56,7 @@ class MatchUsersChatService(IService):
 
             self.logger.debug("Loading conversation from session")
             chat_urn: str = ulid()
-            conversations = redis_session.get(chat_urn)
-            if conversations is None:
-                conversations = {}
-            else:
-                conversations: Dict[str, str] = json.loads(conversations)
+            conversations: Dict[str, str] = await self.cache_utility.get_json(chat_urn, default={})
             self.logger.debug("Loaded conversation from session")
 
             self.logger.debug("Match users")
@@ -77,7 +74,7 @@ class MatchUsersChatService(IService):
                     }
                 }
             )
-            redis_session.setex(chat_urn, 24*60*60, json.dumps(conversations))
+            await self.cache_utility.set_json(chat_urn, conversations, ttl=24*60*60)
             self.logger.debug("Updated converstaion store")
 
             self.logger.debug("Preparing match users response DTO")
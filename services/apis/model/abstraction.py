@@ -1,49 +1,71 @@
+import asyncio
 import base64
 import io
 import os
 import re
-import time
 
 from datetime import datetime
 from fastapi import WebSocket
-from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
 from gtts import gTTS
 from PIL import Image
 from openai import RateLimitError
 from google.api_core.exceptions import ResourceExhausted
-from typing import Any, List, Dict, Union
+from typing import Any, BinaryIO, List, Dict, Union
 
 from abstractions.service import IService
 
-from repositories.nosql.cassandra.messages import Messages, MessagesRepository
+from constants.websocket_event import WebsocketEvent
 
-from start_utils import conversation_llm, speech_recognition, speech_recognizer, gradio_flux_client
+from errors.service_busy_error import ServiceBusyError
 
+from repositories.nosql.redis.conversation import ConversationRepository
+
+from start_utils import chat_context_builder, conversation_llm, inference_scheduler, message_journal, speech_recognition, speech_recognizer, gradio_flux_client
+
+from utilities.llm import LLMUtility
 from utilities.websockets import WebsocketUtility
 
 
 class IModelService(IService):
 
-    def __init__(self, urn: str, **kwargs: Any) -> 'IModelService':
+    def __init__(self, urn: str, priority: int = 0, **kwargs: Any) -> 'IModelService':
 
         self.urn = urn
         super().__init__(urn, **kwargs)
+        self.priority = priority
         
-        self.messages_repository = MessagesRepository(urn=self.urn)
+        self.pending_message_writes: List[asyncio.Task] = []
+        self.conversation_repository = ConversationRepository(urn=self.urn)
         self.websocket_utility = WebsocketUtility(urn=self.urn)
+        self.llm_utility = LLMUtility(urn=self.urn, priority=self.priority)
         self.logger.debug("Initializing Initiate Chat API service")
 
 
-    async def build_chat(self, conversation: List[Dict[str, str]]):
+    async def build_chat(self, chat_urn: str, prompt: str, instructions: List[str]) -> List[BaseMessage]:
+        """
+        Build the llm input for ``prompt`` from the cached chat context, reading only
+        the turns stored since the previous build and trimming to the token budget.
+        """
+        self.logger.debug("Loading conversation turns from session")
+        base_sequence = chat_context_builder.sequence(chat_urn=chat_urn)
+        sequence, full, turns = await self.conversation_repository.since(
+            chat_urn=chat_urn,
+            sequence=base_sequence
+        )
+        if not chat_context_builder.update(chat_urn=chat_urn, base_sequence=base_sequence, sequence=sequence, full=full, turns=turns):
+            self.logger.debug("Chat context changed concurrently, reloading conversation window")
+            sequence, full, turns = await self.conversation_repository.since(chat_urn=chat_urn)
+            chat_context_builder.update(chat_urn=chat_urn, base_sequence=None, sequence=sequence, full=full, turns=turns)
+        self.logger.debug(f"Loaded {len(turns)} conversation turns from session")
 
-        chat = []
         self.logger.debug("Preparing chat.")
-        for message in conversation:
-            if "ai" in message:
-                chat.append(AIMessage(content=message.get("ai", "")))
-            else:
-                chat.append(HumanMessage(content=message.get("human", "")))
-        self.logger.debug("Prepared chat.")
+        chat: List[BaseMessage] = chat_context_builder.build(
+            chat_urn=chat_urn,
+            pending=[HumanMessage(content=prompt)],
+            instructions=[HumanMessage(content=instruction) for instruction in instructions]
+        )
+        self.logger.debug(f"Prepared chat with {len(chat)} messages.")
 
         return chat
     
@@ -52,7 +74,10 @@ class IModelService(IService):
         self.logger.debug("Invoking chat llm")
         try:
             
-            ai_message: AIMessage = conversation_llm.invoke(chat)
+            ai_message: AIMessage = await self.llm_utility.invoke(
+                runnable=conversation_llm,
+                input=chat
+            )
             self.logger.debug("Invoked chat llm")
             
             self.logger.debug("Extracting message content")
@@ -61,22 +86,94 @@ class IModelService(IService):
 
             return message
         
+        except ServiceBusyError:
+            self.logger.error("LLM backend is busy")
+            raise
+
         except (RateLimitError, ResourceExhausted):
             self.logger.error("RateLimitError occured while invoking llm")
             return "You exceeded your current quota, please check your plan and billing details. For more information on this error, read the docs: https://platform.openai.com/docs/guides/error-codes/api-errors."
+
+        except asyncio.TimeoutError:
+            self.logger.error("Timed out while invoking llm")
+            return "The model took too long to respond, please try again."
         
         except Exception as err:
             self.logger.error(f"Error occured while invoking llm: {type(err), err}")
             
             return "Unexpected Error occured while invoking llm."
 
-    async def transcribe_audio_message(self, input_file_path: str) -> str:
+    async def stream_conversation_model(self, chat: List[Union[AIMessage, HumanMessage]], session_id: str = None) -> str:
+        """
+        Stream the conversation llm response, forwarding every token as a partial websocket event.
+
+        Returns:
+            str: The full response text once the stream is exhausted. A stream cut
+            off by a timeout or error returns the text received so far, ending
+            with a marker saying it was interrupted, so the stored history and
+            later context never pass a fragment off as a complete answer.
+        """
+        self.logger.debug("Streaming chat llm")
+        chunks: List[str] = []
+        try:
+
+            async for ai_message_chunk in self.llm_utility.stream(
+                runnable=conversation_llm,
+                input=chat
+            ):
+
+                token: str = ai_message_chunk.content if getattr(ai_message_chunk, "content", None) else ""
+                if not token:
+                    continue
+                chunks.append(token)
+
+                if session_id:
+
+                    event_data: List[Dict[str, str]] = [
+                        {
+                            "event": WebsocketEvent.PARTIAL,
+                            "text": token,
+                            "sender_name": "ai",
+                            "message_type": "text",
+                            "timestamp": f"{str(datetime.now().time().hour)}:{str(datetime.now().time().minute)}"
+                        }
+                    ]
+                    await self.websocket_utility.send_json(
+                        session_id=session_id,
+                        event_data=event_data
+                    )
+
+            self.logger.debug("Streamed chat llm")
+
+            return "".join(chunks)
+
+        except ServiceBusyError:
+            self.logger.error("LLM backend is busy")
+            raise
+
+        except (RateLimitError, ResourceExhausted):
+            self.logger.error("RateLimitError occured while streaming llm")
+            return "You exceeded your current quota, please check your plan and billing details. For more information on this error, read the docs: https://platform.openai.com/docs/guides/error-codes/api-errors."
+
+        except asyncio.TimeoutError:
+            self.logger.error("Timed out while streaming llm")
+            if chunks:
+                return f"{''.join(chunks)} [Response interrupted: the model took too long to respond.]"
+            return "The model took too long to respond, please try again."
+
+        except Exception as err:
+            self.logger.error(f"Error occured while streaming llm: {type(err), err}")
+            if chunks:
+                return f"{''.join(chunks)} [Response interrupted by an unexpected error.]"
+            return "Unexpected Error occured while invoking llm."
+
+    async def transcribe_audio_message(self, input_file_path: str = None, input_buffer: BinaryIO = None) -> str:
         
         try:
 
             self.logger.debug("Converting speech to text")
             self.logger.debug("Loading WAV file.")
-            with speech_recognition.AudioFile(input_file_path) as source:  # pass the file path, not the file object
+            with speech_recognition.AudioFile(input_buffer if input_buffer is not None else input_file_path) as source:
                 
                 self.logger.debug("Reading the entire audio file.")
                 audio_data = speech_recognizer.record(source)
@@ -85,7 +182,12 @@ class IModelService(IService):
             try:
 
                 self.logger.debug("Transcribing text")
-                text = speech_recognizer.recognize_google(audio_data)
+                text = await inference_scheduler.run(
+                    "stt",
+                    speech_recognizer.recognize_google,
+                    audio_data,
+                    priority=self.priority
+                )
                 self.logger.debug("Transcribed text:", text)
 
                 return text
@@ -97,6 +199,11 @@ class IModelService(IService):
             except speech_recognition.RequestError as err:
                 self.logger.debug(f"Could not request results from Google Speech Recognition service; {err}")
                 raise RuntimeError("Google Speech Recognition could not understand the audio.")
+
+        except ServiceBusyError:
+
+            self.logger.error("Speech to text backend is busy")
+            raise
             
         except Exception as err:
 
@@ -107,7 +214,7 @@ class IModelService(IService):
 
             self.logger.debug("Removing temp file")
             try:
-                if os.path.exists(input_file_path):
+                if input_file_path and os.path.exists(input_file_path):
                     os.remove(input_file_path)
             except Exception as err:
                 self.logger.error(err)
@@ -124,53 +231,50 @@ class IModelService(IService):
         
         return cleaned_text
 
-    async def audioinscribe_message(self, message: str, audio_file_path: str, websocket_connection: WebSocket = None, stream: bool = False) -> str:
+    async def audioinscribe_message(self, message: str, audio_file_path: str, session_id: str = None, stream: bool = False, send_text: bool = True) -> str:
         
         self.logger.debug("Audio-Inscribing message")
         language = 'en'  # English language
         tts = gTTS(text=message, lang=language, slow=False)
         self.logger.debug("Audio-Inscribed message")
 
-        self.logger.debug("Sending json data over websocket")
-        event_data: List[Dict[str, str]] = [
-            {
-                "text": message,
-                "sender_name": "ai",
-                "message_type": "text",
-                "timestamp": f"{str(datetime.now().time().hour)}:{str(datetime.now().time().minute)}"
-            }
-        ]
-        await self.websocket_utility.send_json(
-            websocket=websocket_connection,
-            event_data=event_data
-        )
-        self.logger.debug("Sent json data over websocket")
+        if send_text:
+
+            self.logger.debug("Sending json data over websocket")
+            event_data: List[Dict[str, str]] = [
+                {
+                    "text": message,
+                    "sender_name": "ai",
+                    "message_type": "text",
+                    "timestamp": f"{str(datetime.now().time().hour)}:{str(datetime.now().time().minute)}"
+                }
+            ]
+            await self.websocket_utility.send_json(
+                session_id=session_id,
+                event_data=event_data
+            )
+            self.logger.debug("Sent json data over websocket")
 
-        if stream and websocket_connection:
+        if stream and session_id:
 
             self.logger.debug("Streaming audio file")
             chunk_generator = tts.stream()
-            try:
-                count = 0
-                while True:
-                    chunk_bytes = next(chunk_generator)
-                    await self.websocket_utility.send_bytes(
-                        websocket=websocket_connection,
-                        event_data=chunk_bytes
-                    )
-                    with open(f"temp/{count}.mp3", "wb") as f:
-                        f.write(chunk_bytes)
-                    count += 1
-                    time.sleep(0.1)
-            except StopIteration:
-                self.logger.debug("Generator is exhausted")
-                pass
+            while True:
+                chunk_bytes = await inference_scheduler.run("tts", next, chunk_generator, None, priority=self.priority)
+                if chunk_bytes is None:
+                    self.logger.debug("Generator is exhausted")
+                    break
+                await self.websocket_utility.send_bytes(
+                    session_id=session_id,
+                    event_data=chunk_bytes
+                )
+                await asyncio.sleep(0.1)
             self.logger.debug("Streamed audio file")
             
         else:
 
             self.logger.debug("Saving audio file to temp store")
-            tts.save(audio_file_path)
+            await inference_scheduler.run("tts", tts.save, audio_file_path, priority=self.priority)
             self.logger.debug("Saved audio file to temp store")
 
         return audio_file_path
@@ -209,7 +313,10 @@ class IModelService(IService):
 
         try:
 
-            result = gradio_flux_client.predict(
+            result = await inference_scheduler.run(
+                    "image_generation",
+                    gradio_flux_client.predict,
+                    priority=self.priority,
                     prompt=prompt,
                     seed=0,
                     randomize_seed=True,
@@ -232,6 +339,10 @@ class IModelService(IService):
                 "message": "Here is your generated image.",
             }
 
+        except ServiceBusyError:
+            self.logger.error("Image generation backend is busy")
+            raise
+
         except Exception as err:
             self.logger.error(f"Exception occured while generating image: {err}")
             return {
@@ -239,10 +350,22 @@ class IModelService(IService):
                 "message": "Sorry couldn't generate the image. Please try again later.",
             }
         
-    async def record_message_in_database(self, message_data: dict, metadata: dict):
+    def __log_failed_message_write(self, task: asyncio.Task) -> None:
+        if not task.cancelled() and task.exception() is not None:
+            self.logger.error(f"Failed to record message in database: {task.exception()}")
+
+    async def record_message_in_database(self, message_data: dict, metadata: dict, wait: bool = True):
+        """
+        Record a message without blocking the event loop; with write-behind on,
+        it is acknowledged once journaled locally. With ``wait=False`` the
+        write runs in the background until ``flush_message_writes``, so the human
+        message of a turn is written while the answer is generated and together
+        with the AI message.
+        """
 
         self.logger.debug("Recording messgaes in database")
-        message: Messages = self.messages_repository.create_record(
+        time_stamp: datetime = datetime.now()
+        write = message_journal.write(
             urn=message_data.get("urn"),
             chat_urn=message_data.get("chat_urn"),
             text=message_data.get("text"),
@@ -252,15 +375,34 @@ class IModelService(IService):
             receiver_name=message_data.get("receiver_name"),
             message_type=message_data.get("message_type"),
             chat_type=message_data.get("chat_type"),
-            metadata=message_data.get("metadata")
+            metadata=message_data.get("metadata"),
+            priority=self.priority,
+            time_stamp=time_stamp
         )
+        if wait:
+            await write
+        else:
+            task: asyncio.Task = asyncio.ensure_future(write)
+            task.add_done_callback(self.__log_failed_message_write)
+            self.pending_message_writes.append(task)
         message_data.update({
-            "timestamp": str(message.time_stamp)
+            "timestamp": str(time_stamp)
         })
         message_data.update(metadata)
         self.logger.debug("Recorded messgaes in database")
 
         return message_data
 
+    async def flush_message_writes(self) -> None:
+        """
+        Wait for the messages recorded with ``wait=False``, raising the first failed write.
+        """
+
+        pending, self.pending_message_writes = self.pending_message_writes, []
+        if pending:
+            self.logger.debug(f"Waiting for {len(pending)} message writes")
+            await asyncio.gather(*pending)
+            self.logger.debug(f"Completed {len(pending)} message writes")
+
     async def run(self, data: dict) -> dict:
         pass
\ No newline at end of file
@@ -1,10 +1,11 @@
 import base64
+import io
 import os
 
 from datetime import datetime
 from fastapi import WebSocket
 from PIL import Image
-from typing import Any, List, Dict
+from typing import Any, BinaryIO, List, Dict
 from ulid import ulid
 
 from repositories.nosql.cassandra.messages import Messages, MessagesRepository
@@ -13,7 +14,7 @@ from repositories.sql.sqlite.user import User, UserRepository
 
 from services.apis.model.abstraction import IModelService
 
-from start_utils import AI_USER_URN, AI_USER_NAME, image_captioning_model, image_captioning_processor, TEMP_FOLDER, websockets_store, db_session
+from start_utils import AI_USER_URN, AI_USER_NAME, inference_scheduler, image_captioning_model, image_captioning_processor, TEMP_FOLDER, db_session
 
 from utilities.websockets import WebsocketUtility
 
@@ -32,24 +33,37 @@ class ImageCaptioningChatService(IModelService):
 
         self.logger.debug("Initializing Initiate Chat API service")
 
-    async def __caption_image(self, input_file_path: str):
-        
-        raw_image = Image.open(input_file_path).convert('RGB')
+    def __generate_caption(self, image_buffer: BinaryIO) -> str:
+
+        raw_image = Image.open(image_buffer).convert('RGB')
         inputs = image_captioning_processor(raw_image, return_tensors="pt")
 
         out = image_captioning_model.generate(**inputs)
         image_caption = image_captioning_processor.decode(out[0], skip_special_tokens=True)
 
         return image_caption
+
+    async def __caption_image(self, image_buffer: BinaryIO):
+        
+        image_caption: str = await inference_scheduler.run(
+            "captioning",
+            self.__generate_caption,
+            image_buffer,
+            priority=self.priority
+        )
+
+        return image_caption
     
-    def __save_base64_as_image(self, base64_string: str, output_file_path: str):
+    def __decode_base64_image(self, base64_string: str) -> io.BytesIO:
         base64_string = base64_string.split(",")[1]
         img_data = base64.b64decode(base64_string)
 
-        with open(output_file_path, 'wb') as f:
-            f.write(img_data)
-        
-        return None
+        return io.BytesIO(img_data)
+
+    def __encode_image_data_url(self, image_buffer: BinaryIO, mime_type: str) -> str:
+        img_base64 = base64.b64encode(image_buffer.getvalue()).decode("utf-8")
+
+        return f"data:{mime_type};base64,{img_base64}"
     
     async def run(self, data: dict) -> dict:
         
@@ -62,12 +76,23 @@ class ImageCaptioningChatService(IModelService):
             chat_urn: str = data.get("chat_urn")
             chat_type: str = data.get("chat_type")
             image_bas64: str = data.get("image")
+            image_buffer: BinaryIO = data.get("image_buffer")
             self.logger.debug("Fetched chat urn")
 
-            image_file_path = os.path.join(TEMP_FOLDER, f"{self.urn}_CHAT_{chat_urn}_{str(datetime.now().timestamp())}.png")
-            self.logger.debug(f"Saving image to temp store: {image_file_path}")
-            self.__save_base64_as_image(base64_string=image_bas64, output_file_path=image_file_path)
-            self.logger.debug(f"Saved image to temp _store: {image_file_path}")
+            if image_buffer is not None:
+
+                self.logger.debug("Encoding uploaded image for storage")
+                image_bas64: str = self.__encode_image_data_url(
+                    image_buffer=image_buffer,
+                    mime_type=data.get("mime_type") or "image/png"
+                )
+                self.logger.debug("Encoded uploaded image for storage")
+
+            else:
+
+                self.logger.debug("Decoding image into memory")
+                image_buffer: BinaryIO = self.__decode_base64_image(base64_string=image_bas64)
+                self.logger.debug("Decoded image into memory")
 
             self.logger.debug(f"Fetching user: {session_id}")
             user: User = self.user_repository.retrieve_record_by_urn(
@@ -92,7 +117,8 @@ class ImageCaptioningChatService(IModelService):
             }
             message_data: Dict[str, str] = await self.record_message_in_database(
                 message_data=message_data,
-                metadata=metadata
+                metadata=metadata,
+                wait=False
             )
             message_data.update({
                 "sender_name": "you"
@@ -101,7 +127,7 @@ class ImageCaptioningChatService(IModelService):
 
             self.logger.debug("Captioning image message")
             image_caption: str = await self.__caption_image(
-                input_file_path=image_file_path
+                image_buffer=image_buffer
             )
             self.logger.debug("Captioned imaged message")
 
@@ -121,8 +147,10 @@ class ImageCaptioningChatService(IModelService):
             }
             message_data: Dict[str, str] = await self.record_message_in_database(
                 message_data=message_data,
-                metadata=metadata
+                metadata=metadata,
+                wait=False
             )
+            await self.flush_message_writes()
             self.logger.debug("Recorded messgaes in database")
 
             audio_file_path = os.path.join(TEMP_FOLDER, f"{self.urn}_CHAT_{chat_urn}_{str(datetime.now().timestamp())}.wav")
@@ -131,17 +159,17 @@ class ImageCaptioningChatService(IModelService):
             self.logger.debug("Audio Inscribed message")
 
             self.logger.debug(f"Fetching websocket connection for the session: {session_id}")
-            websocket_connection: WebSocket = websockets_store.get(session_id)
+            is_session_online: bool = await self.websocket_utility.is_online(session_id=session_id)
             self.logger
 
-            if websocket_connection:
+            if is_session_online:
 
                 try:
 
                     self.logger.debug("Sending json data over websocket")
                     event_data: List[Dict[str, str]] = [message_data]
                     await self.websocket_utility.send_json(
-                        websocket=websocket_connection,
+                        session_id=session_id,
                         event_data=event_data 
                     )
                     self.logger.debug("Sent json data over websocket")
@@ -152,7 +180,7 @@ class ImageCaptioningChatService(IModelService):
                         with open(audio_file_path, "rb") as f:
                             data = f.read()
                             await self.websocket_utility.send_bytes(
-                                websocket=websocket_connection, 
+                                session_id=session_id, 
                                 event_data=data
                             )
                         self.logger.debug("Sent Audio bytes over websocket")
@@ -180,15 +208,6 @@ class ImageCaptioningChatService(IModelService):
         
         finally:
 
-            self.logger.debug("Removing temp file")
-            try:
-                if os.path.exists(image_file_path):
-                    os.remove(image_file_path)
-            except Exception as err:
-                self.logger.error(err)
-                pass
-            self.logger.debug("Removed temp file")
-
             self.logger.debug("Completed Conversate Chat Service")
             
             
\ No newline at end of file
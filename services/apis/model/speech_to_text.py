@@ -1,4 +1,3 @@
-import json
 import os
 
 from datetime import datetime
@@ -10,7 +9,7 @@ from repositories.sql.sqlite.user import User, UserRepository
 
 from services.apis.model.abstraction import IModelService
 
-from start_utils import AI_USER_URN, AI_USER_NAME, db_session, redis_session, websockets_store
+from start_utils import AI_USER_URN, AI_USER_NAME, db_session
 
 from utilities.websockets import WebsocketUtility
 
@@ -38,19 +37,13 @@ class SpeechToTextChatService(IModelService):
             chat_urn: str = data.get("chat_urn")
             chat_type: str = data.get("chat_type")
             input_file_path=data.get("audio_file_path")
+            input_buffer=data.get("audio_buffer")
             self.logger.debug("Fetched chat urn")
 
-            self.logger.debug("Loading conversation from session")
-            conversation = redis_session.get(chat_urn)
-            if conversation is None:
-                conversation = []
-            else:
-                conversation: List[Dict[str, str]] = json.loads(conversation)
-            self.logger.debug("Loaded conversation from session")
-
             self.logger.debug("Trasncribing audio message")
             transcribed_message: str = await self.transcribe_audio_message(
-                input_file_path=input_file_path
+                input_file_path=input_file_path,
+                input_buffer=input_buffer
             )
             self.logger.debug("Transcribed audio message")
 
@@ -76,16 +69,16 @@ class SpeechToTextChatService(IModelService):
             }
 
             self.logger.debug(f"Fetching websocket connection for the session: {session_id}")
-            websocket_connection: WebSocket = websockets_store.get(session_id)
+            is_session_online: bool = await self.websocket_utility.is_online(session_id=session_id)
 
-            if websocket_connection:
+            if is_session_online:
 
                 try:
 
                     self.logger.debug("Sending json data over websocket")
                     event_data: List[Dict[str, str]] =[message_data]
                     await self.websocket_utility.send_json(
-                        websocket=websocket_connection,
+                        session_id=session_id,
                         event_data=event_data
                     )
                     self.logger.debug("Sending json data over websocket")
@@ -116,7 +109,7 @@ class SpeechToTextChatService(IModelService):
 
             self.logger.debug("Removing temp file")
             try:
-                if os.path.exists(input_file_path):
+                if input_file_path and os.path.exists(input_file_path):
                     os.remove(input_file_path)
             except Exception as err:
                 self.logger.error(err)
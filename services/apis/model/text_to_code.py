@@ -1,4 +1,3 @@
-import json
 import os
 
 from datetime import datetime
@@ -13,7 +12,7 @@ from repositories.sql.sqlite.user import User, UserRepository
 
 from services.apis.model.abstraction import IModelService
 
-from start_utils import AI_USER_URN, AI_USER_NAME, db_session, redis_session, websockets_store
+from start_utils import AI_USER_URN, AI_USER_NAME, db_session
 
 from utilities.websockets import WebsocketUtility
 
@@ -44,31 +43,17 @@ class TextToCodeChatService(IModelService):
             prompt=data.get("prompt")
             self.logger.debug(f"Fetched chat urn {prompt}")
 
-            self.logger.debug("Loading conversation from session")
-            conversation = redis_session.get(chat_urn)
-            if conversation is None:
-                conversation = []
-            else:
-                conversation: List[Dict[str, str]] = json.loads(conversation)
-            self.logger.debug("Loaded conversation from session")
-
             self.logger.debug(f"Fetching websocket connection for the session: {session_id}")
-            websocket_connection: WebSocket = websockets_store.get(session_id)
-
-            self.logger.debug("Appending transcribed message to conversation")
-            conversation.append(
-                {
-                    "human": prompt
-                }
-            )
-            self.logger.debug("Appended transcribed message to conversation")
+            is_session_online: bool = await self.websocket_utility.is_online(session_id=session_id)
 
             self.logger.debug("Building chat context from conversation")
-            chat: List[Union[AIMessage, HumanMessage]] = await self.build_chat(conversation=conversation)
+            chat: List[Union[AIMessage, HumanMessage]] = await self.build_chat(
+                chat_urn=chat_urn,
+                prompt=prompt,
+                instructions=["You are a helpful coding assistant. Provide clear and concise code examples."]
+            )
             self.logger.debug("Built chat context from conversation")
 
-            chat.append(HumanMessage(content="You are a helpful coding assistant. Provide clear and concise code examples."))
-
             self.logger.debug("Invoking conversation llm")
             response_message: str = await self.invoke_conversation_model(chat=chat)
             self.logger.debug("Invoked conversation llm")
@@ -86,19 +71,22 @@ class TextToCodeChatService(IModelService):
             )
             self.logger.debug(f"Fetched user: {user.id}")
 
-            for response_code_block in response_code_blocks:
-
-                self.logger.debug("Appending ai response message to conversation")
-                conversation.append(
+            self.logger.debug(f"Storing chat turn in session with urn: {chat_urn}")
+            await self.conversation_repository.append(
+                chat_urn,
+                {
+                    "human": prompt
+                },
+                *[
                     {
                         "ai": response_code_block.get("code")
                     }
-                )
-                self.logger.debug("Appended ai response message to conversation")
+                    for response_code_block in response_code_blocks
+                ]
+            )
+            self.logger.debug(f"Stored chat turn in session with urn: {chat_urn}")
 
-                self.logger.debug(f"Storing chat in session with urn: {chat_urn}")
-                redis_session.set(chat_urn, json.dumps(conversation))
-                self.logger.debug(f"Stored chat in session with urn: {chat_urn}")
+            for response_code_block in response_code_blocks:
 
                 self.logger.debug("Recording messgaes in database")
                 metadata: Dict[str, str] = {
@@ -118,7 +106,8 @@ class TextToCodeChatService(IModelService):
                 }
                 message_data: Dict[str, str] = await self.record_message_in_database(
                     message_data=message_data,
-                    metadata=metadata
+                    metadata=metadata,
+                    wait=False
                 )
                 message_data.update({
                     "sender_name": "you"
@@ -126,14 +115,14 @@ class TextToCodeChatService(IModelService):
                 message_data.update(metadata)
                 self.logger.debug("Recorded messgaes in database")
 
-                if websocket_connection:
+                if is_session_online:
 
                     try:
 
                         self.logger.debug("Sending json data over websocket")
                         event_data: List[Dict[str, str]] =[message_data]
                         await self.websocket_utility.send_json(
-                            websocket=websocket_connection,
+                            session_id=session_id,
                             event_data=event_data
                         )
                         self.logger.debug("Sending json data over websocket")
@@ -143,6 +132,8 @@ class TextToCodeChatService(IModelService):
                         self.logger.error(f"An error occured while sending data over websocket: {err}")
                         pass
 
+            await self.flush_message_writes()
+
             self.logger.debug("Preparing Conversate Chat response DTO")
             date_time = datetime.now()
             response_payload = {
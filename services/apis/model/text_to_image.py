@@ -9,7 +9,7 @@ from repositories.sql.sqlite.user import User, UserRepository
 
 from services.apis.model.abstraction import IModelService
 
-from start_utils import AI_USER_URN, AI_USER_NAME, db_session, websockets_store
+from start_utils import AI_USER_URN, AI_USER_NAME, db_session
 
 from utilities.websockets import WebsocketUtility
 
@@ -65,7 +65,8 @@ class TextToImageChatService(IModelService):
 
             text_message_data = await self.record_message_in_database(
                 message_data=message_data,
-                metadata=metadata
+                metadata=metadata,
+                wait=False
             )
             self.logger.debug("Created messgaes in database")
 
@@ -88,14 +89,17 @@ class TextToImageChatService(IModelService):
 
                 image_message_data = await self.record_message_in_database(
                     message_data=message_data,
-                    metadata=metadata
+                    metadata=metadata,
+                    wait=False
                 )
                 self.logger.debug("Created messgaes in database")
 
+            await self.flush_message_writes()
+
             self.logger.debug(f"Fetching websocket connection for the session: {session_id}")
-            websocket_connection: WebSocket = websockets_store.get(session_id)
+            is_session_online: bool = await self.websocket_utility.is_online(session_id=session_id)
 
-            if websocket_connection:
+            if is_session_online:
 
                 try:
 
@@ -106,7 +110,7 @@ class TextToImageChatService(IModelService):
                         event_data.append(image_message_data)
                     
                     await self.websocket_utility.send_json(
-                        websocket=websocket_connection,
+                        session_id=session_id,
                         event_data=event_data)
                     self.logger.debug("Sent json data over websocket")
 
@@ -1,4 +1,3 @@
-import json
 import os
 
 from datetime import datetime
@@ -11,9 +10,11 @@ from repositories.nosql.cassandra.messages import Messages, MessagesRepository
 
 from repositories.sql.sqlite.user import User, UserRepository
 
+from constants.websocket_event import WebsocketEvent
+
 from services.apis.model.abstraction import IModelService
 
-from start_utils import AI_USER_URN, AI_USER_NAME, db_session, redis_session, TEMP_FOLDER, websockets_store
+from start_utils import AI_USER_URN, AI_USER_NAME, db_session, TEMP_FOLDER
 
 from utilities.websockets import WebsocketUtility
 
@@ -41,19 +42,11 @@ class TextToSpeechChatService(IModelService):
             session_id: str = data.get("session_id")
             chat_urn: str = data.get("chat_urn")
             chat_type: str = data.get("chat_type")
+            stream: bool = bool(data.get("stream"))
             self.logger.debug("Fetched chat urn")
 
             prompt = data.get("message")
             
-            self.logger.debug("Loading conversation from session")
-            conversation = redis_session.get(chat_urn)
-            self.logger.debug(conversation)
-            if conversation is None:
-                conversation = []
-            else:
-                conversation: List[Dict[str, str]] = json.loads(conversation)
-            self.logger.debug("Loaded conversation from session")
-
             self.logger.debug(f"Fetching user: {session_id}")
             user: User = self.user_repository.retrieve_record_by_urn(
                 urn=session_id,
@@ -78,21 +71,22 @@ class TextToSpeechChatService(IModelService):
 
             text_message_data = await self.record_message_in_database(
                 message_data=message_data,
-                metadata=metadata
+                metadata=metadata,
+                wait=False
             )
             self.logger.debug("Created messgaes in database")
             
             self.logger.debug(f"Fetching websocket connection for the session: {session_id}")
-            websocket_connection: WebSocket = websockets_store.get(session_id)
+            is_session_online: bool = await self.websocket_utility.is_online(session_id=session_id)
 
-            if data.get("is_transaciption_required") and websocket_connection:
+            if data.get("is_transaciption_required") and is_session_online:
 
                 try:
 
                     self.logger.debug("Sending json data over websocket")
                     event_data = [text_message_data]
                     await self.websocket_utility.send_json(
-                        websocket=websocket_connection,
+                        session_id=session_id,
                         event_data=event_data
                     )
                     self.logger.debug("Sent json data over websocket")
@@ -101,39 +95,44 @@ class TextToSpeechChatService(IModelService):
                     self.logger.error(f"An error occured while sending data over websocket: {err}")
                     pass
 
-            self.logger.debug("Appending transcribed message to conversation")
-            conversation.append(
-                {
-                    "human": prompt
-                }
-            )
-            self.logger.debug("Appended transcribed message to conversation")
-
             self.logger.debug("Building chat context from conversation")
-            chat: List[Union[AIMessage, HumanMessage]] = await self.build_chat(conversation=conversation)
+            chat: List[Union[AIMessage, HumanMessage]] = await self.build_chat(
+                chat_urn=chat_urn,
+                prompt=prompt,
+                instructions=["Please keep the answer brief and to the point as much as possible."]
+            )
             self.logger.debug("Built chat context from conversation")
 
-            chat.append(HumanMessage(content="Please keep the answer brief and to the point as much as possible."))
+            if stream:
 
-            self.logger.debug("Invoking conversation llm")
-            response_message: str = await self.invoke_conversation_model(chat=chat)
-            self.logger.debug("Invoked conversation llm")
+                self.logger.debug("Streaming conversation llm")
+                response_message: str = await self.stream_conversation_model(
+                    chat=chat,
+                    session_id=session_id
+                )
+                self.logger.debug("Streamed conversation llm")
+
+            else:
+
+                self.logger.debug("Invoking conversation llm")
+                response_message: str = await self.invoke_conversation_model(chat=chat)
+                self.logger.debug("Invoked conversation llm")
 
             self.logger.debug("Cleaning llm response")
             response_message: str = await self.clean_llm_output(llm_output=response_message)
             self.logger.debug("Cleaned llm response")
 
-            self.logger.debug("Appending ai response message to conversation")
-            conversation.append(
+            self.logger.debug(f"Storing chat turn in session with urn: {chat_urn}")
+            await self.conversation_repository.append(
+                chat_urn,
+                {
+                    "human": prompt
+                },
                 {
                     "ai": response_message
                 }
             )
-            self.logger.debug("Appended ai response message to conversation")
-
-            self.logger.debug(f"Storing chat in session with urn: {chat_urn}")
-            redis_session.set(chat_urn, json.dumps(conversation))
-            self.logger.debug(f"Stored chat in session with urn: {chat_urn}")
+            self.logger.debug(f"Stored chat turn in session with urn: {chat_urn}")
 
             self.logger.debug("Creating messgaes in database")
             metadata: Dict[str, str] = {}
@@ -152,10 +151,31 @@ class TextToSpeechChatService(IModelService):
 
             text_message_data = await self.record_message_in_database(
                 message_data=message_data,
-                metadata=metadata
+                metadata=metadata,
+                wait=False
             )
+            await self.flush_message_writes()
             self.logger.debug("Created messgaes in database")
 
+            if stream and is_session_online:
+
+                self.logger.debug("Sending stream completion over websocket")
+                event_data: List[Dict[str, str]] = [
+                    {
+                        "event": WebsocketEvent.COMPLETE,
+                        "urn": text_message_data.get("urn"),
+                        "text": response_message,
+                        "sender_name": "ai",
+                        "message_type": "text",
+                        "timestamp": f"{str(datetime.now().time().hour)}:{str(datetime.now().time().minute)}"
+                    }
+                ]
+                await self.websocket_utility.send_json(
+                    session_id=session_id,
+                    event_data=event_data
+                )
+                self.logger.debug("Sent stream completion over websocket")
+
             streamed: bool = False
             try:
 
@@ -164,8 +184,9 @@ class TextToSpeechChatService(IModelService):
                 await self.audioinscribe_message(
                     message=response_message, 
                     audio_file_path=audio_file_path, 
-                    websocket_connection=websocket_connection, 
-                    stream=True
+                    session_id=session_id, 
+                    stream=True,
+                    send_text=not stream
                 )
                 self.logger.debug("Audio Inscribed message")
                 streamed: bool = True
@@ -177,13 +198,14 @@ class TextToSpeechChatService(IModelService):
                 await self.audioinscribe_message(
                     message=response_message, 
                     audio_file_path=audio_file_path, 
-                    websocket_connection=None, 
-                    stream=False
+                    session_id=None, 
+                    stream=False,
+                    send_text=not stream
                 )
                 self.logger.debug("Audio Inscribed message")
                 streamed: bool = False
 
-            if websocket_connection:
+            if is_session_online:
 
                 try:
 
@@ -193,7 +215,7 @@ class TextToSpeechChatService(IModelService):
                         with open(audio_file_path, "rb") as f:
                             event_data = f.read()
                             await self.websocket_utility.send_bytes(
-                                websocket=websocket_connection,
+                                session_id=session_id,
                                 event_data=event_data
                             )
                         self.logger.debug("Sent Audio bytes over websocket")
@@ -1,3 +1,10 @@
+import asyncio
+import os
+
+import faiss
+import numpy as np
+
+from datetime import datetime
 from langchain_community.vectorstores import FAISS
 from langchain_core.embeddings import Embeddings
 from langchain.schema import Document
@@ -5,52 +12,172 @@ from typing_extensions import Any, List
 
 from abstractions.service import IService
 
-from repositories.nosql.cassandra.messages import Messages, MessagesRepository
+from start_utils import message_journal, rag_configuration
 
+from utilities.docstore import SQLiteDocstore
+from utilities.faiss_index import FAISSIndexUtility
 from utilities.websockets import WebsocketUtility
 
 
 class IRAGService(IService):
 
-    def __init__(self, urn: str, **kwargs: Any) -> 'IRAGService':
+    INDEX_FILE_NAME: str = "index.faiss"
+    LEGACY_DOCSTORE_FILE_NAME: str = "index.pkl"
+    MMAP_FLAGS: int = getattr(faiss, "IO_FLAG_MMAP_IFC", faiss.IO_FLAG_MMAP) | faiss.IO_FLAG_READ_ONLY
+
+    def __init__(self, urn: str, priority: int = 0, **kwargs: Any) -> 'IRAGService':
 
         self.urn = urn
         super().__init__(urn, **kwargs)
+        self.priority = priority
         
         self.websocket_utility = WebsocketUtility(urn=self.urn)
-        self.messages_repository = MessagesRepository(urn=self.urn)
+        self.pending_message_writes: List[asyncio.Task] = []
+        self.faiss_index_utility = FAISSIndexUtility(
+            flat_max_vectors=rag_configuration.index_flat_max_vectors,
+            hnsw_max_vectors=rag_configuration.index_hnsw_max_vectors,
+            hnsw_m=rag_configuration.index_hnsw_m,
+            hnsw_ef_search=rag_configuration.index_hnsw_ef_search,
+            ivf_nprobe=rag_configuration.index_ivf_nprobe,
+            compression=rag_configuration.index_compression,
+            urn=self.urn
+        )
 
 
         self.logger.debug("Initializing Initiate Chat API service")
 
-    async def create_vector_store(self, documents: List[Document], embeddings_function: Embeddings) -> FAISS:
+    async def create_vector_store(
+        self,
+        documents: List[Document],
+        embeddings_function: Embeddings,
+        vectors: List[List[float]],
+        vector_store_dir_path: str
+    ) -> FAISS:
 
         self.logger.debug("Creating vector store")
-        vector_store: FAISS = FAISS.from_documents(documents=documents, embedding=embeddings_function)
+        docstore = SQLiteDocstore(path=os.path.join(vector_store_dir_path, SQLiteDocstore.FILE_NAME), urn=self.urn)
+        docstore.truncate(max_position=0)
+        vector_store: FAISS = FAISS(
+            embedding_function=embeddings_function,
+            index=self.faiss_index_utility.build(vectors=np.empty((0, len(vectors[0])), dtype=np.float32)),
+            docstore=docstore,
+            index_to_docstore_id=docstore.index_to_docstore_id()
+        )
+        await self.add_to_vector_store(vector_store=vector_store, documents=documents, vectors=vectors)
         self.logger.debug("Created vector_store")
 
         return vector_store
-    
-    async def load_vector_store(self, vector_store_dir_path: str, embeddings_function: Embeddings) -> FAISS:
 
+    async def add_to_vector_store(self, vector_store: FAISS, documents: List[Document], vectors: List[List[float]]) -> None:
+        """
+        Add chunks under their ``id`` metadata at the next free index positions.
+        """
+        self.logger.debug(f"Adding {len(documents)} documents to vector store")
+        docstore: SQLiteDocstore = vector_store.docstore
+        start: int = docstore.next_position()
+        positions: List[int] = list(range(start, start + len(documents)))
+
+        docstore.add(texts={document.metadata.get("id"): document for document in documents})
+        vector_store.index = self.faiss_index_utility.add(
+            index=vector_store.index,
+            vectors=np.asarray(vectors, dtype=np.float32),
+            ids=np.asarray(positions, dtype=np.int64)
+        )
+        vector_store.index_to_docstore_id.update(
+            {position: document.metadata.get("id") for position, document in zip(positions, documents)}
+        )
+        self.logger.debug(f"Added {len(documents)} documents to vector store")
+
+        return None
+
+    def __migrate_docstore(self, vector_store: FAISS, vector_store_dir_path: str) -> FAISS:
+
+        self.logger.debug("Migrating pickled docstore to sqlite")
+        docstore = SQLiteDocstore(path=os.path.join(vector_store_dir_path, SQLiteDocstore.FILE_NAME), urn=self.urn)
+        docstore.truncate(max_position=0)
+        docstore.add(texts=dict(vector_store.docstore._dict))
+        index_to_docstore_id = docstore.index_to_docstore_id()
+        index_to_docstore_id.update(vector_store.index_to_docstore_id)
+        vector_store.docstore = docstore
+        vector_store.index_to_docstore_id = index_to_docstore_id
+
+        os.remove(os.path.join(vector_store_dir_path, self.LEGACY_DOCSTORE_FILE_NAME))
+        self.logger.debug("Migrated pickled docstore to sqlite")
+
+        return vector_store
+
+    def __read_vector_store(self, vector_store_dir_path: str, embeddings_function: Embeddings, mmap: bool) -> FAISS:
+
+        docstore_path: str = os.path.join(vector_store_dir_path, SQLiteDocstore.FILE_NAME)
+        if not os.path.exists(docstore_path):
+
+            self.logger.debug("Loading legacy pickled vector store")
+            vector_store: FAISS = FAISS.load_local(
+                vector_store_dir_path,
+                embeddings_function,
+                allow_dangerous_deserialization=True
+            )
+            if not mmap:
+                vector_store = self.__migrate_docstore(vector_store=vector_store, vector_store_dir_path=vector_store_dir_path)
+            return vector_store
+
+        index: faiss.Index = faiss.read_index(
+            os.path.join(vector_store_dir_path, self.INDEX_FILE_NAME),
+            self.MMAP_FLAGS if mmap else 0
+        )
+        docstore = SQLiteDocstore(path=docstore_path, urn=self.urn)
+        if not mmap:
+            docstore.truncate(max_position=self.faiss_index_utility.next_id(index=index))
+
+        return FAISS(
+            embedding_function=embeddings_function,
+            index=index,
+            docstore=docstore,
+            index_to_docstore_id=docstore.index_to_docstore_id()
+        )
+
+    async def load_vector_store(self, vector_store_dir_path: str, embeddings_function: Embeddings, mmap: bool = True) -> FAISS:
+        """
+        Open a saved vector store. With ``mmap`` the index is memory mapped read
+        only, so it loads without copying and is shared through the page cache;
+        stores that will be added to must be loaded with ``mmap=False``.
+        """
         self.logger.debug("Loading existing vector store")
-        vector_store: FAISS = FAISS.load_local(
-            vector_store_dir_path, 
-            embeddings_function, 
-            allow_dangerous_deserialization=True
+        loop = asyncio.get_running_loop()
+        vector_store: FAISS = await loop.run_in_executor(
+            None,
+            lambda: self.__read_vector_store(
+                vector_store_dir_path=vector_store_dir_path,
+                embeddings_function=embeddings_function,
+                mmap=mmap
+            )
         )
         self.logger.debug("Loaded existing vector store")
 
         return vector_store
 
+    def __write_vector_store(self, vector_store: FAISS, vector_store_dir_path: str) -> None:
+
+        os.makedirs(vector_store_dir_path, exist_ok=True)
+
+        index_path: str = os.path.join(vector_store_dir_path, self.INDEX_FILE_NAME)
+        faiss.write_index(vector_store.index, f"{index_path}.tmp")
+        os.replace(f"{index_path}.tmp", index_path)
+
+        return None
+
     async def save_vector_store(
         self,
         vector_store: FAISS,
         vector_store_dir_path: str
     ) -> None:
-        
+        """
+        Write the index atomically next to its sqlite docstore. Chunks are already in
+        the docstore, so readers of the previous index keep resolving their ids.
+        """
         self.logger.debug(f"Saving vector store to dir: {vector_store_dir_path}")
-        vector_store.save_local(vector_store_dir_path)
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self.__write_vector_store, vector_store, vector_store_dir_path)
         self.logger.debug(f"Saved vector store to dir: {vector_store_dir_path}")
 
         return vector_store_dir_path
@@ -58,10 +185,22 @@ class IRAGService(IService):
     def format_docs(self, docs):
         return "\n\n".join(doc.page_content for doc in docs)
 
-    async def record_message_in_database(self, message_data: dict, metadata: dict):
+    def __log_failed_message_write(self, task: asyncio.Task) -> None:
+        if not task.cancelled() and task.exception() is not None:
+            self.logger.error(f"Failed to record message in database: {task.exception()}")
+
+    async def record_message_in_database(self, message_data: dict, metadata: dict, wait: bool = True):
+        """
+        Record a message without blocking the event loop; with write-behind on,
+        it is acknowledged once journaled locally. With ``wait=False`` the
+        write runs in the background until ``flush_message_writes``, so the human
+        message of a turn is written while the answer is generated and together
+        with the AI message.
+        """
 
         self.logger.debug("Recording messgaes in database")
-        message: Messages = self.messages_repository.create_record(
+        time_stamp: datetime = datetime.now()
+        write = message_journal.write(
             urn=message_data.get("urn"),
             chat_urn=message_data.get("chat_urn"),
             text=message_data.get("text"),
@@ -71,12 +210,31 @@ class IRAGService(IService):
             receiver_name=message_data.get("receiver_name"),
             message_type=message_data.get("message_type"),
             chat_type=message_data.get("chat_type"),
-            metadata=message_data.get("metadata")
+            metadata=message_data.get("metadata"),
+            priority=self.priority,
+            time_stamp=time_stamp
         )
+        if wait:
+            await write
+        else:
+            task: asyncio.Task = asyncio.ensure_future(write)
+            task.add_done_callback(self.__log_failed_message_write)
+            self.pending_message_writes.append(task)
         message_data.update({
-            "timestamp": str(message.time_stamp)
+            "timestamp": str(time_stamp)
         })
         message_data.update(metadata)
         self.logger.debug("Recorded messgaes in database")
 
-        return message_data
\ No newline at end of file
+        return message_data
+
+    async def flush_message_writes(self) -> None:
+        """
+        Wait for the messages recorded with ``wait=False``, raising the first failed write.
+        """
+
+        pending, self.pending_message_writes = self.pending_message_writes, []
+        if pending:
+            self.logger.debug(f"Waiting for {len(pending)} message writes")
+            await asyncio.gather(*pending)
+            self.logger.debug(f"Completed {len(pending)} message writes")
\ No newline at end of file
@@ -1,17 +1,22 @@
+import asyncio
 import os
 
-from hashlib import md5
+from datetime import datetime
+from hashlib import sha256
 from langchain_community.document_loaders import PyPDFLoader
 from langchain_community.vectorstores import FAISS
 from langchain.schema import Document
 from langchain_text_splitters import RecursiveCharacterTextSplitter
-from typing_extensions import Any, List
-from ulid import ulid
+from pypdf import PdfReader
+from typing_extensions import Any, AsyncIterator, Dict, List, Optional, Set
+
+from constants.websocket_event import WebsocketEvent
 
 from services.apis.rag.abstraction import IRAGService
 
-from start_utils import embeddings_function
+from start_utils import embeddings_function, rag_configuration, vector_store_cache
 
+from utilities.embedding_executor import EmbeddingExecutor
 from utilities.websockets import WebsocketUtility
 
 
@@ -21,6 +26,11 @@ class BuildRetrievalAugmentedGenerationService(IRAGService):
         self.urn = urn
         super().__init__(urn, **kwargs)
         self.websocket_utility = WebsocketUtility(urn=self.urn)
+        self.embedding_executor = EmbeddingExecutor(
+            embeddings=embeddings_function,
+            urn=self.urn,
+            priority=self.priority
+        )
         self.logger.debug("Initializing Retrieval Augmented Generation (RAG) service")
 
     async def __fetch_document_loader(self, file_type: str, document_path: str) -> PyPDFLoader:
@@ -31,17 +41,43 @@ class BuildRetrievalAugmentedGenerationService(IRAGService):
         
         return document_loader
 
-    async def __load_and_split_documents(
+    async def __count_pages(self, document_path: str) -> Optional[int]:
+
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(None, lambda: len(PdfReader(document_path).pages))
+        except Exception as err:
+            self.logger.error(f"Failed to count document pages: {err}")
+            return None
+
+    async def __load_page_windows(self, document_loader: PyPDFLoader, window_pages: int) -> AsyncIterator[List[Document]]:
+        """
+        Lazily parse the document, yielding windows of at most ``window_pages`` pages.
+        """
+        loop = asyncio.get_running_loop()
+        pages = document_loader.lazy_load()
+        window: List[Document] = []
+        while True:
+
+            page: Document = await loop.run_in_executor(None, next, pages, None)
+            if page is None:
+                break
+
+            window.append(page)
+            if len(window) >= window_pages:
+                yield window
+                window = []
+
+        if window:
+            yield window
+
+    async def __split_documents(
         self, 
-        document_loader: PyPDFLoader,
+        documents: List[Document],
         chunk_size: int = 1000,
         chunk_overlap: int = 200
     ) -> List[Document]:
 
-        self.logger.debug("Loading documents")
-        documents = document_loader.load()
-        self.logger.debug("Loaded documents")
-
         self.logger.debug("Splitting documents")
         text_splitter = RecursiveCharacterTextSplitter(
             chunk_size=chunk_size, 
@@ -52,27 +88,53 @@ class BuildRetrievalAugmentedGenerationService(IRAGService):
 
         return document_splits
 
-    async def __update_document_metadata(self, documents: List[Document]) -> List[Document]:
-
+    async def __update_document_metadata(self, documents: List[Document], document_id: str) -> List[Document]:
+        """
+        Give every chunk an id derived from its text, so the same chunk uploaded
+        again maps to the same id.
+        """
         self.logger.debug("Updating document metadata")
         for document in documents:
-            metadata = document.metadata
-            source = metadata.get("source")
-            page = metadata.get("page")
             document.metadata.update(
                 {
-                    "id": md5(f"{source}_{page}_{ulid()}".encode("utf-8")).hexdigest()
+                    "id": sha256(document.page_content.encode("utf-8")).hexdigest(),
+                    "document_id": document_id
                 }
             )
         self.logger.debug("Updated document metadata")
 
         return documents
-    
-    async def __add_documents_to_vector_store(self, vector_store: FAISS, documents: List[Document]) -> None:
 
-        self.logger.debug("Adding new documents")
-        vector_store.add_documents(documents)
-        self.logger.debug("Added new documents")
+    async def __select_new_documents(self, vector_store: Optional[FAISS], documents: List[Document]) -> List[Document]:
+        """
+        Drop chunks repeated within ``documents`` or already in the vector store.
+        """
+        unique_documents: Dict[str, Document] = {}
+        for document in documents:
+            unique_documents.setdefault(document.metadata.get("id"), document)
+
+        if vector_store is None:
+            return list(unique_documents.values())
+
+        indexed: Set[str] = vector_store.docstore.indexed(ids=list(unique_documents))
+
+        return [document for id, document in unique_documents.items() if id not in indexed]
+
+    async def __send_progress(self, session_id: str, chat_urn: str, progress: Dict[str, Any]) -> None:
+
+        self.logger.debug(f"Build progress for chat {chat_urn}: {progress}")
+        event_data: List[Dict[str, Any]] = [
+            {
+                "event": WebsocketEvent.RAG_BUILD_PROGRESS,
+                "chat_urn": chat_urn,
+                "timestamp": f"{str(datetime.now().time().hour)}:{str(datetime.now().time().minute)}",
+                **progress
+            }
+        ]
+        await self.websocket_utility.send_json(
+            session_id=session_id,
+            event_data=event_data
+        )
 
         return None
 
@@ -85,6 +147,7 @@ class BuildRetrievalAugmentedGenerationService(IRAGService):
             chat_type: str = data.get("chat_type")
             file_type: str = data.get("file_type")
             document_file_path: str = data.get("document_file_path")
+            document_id: str = data.get("document_hash")
 
             self.logger.debug("Fetch Document Loader")
             document_loader = await self.__fetch_document_loader(
@@ -93,50 +156,96 @@ class BuildRetrievalAugmentedGenerationService(IRAGService):
             )
             self.logger.debug("Fetched Document Loader")
 
-            self.logger.debug("Load Document")
-            documents = await self.__load_and_split_documents(
-                document_loader=document_loader,
-            )
-            self.logger.debug("Loaded Document")
-
-            self.logger.debug("Updating document metadata")
-            documents = await self.__update_document_metadata(
-                documents=documents
-            )
-            self.logger.debug("Updated document metadata")
-
             vector_store_dir_path: str = os.path.join("vector_store", f"{session_id}_{chat_urn}_vector_store")
+            vector_store: FAISS = None
 
-            if vector_store_dir_path and os.path.exists(vector_store_dir_path):
+            if os.path.exists(os.path.join(vector_store_dir_path, self.INDEX_FILE_NAME)):
 
-                self.logger.debug("Creating FAISS vector store")
-                vector_store: FAISS = await self.load_vector_store(
+                self.logger.debug("Loading FAISS vector store")
+                vector_store = await self.load_vector_store(
                     vector_store_dir_path=vector_store_dir_path,
-                    embeddings_function=embeddings_function
+                    embeddings_function=embeddings_function,
+                    mmap=False
                 )
-                self.logger.debug("Created FAISS vector store")
+                self.logger.debug("Loaded FAISS vector store")
 
-                self.logger.debug("Updating Documents to FAISS Index")
-                await self.__add_documents_to_vector_store(
-                    vector_store=vector_store,
-                    documents=documents
-                )
-                self.logger.debug("Updated Documents to FAISS Index")
+            progress: Dict[str, Any] = {
+                "pages_done": 0,
+                "total_pages": await self.__count_pages(document_path=document_file_path),
+                "chunks_embedded": 0,
+                "chunks_skipped": 0
+            }
+            await self.__send_progress(session_id=session_id, chat_urn=chat_urn, progress=progress)
 
-            else:
+            async for pages in self.__load_page_windows(
+                document_loader=document_loader,
+                window_pages=rag_configuration.ingestion_window_pages
+            ):
 
-                self.logger.debug("Loading FAISS vector store")
-                vector_store: FAISS = await self.create_vector_store(
-                    documents=documents,
-                    embeddings_function=embeddings_function
+                self.logger.debug(f"Splitting {len(pages)} pages")
+                documents: List[Document] = await self.__split_documents(documents=pages)
+                documents = await self.__update_document_metadata(documents=documents, document_id=document_id)
+                self.logger.debug(f"Split {len(pages)} pages into {len(documents)} chunks")
+
+                chunk_ids: List[str] = [document.metadata.get("id") for document in documents]
+                documents = await self.__select_new_documents(vector_store=vector_store, documents=documents)
+                progress.update({"chunks_skipped": progress.get("chunks_skipped") + len(chunk_ids) - len(documents)})
+                self.logger.debug(f"{len(documents)} of {len(chunk_ids)} chunks are new")
+
+                chunks_embedded: int = progress.get("chunks_embedded")
+
+                async def on_progress(embedded: int, total: int) -> None:
+                    progress.update({"chunks_embedded": chunks_embedded + embedded})
+                    await self.__send_progress(session_id=session_id, chat_urn=chat_urn, progress=progress)
+
+                self.logger.debug("Embedding documents")
+                vectors: List[List[float]] = await self.embedding_executor.embed(
+                    texts=[document.page_content for document in documents],
+                    on_progress=on_progress
                 )
-                self.logger.debug("Loaded FAISS vector store")
+                self.logger.debug("Embedded documents")
+
+                if documents and vector_store is None:
+
+                    self.logger.debug("Creating FAISS vector store")
+                    vector_store = await self.create_vector_store(
+                        documents=documents,
+                        embeddings_function=embeddings_function,
+                        vectors=vectors,
+                        vector_store_dir_path=vector_store_dir_path
+                    )
+                    self.logger.debug("Created FAISS vector store")
+
+                elif documents:
+
+                    self.logger.debug("Updating Documents to FAISS Index")
+                    await self.add_to_vector_store(
+                        vector_store=vector_store,
+                        documents=documents,
+                        vectors=vectors
+                    )
+                    self.logger.debug("Updated Documents to FAISS Index")
+
+                if vector_store is not None:
+                    vector_store.docstore.link(document_id=document_id, chunk_ids=chunk_ids)
+
+                progress.update({"pages_done": progress.get("pages_done") + len(pages)})
+                await self.__send_progress(session_id=session_id, chat_urn=chat_urn, progress=progress)
+
+            if vector_store is None:
+                raise ValueError("The document has no text to index.")
+
+            self.logger.debug("Adapting FAISS index to corpus size")
+            loop = asyncio.get_running_loop()
+            vector_store.index = await loop.run_in_executor(None, self.faiss_index_utility.adapt, vector_store.index)
+            self.logger.debug(f"Adapted FAISS index: {self.faiss_index_utility.describe(index=vector_store.index)}")
 
             self.logger.debug("Saving vector store")
             await self.save_vector_store(
                 vector_store_dir_path=vector_store_dir_path,
                 vector_store=vector_store
             )
+            vector_store_cache.invalidate(path=vector_store_dir_path)
             self.logger.debug("Saving vector store")
 
             return {
@@ -144,6 +253,9 @@ class BuildRetrievalAugmentedGenerationService(IRAGService):
                 "session_id": session_id,
                 "chat_urn": chat_urn,
                 "chat_type": chat_type,
+                "document_id": document_id,
+                "chunks_added": progress.get("chunks_embedded"),
+                "chunks_skipped": progress.get("chunks_skipped"),
                 "task": "build"
             }
 
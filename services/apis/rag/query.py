@@ -1,3 +1,4 @@
+import asyncio
 import os
 import faiss
 import numpy as np
@@ -9,6 +10,7 @@ from langchain_core.output_parsers import StrOutputParser
 from langchain_core.runnables import RunnablePassthrough
 from langchain_core.language_models.base import BaseLanguageModel
 from langchain.prompts import PromptTemplate
+from langchain.schema import Document
 from langchain.vectorstores.base import VectorStoreRetriever
 from langchain_community.vectorstores import FAISS
 from typing_extensions import Any, Callable, Dict, List
@@ -20,8 +22,12 @@ from repositories.sql.sqlite.user import User, UserRepository
 
 from services.apis.rag.abstraction import IRAGService
 
-from start_utils import AI_USER_URN, AI_USER_NAME, db_session, embeddings_function, rag_llm_model, rag_prompt, websockets_store
+from start_utils import AI_USER_URN, AI_USER_NAME, cross_encoder_reranker, db_session, embeddings_function, rag_configuration, rag_llm_model, rag_prompt, vector_store_cache
 
+from utilities.docstore import SQLiteDocstore
+from utilities.hybrid_retriever import HybridRetriever
+from utilities.llm import LLMUtility
+from utilities.vector_store_cache import VectorStoreCacheEntry
 from utilities.websockets import WebsocketUtility
 
 
@@ -33,6 +39,7 @@ class QueryRetrivalAugmentedGenerationService(IRAGService):
         self.user_repository = UserRepository(urn=self.urn, session=db_session)
         self.messages_repository = MessagesRepository(urn=self.urn)
         self.websocket_utility = WebsocketUtility(urn=self.urn)
+        self.llm_utility = LLMUtility(urn=self.urn, priority=self.priority)
         self.logger.debug("Initializing Initiate Chat API service")
 
     async def __load_retriever(
@@ -40,10 +47,27 @@ class QueryRetrivalAugmentedGenerationService(IRAGService):
         vector_store: FAISS
     ) -> Any:
         """
-        Load the FAISS retriever.
+        Load the hybrid (dense + BM25) retriever, or the dense FAISS retriever for
+        legacy stores without a keyword index.
         """
+        if rag_configuration.hybrid_retrieval and isinstance(vector_store.docstore, SQLiteDocstore):
+
+            self.logger.debug("Loading hybrid retriever")
+            retriever: HybridRetriever = HybridRetriever(
+                vector_store=vector_store,
+                max_position=self.faiss_index_utility.next_id(index=vector_store.index),
+                k=rag_configuration.retrieval_k,
+                fetch_k=rag_configuration.retrieval_fetch_k,
+                rrf_k=rag_configuration.rrf_k
+            )
+            self.logger.debug("Loaded hybrid retriever")
+            return retriever
+
         self.logger.debug("Loading FAISS retriever")
-        retriever: VectorStoreRetriever = vector_store.as_retriever(search_type="similarity", search_kwargs={"k": 6})
+        retriever: VectorStoreRetriever = vector_store.as_retriever(
+            search_type="similarity",
+            search_kwargs={"k": rag_configuration.retrieval_k}
+        )
         self.logger.debug("Loaded FAISS retriever")
         return retriever
 
@@ -67,13 +91,89 @@ class QueryRetrivalAugmentedGenerationService(IRAGService):
         self.logger.debug("Built rag chain")
         return rag_chain
 
-    async def __invoke_rag_chain(self, rag_chain: Any, query_prompt: str) -> str:
+    async def __build_answer_chain(self, rag_prompt: PromptTemplate, model: BaseLanguageModel) -> Any:
+        """
+        Build the generation half of the rag chain, for context retrieved and reranked beforehand.
+        """
+        self.logger.debug("Building answer chain")
+        answer_chain = rag_prompt | model | StrOutputParser()
+        self.logger.debug("Built answer chain")
+        return answer_chain
+
+    async def __rerank_context(self, retriever: Any, prompt: str, budget_ms: int) -> str:
+        """
+        Over-fetch candidates, rerank them with the cross-encoder within ``budget_ms``
+        and format the best ``rerank_top_n`` as the prompt context.
+        """
+        self.logger.debug("Retrieving rerank candidates")
+        documents: List[Document] = await retriever.ainvoke(prompt, k=rag_configuration.rerank_fetch_k)
+        self.logger.debug(f"Retrieved {len(documents)} rerank candidates")
+
+        self.logger.debug("Reranking candidates")
+        documents = await cross_encoder_reranker.rerank(
+            query=prompt,
+            documents=documents,
+            top_n=rag_configuration.rerank_top_n,
+            budget_seconds=budget_ms / 1000,
+            priority=self.priority
+        )
+        self.logger.debug(f"Reranked candidates, kept {len(documents)}")
+
+        return self.format_docs(documents)
+
+    async def __load_rag_chain(self, vector_store_dir_path: str) -> VectorStoreCacheEntry:
+        """
+        Load the vector store and build its retriever and rag chain, to be cached together.
+        """
+        self.logger.debug(f"Fetch FAISS Index: {vector_store_dir_path}")
+        vector_store: FAISS = await self.load_vector_store(
+            vector_store_dir_path=vector_store_dir_path,
+            embeddings_function=embeddings_function
+        )
+        self.logger.debug("Fetched FAISS Index")
+
+        self.logger.debug("Fetch FAISS retriever")
+        retriever: VectorStoreRetriever = await self.__load_retriever(vector_store=vector_store)
+        self.logger.debug("Fetched FAISS retriever")
+
+        self.logger.debug("Build rag chain")
+        rag_chain = await self.__build_rag_chain(
+            retriever=retriever,
+            format_docs=self.format_docs,
+            rag_prompt=rag_prompt,
+            model=rag_llm_model
+        )
+        self.logger.debug("Built rag chain")
+
+        answer_chain = await self.__build_answer_chain(rag_prompt=rag_prompt, model=rag_llm_model)
+
+        return VectorStoreCacheEntry(
+            vector_store=vector_store,
+            resources={
+                "retriever": retriever,
+                "rag_chain": rag_chain,
+                "answer_chain": answer_chain
+            }
+        )
+
+    async def __invoke_rag_chain(self, rag_chain: Any, query_prompt: Any) -> str:
         """
         Invoke the RAG chain to get a response based on the input query.
         """
         self.logger.debug("Invoking rag chain")
-        response_message: str = rag_chain.invoke(query_prompt)
-        self.logger.debug("Invoked rag chain")
+        try:
+
+            response_message: str = await self.llm_utility.invoke(
+                runnable=rag_chain,
+                input=query_prompt
+            )
+            self.logger.debug("Invoked rag chain")
+
+        except asyncio.TimeoutError:
+
+            self.logger.error("Timed out while invoking rag chain")
+            response_message: str = "The model took too long to respond, please try again."
+
         return response_message
 
     async def run(self, data: dict):
@@ -85,6 +185,9 @@ class QueryRetrivalAugmentedGenerationService(IRAGService):
             chat_urn: str = data.get("chat_urn")
             chat_type: str = data.get("chat_type")
             prompt: str = data.get("prompt")
+            rerank: bool = data.get("rerank")
+            rerank = rag_configuration.rerank_enabled if rerank is None else rerank
+            rerank_budget_ms: int = data.get("rerank_budget_ms") or rag_configuration.rerank_budget_ms
             self.logger.debug("Fetched chat urn")
 
             self.logger.debug(f"Fetching user: {session_id}")
@@ -111,7 +214,8 @@ class QueryRetrivalAugmentedGenerationService(IRAGService):
 
             text_message_data = await self.record_message_in_database(
                 message_data=message_data,
-                metadata=metadata
+                metadata=metadata,
+                wait=False
             )
 
             text_message_data.update({
@@ -121,34 +225,39 @@ class QueryRetrivalAugmentedGenerationService(IRAGService):
 
             vector_store_dir_path: str = os.path.join("vector_store", f"{session_id}_{chat_urn}_vector_store")
 
-            if os.path.exists(vector_store_dir_path):
+            if os.path.exists(os.path.join(vector_store_dir_path, self.INDEX_FILE_NAME)):
 
-                self.logger.debug(f"Fetch FAISS Index: {vector_store_dir_path}")
-                vector_store: FAISS = await self.load_vector_store(
-                    vector_store_dir_path=vector_store_dir_path,
-                    embeddings_function=embeddings_function
+                self.logger.debug("Fetch rag chain")
+                entry: VectorStoreCacheEntry = await vector_store_cache.get_or_load(
+                    path=vector_store_dir_path,
+                    loader=lambda: self.__load_rag_chain(vector_store_dir_path=vector_store_dir_path)
                 )
-                self.logger.debug("Fetched FAISS Index")
-
-                self.logger.debug("Fetch FAISS retriever")
-                retriever: VectorStoreRetriever = await self.__load_retriever(vector_store=vector_store)
-                self.logger.debug("Fetched FAISS retriever")
-
-                self.logger.debug("Build rag chain")
-                rag_chain = await self.__build_rag_chain(
-                    retriever=retriever,
-                    format_docs=self.format_docs,
-                    rag_prompt=rag_prompt,
-                    model=rag_llm_model
-                )
-                self.logger.debug("Built rag chain")
+                rag_chain = entry.resources.get("rag_chain")
+                self.logger.debug("Fetched rag chain")
 
-                self.logger.debug("Invoking rag")
-                response_message: str = await self.__invoke_rag_chain(
-                    rag_chain=rag_chain,
-                    query_prompt=prompt
-                )
-                self.logger.debug("Invoked rag")
+                if rerank:
+
+                    context: str = await self.__rerank_context(
+                        retriever=entry.resources.get("retriever"),
+                        prompt=prompt,
+                        budget_ms=rerank_budget_ms
+                    )
+
+                    self.logger.debug("Invoking rag with reranked context")
+                    response_message: str = await self.__invoke_rag_chain(
+                        rag_chain=entry.resources.get("answer_chain"),
+                        query_prompt={"context": context, "question": prompt}
+                    )
+                    self.logger.debug("Invoked rag with reranked context")
+
+                else:
+
+                    self.logger.debug("Invoking rag")
+                    response_message: str = await self.__invoke_rag_chain(
+                        rag_chain=rag_chain,
+                        query_prompt=prompt
+                    )
+                    self.logger.debug("Invoked rag")
 
             else:
 
@@ -178,8 +287,10 @@ class QueryRetrivalAugmentedGenerationService(IRAGService):
 
             text_message_data = await self.record_message_in_database(
                 message_data=message_data,
-                metadata=metadata
+                metadata=metadata,
+                wait=False
             )
+            await self.flush_message_writes()
 
             text_message_data.update({
                 "sender_name": "you"
@@ -187,7 +298,7 @@ class QueryRetrivalAugmentedGenerationService(IRAGService):
             self.logger.debug("Created messgaes in database")
 
             self.logger.debug(f"Fetching websocket connection for the session: {session_id}")
-            websocket_connection: WebSocket = websockets_store.get(session_id)
+            is_session_online: bool = await self.websocket_utility.is_online(session_id=session_id)
 
             try:
 
@@ -201,7 +312,7 @@ class QueryRetrivalAugmentedGenerationService(IRAGService):
                     }
                 ]
                 await self.websocket_utility.send_json(
-                    websocket=websocket_connection,
+                    session_id=session_id,
                     event_data=event_data
                 )
                 self.logger.debug("Sent json data over websocket")
@@ -0,0 +1,160 @@
+import asyncio
+import os
+import time
+
+import numpy as np
+
+from http import HTTPStatus
+from langchain_community.vectorstores import FAISS
+from typing import Any, Dict
+
+from constants.api_status import APIStatus
+from constants.rag_build_status import RAGBuildStatus
+
+from dtos.responses.base import BaseResponseDTO
+
+from errors.bad_input_error import BadInputError
+
+from repositories.nosql.redis.rag_build_job import RAGBuildJobRepository
+
+from services.apis.rag.abstraction import IRAGService
+
+from start_utils import embeddings_function, vector_store_cache
+
+
+class RemoveRAGDocumentService(IRAGService):
+    """
+    Removes the chunks of one uploaded document from a chat's index without
+    re-parsing or re-embedding anything. Chunks shared with other documents are
+    kept. Holds the chat's build lock, so it never overlaps a build.
+    """
+
+    def __init__(self, urn: str, **kwargs: Any) -> 'RemoveRAGDocumentService':
+
+        self.urn = urn
+        super().__init__(urn, **kwargs)
+
+        self.job_repository = RAGBuildJobRepository(urn=self.urn)
+        self.logger.debug("Initializing Remove RAG Document service")
+
+    async def __remove_document(self, vector_store_dir_path: str, document_id: str) -> Dict[str, int]:
+
+        self.logger.debug("Loading FAISS vector store")
+        vector_store: FAISS = await self.load_vector_store(
+            vector_store_dir_path=vector_store_dir_path,
+            embeddings_function=embeddings_function,
+            mmap=False
+        )
+        self.logger.debug("Loaded FAISS vector store")
+
+        chunk_count: int = vector_store.docstore.document_chunk_count(document_id=document_id)
+        if not chunk_count:
+            raise BadInputError(
+                response_message="Document not found in this chat.",
+                response_key="error_rag_document_not_found",
+                http_status_code=HTTPStatus.NOT_FOUND
+            )
+
+        positions: Dict[int, str] = vector_store.docstore.exclusive_positions(document_id=document_id)
+        self.logger.debug(f"Removing {len(positions)} of {chunk_count} chunks of document {document_id}")
+
+        if positions:
+
+            loop = asyncio.get_running_loop()
+            vector_store.index = await loop.run_in_executor(
+                None,
+                self.faiss_index_utility.remove,
+                vector_store.index,
+                np.fromiter(positions, dtype=np.int64)
+            )
+            await self.save_vector_store(
+                vector_store_dir_path=vector_store_dir_path,
+                vector_store=vector_store
+            )
+            vector_store_cache.invalidate(path=vector_store_dir_path)
+
+        vector_store.docstore.remove_document(document_id=document_id, positions=positions)
+        self.logger.debug(f"Removed document {document_id}")
+
+        return {
+            "chunks_removed": len(positions),
+            "chunks_shared": chunk_count - len(positions)
+        }
+
+    async def run(self, data: dict) -> BaseResponseDTO:
+
+        try:
+
+            session_id: str = data.get("session_id")
+            chat_urn: str = data.get("chat_urn")
+            document_id: str = data.get("document_id")
+
+            vector_store_dir_path: str = os.path.join("vector_store", f"{session_id}_{chat_urn}_vector_store")
+            if not os.path.exists(os.path.join(vector_store_dir_path, self.INDEX_FILE_NAME)):
+                raise BadInputError(
+                    response_message="No rag has been built for this chat.",
+                    response_key="error_rag_not_found",
+                    http_status_code=HTTPStatus.NOT_FOUND
+                )
+
+            self.logger.debug(f"Locking chat for document removal: {chat_urn}")
+            job_id, created, _ = await self.job_repository.create(
+                session_id=session_id,
+                chat_urn=chat_urn,
+                document_hash=f"remove:{document_id}"
+            )
+            if not created:
+                raise BadInputError(
+                    response_message="A document is being indexed for this chat, please wait for it to finish.",
+                    response_key="error_rag_build_in_progress",
+                    http_status_code=HTTPStatus.CONFLICT
+                )
+            self.logger.debug(f"Locked chat for document removal, job: {job_id}")
+
+            try:
+
+                await self.job_repository.update(job_id=job_id, status=RAGBuildStatus.RUNNING, task="remove_document", started_at=time.time())
+                result: Dict[str, int] = await self.__remove_document(
+                    vector_store_dir_path=vector_store_dir_path,
+                    document_id=document_id
+                )
+                await self.job_repository.update(job_id=job_id, status=RAGBuildStatus.SUCCEEDED, finished_at=time.time(), result=result)
+
+            except Exception as err:
+
+                await self.job_repository.update(job_id=job_id, status=RAGBuildStatus.FAILED, finished_at=time.time(), error=str(err))
+                raise err
+
+            finally:
+
+                await self.job_repository.release(session_id=session_id, chat_urn=chat_urn, job_id=job_id)
+
+            response_payload: Dict[str, Any] = {
+                "job_id": job_id,
+                "document_id": document_id,
+                "session_id": session_id,
+                "chat_urn": chat_urn,
+                **result
+            }
+
+            return BaseResponseDTO(
+                transaction_urn=self.urn,
+                status=APIStatus.SUCCESS,
+                response_message="Successfully removed document from the rag.",
+                response_key="success_rag_document_removed",
+                data=response_payload
+            )
+
+        except BadInputError as err:
+
+            self.logger.error(f"Rejected document removal: {err.response_message}")
+            raise err
+
+        except Exception as err:
+
+            self.logger.error(f"Exception occurred while removing rag document. err: {err}")
+            raise err
+
+        finally:
+
+            self.logger.debug("Completed Remove RAG Document Service")
@@ -0,0 +1,59 @@
+from http import HTTPStatus
+from typing import Any, Dict
+
+from abstractions.service import IService
+
+from constants.api_status import APIStatus
+
+from dtos.responses.base import BaseResponseDTO
+
+from errors.bad_input_error import BadInputError
+
+from repositories.nosql.redis.rag_build_job import RAGBuildJobRepository
+
+
+class RAGBuildStatusService(IService):
+
+    def __init__(self, urn: str, **kwargs: Any) -> 'RAGBuildStatusService':
+
+        self.urn = urn
+        super().__init__(urn, **kwargs)
+
+        self.job_repository = RAGBuildJobRepository(urn=self.urn)
+        self.logger.debug("Initializing RAG Build Status service")
+
+    async def run(self, data: dict) -> BaseResponseDTO:
+
+        try:
+
+            job_id: str = data.get("job_id")
+
+            self.logger.debug(f"Fetching rag build job: {job_id}")
+            job: Dict[str, Any] = await self.job_repository.get(job_id=job_id)
+            self.logger.debug(f"Fetched rag build job: {job_id}")
+
+            if job is None:
+                raise BadInputError(
+                    response_message="Build job not found.",
+                    response_key="error_rag_build_not_found",
+                    http_status_code=HTTPStatus.NOT_FOUND
+                )
+
+            job.update({"job_id": job_id})
+
+            return BaseResponseDTO(
+                transaction_urn=self.urn,
+                status=APIStatus.SUCCESS,
+                response_message="Successfully fetched build job.",
+                response_key="success_rag_build_status",
+                data=job
+            )
+
+        except Exception as err:
+
+            self.logger.error(f"Exception occurred while fetching rag build status. err: {err}")
+            raise err
+
+        finally:
+
+            self.logger.debug("Completed RAG Build Status Service")
@@ -0,0 +1,101 @@
+import asyncio
+import os
+
+from http import HTTPStatus
+from typing import Any, Dict
+
+from abstractions.service import IService
+
+from constants.api_status import APIStatus
+from constants.rag_build_status import RAGBuildStatus
+
+from dtos.responses.base import BaseResponseDTO
+
+from errors.bad_input_error import BadInputError
+
+from repositories.nosql.redis.rag_build_job import RAGBuildJobRepository
+
+from tasks.rag import build_rag
+
+
+class SubmitRAGBuildService(IService):
+
+    def __init__(self, urn: str, **kwargs: Any) -> 'SubmitRAGBuildService':
+
+        self.urn = urn
+        super().__init__(urn, **kwargs)
+
+        self.job_repository = RAGBuildJobRepository(urn=self.urn)
+        self.logger.debug("Initializing Submit RAG Build service")
+
+    async def run(self, data: dict) -> BaseResponseDTO:
+
+        try:
+
+            session_id: str = data.get("session_id")
+            chat_urn: str = data.get("chat_urn")
+            document_hash: str = data.get("document_hash")
+            document_file_path: str = data.get("document_file_path")
+
+            self.logger.debug(f"Creating rag build job for chat: {chat_urn}")
+            job_id, created, running_document_hash = await self.job_repository.create(
+                session_id=session_id,
+                chat_urn=chat_urn,
+                document_hash=document_hash
+            )
+            self.logger.debug(f"Created rag build job: {job_id}")
+
+            if not created:
+                self.logger.debug("Removing temp file of duplicate upload")
+                os.remove(document_file_path)
+
+            if not created and running_document_hash != document_hash:
+                raise BadInputError(
+                    response_message="A document is already being indexed for this chat, please wait for it to finish.",
+                    response_key="error_rag_build_in_progress",
+                    http_status_code=HTTPStatus.CONFLICT
+                )
+
+            if created:
+
+                self.logger.debug(f"Queueing rag build job: {job_id}")
+                try:
+                    loop = asyncio.get_running_loop()
+                    await loop.run_in_executor(None, lambda: build_rag.delay(job_id=job_id, data=data))
+                except Exception:
+                    await self.job_repository.release(session_id=session_id, chat_urn=chat_urn, job_id=job_id)
+                    raise
+                self.logger.debug(f"Queued rag build job: {job_id}")
+
+            else:
+                self.logger.debug(f"Same document is already being indexed by job: {job_id}")
+
+            response_payload: Dict[str, Any] = {
+                "job_id": job_id,
+                "status": RAGBuildStatus.QUEUED if created else RAGBuildStatus.RUNNING,
+                "deduplicated": not created,
+                "session_id": session_id,
+                "chat_urn": chat_urn
+            }
+
+            return BaseResponseDTO(
+                transaction_urn=self.urn,
+                status=APIStatus.PENDING,
+                response_message="Document accepted for indexing.",
+                response_key="success_rag_build_accepted",
+                data=response_payload
+            )
+
+        except BadInputError as err:
+
+            self.logger.error(f"Rejected rag build: {err.response_message}")
+            raise err
+
+        except Exception as err:
+
+            self.logger.error(f"Exception occurred while submitting rag build. err: {err}")
+            raise err
+
+        finally:
+
+            self.logger.debug("Completed Submit RAG Build Service")
@@ -1,12 +1,10 @@
 import os
-import re
-import redis
+import redis.asyncio
 import speech_recognition
 import sys
 
-from cassandra.cqlengine import connection
-from cassandra.auth import PlainTextAuthProvider
 from celery import Celery
+from celery.signals import worker_process_init, worker_process_shutdown
 from fastapi import WebSocket
 from gradio_client import Client
 #from langchain_openai import ChatOpenAI
@@ -14,70 +12,60 @@ from langchain import hub
 from langchain_core.embeddings import Embeddings
 from langchain_core.language_models.base import BaseLanguageModel
 from langchain_google_genai import ChatGoogleGenerativeAI, GoogleGenerativeAIEmbeddings
-from typing_extensions import Dict, Callable
+from typing_extensions import Dict
 from dotenv import load_dotenv
 from loguru import logger
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
 from transformers import BlipProcessor, BlipForConditionalGeneration
+from ulid import ulid
 
 from configurations.cache import CacheConfiguration, CacheConfigurationDTO
 from configurations.celery import CeleryConfiguration, CeleryConfigurationDTO
 from configurations.db import DBConfiguration, DBConfigurationDTO
+from configurations.journal import JournalConfiguration, JournalConfigurationDTO
+from configurations.llm import LLMConfiguration, LLMConfigurationDTO
+from configurations.rag import RAGConfiguration, RAGConfigurationDTO
+from configurations.scheduler import SchedulerConfiguration, SchedulerConfigurationDTO
+from configurations.websocket import WebsocketConfiguration, WebsocketConfigurationDTO
+
+from utilities.cassandra import CassandraUtility
+from utilities.context_builder import ChatContextBuilder
+from utilities.embedding_cache import CachedEmbeddings
+from utilities.event_router import EventRouter
+from utilities.inference_scheduler import InferenceScheduler
+from utilities.message_journal import MessageJournal
+from utilities.message_writer import MessageWriter
+from utilities.reranker import CrossEncoderReranker
+from utilities.token_bucket import TokenBucket
+from utilities.vector_store_cache import VectorStoreCache
+from utilities.websocket_registry import WebsocketSessionRegistry
 
 logger.debug("Initialising websocket connection store")
 websockets_store: Dict[str, WebSocket] = {}
 logger.debug("Initialising websocket connection store")
 
-logger.debug("Initialising websocket event registry")
-event_registry: Dict[re.Pattern, Callable] = {}
-logger.debug("Initialising websocket event registry")
+logger.debug("Initialising websocket session queue store")
+websocket_session_store: Dict[str, object] = {}
+logger.debug("Initialising websocket session queue store")
+
+logger.debug("Initialising websocket event router")
+event_router = EventRouter()
+logger.debug("Initialising websocket event router")
 
 logger.debug("Initialising peer connection store")
 peer_connection_store: Dict[str, WebSocket] = {}
 logger.debug("Initialising peer connection store")
 
-logger.debug("Initialising websocket router")
-websocket_router: Dict[str, object] = {}
-logger.debug("Initialising websocket router")
-
 logger.add(sys.stderr, colorize=True, format="<green>{time:MMMM-D-YYYY}</green> | <black>{time:HH:mm:ss}</black> | <level>{level}</level> | <cyan>{message}</cyan> | <magenta>{name}:{function}:{line}</magenta> | <yellow>{extra}</yellow>")
 
 logger.debug("Setting up on_event websocket decorator.")
-def on_event(event_pattern):
-    """
-    A decorator that registers a function to a regex event pattern.
-    """
-    def decorator(func):
-        logger.debug(f"Registering event: {event_pattern}")
-        event_registry[re.compile(event_pattern)] = func
-        logger.debug(event_registry)
-        return func
-    return decorator
+on_event = event_router.on_event
 logger.debug("Set up on_event websocket decorator.")
 
 logger.debug("Initialising trigger websocker event method.")
-async def trigger_event(event_name, *args, **kwargs):
-    """
-    Function to trigger an event by matching the event_name against registered regex patterns.
-    """
-    logger.debug(f"Triggering event: {event_name}")
-    for pattern, func in event_registry.items():
-        match = pattern.match(event_name)
-
-        if match:
-
-            logger.debug(f"Event matched: {event_name}")
-            class_name: str = func.__qualname__.split(".")[0]
-            cls = websocket_router.get(class_name)
-
-            if cls is None:
-                raise RuntimeError(f"Found no websocket handler class with name {class_name} binded to event {event_name}.")
-            return await func(cls, *args, **kwargs, **match.groupdict())
-
-    logger.debug(f"No route registered for event '{event_name}'")
-    return None
+trigger_event = event_router.dispatch
 logger.debug("Initialising trigger websocker event method.")
 
 logger.debug("Loading environment variables from .env file")
@@ -116,6 +104,11 @@ logger.info("Loading Configurations")
 cache_configuration: CacheConfigurationDTO = CacheConfiguration().get_config()
 celery_configuration: CeleryConfigurationDTO = CeleryConfiguration().get_config()
 db_configuration: DBConfigurationDTO = DBConfiguration().get_config()
+journal_configuration: JournalConfigurationDTO = JournalConfiguration().get_config()
+llm_configuration: LLMConfigurationDTO = LLMConfiguration().get_config()
+rag_configuration: RAGConfigurationDTO = RAGConfiguration().get_config()
+scheduler_configuration: SchedulerConfigurationDTO = SchedulerConfiguration().get_config()
+websocket_configuration: WebsocketConfigurationDTO = WebsocketConfiguration().get_config()
 logger.info("Loaded Configurations")
 
 logger.info("Initializing SQL database")
@@ -126,28 +119,65 @@ Base = declarative_base()
 logger.info("Initialized SQL database")
 
 logger.info("Initializing NoSQL database")
-def casssandra_connection():
-    auth_provider = PlainTextAuthProvider(username=CASSANDRA_USER, password=CASSANDRA_PASSWORD)
-    connection.setup(
-        hosts=[CASSANDRA_HOST], 
-        default_keyspace=CASSANDRA_DEFAULT_KEYSPACE, 
-        protocol_version=3, 
-        auth_provider=auth_provider
-    )
-    return None
+cassandra_utility = CassandraUtility(
+    hosts=[CASSANDRA_HOST],
+    keyspace=CASSANDRA_DEFAULT_KEYSPACE,
+    username=CASSANDRA_USER,
+    password=CASSANDRA_PASSWORD
+)
+message_writer = MessageWriter(
+    cassandra_utility=cassandra_utility,
+    ttl=MESSAGE_TTL,
+    batch_max_bytes=journal_configuration.batch_max_bytes
+)
+message_journal = MessageJournal(
+    message_writer=message_writer,
+    directory=journal_configuration.directory,
+    write_behind=journal_configuration.write_behind,
+    slots=journal_configuration.slots,
+    fsync_interval_ms=journal_configuration.fsync_interval_ms,
+    flush_batch_size=journal_configuration.flush_batch_size,
+    segment_max_bytes=journal_configuration.segment_max_bytes,
+    retry_backoff_ms=journal_configuration.retry_backoff_ms,
+    retry_backoff_max_ms=journal_configuration.retry_backoff_max_ms,
+    shutdown_flush_timeout_seconds=journal_configuration.shutdown_flush_timeout_seconds
+)
 logger.info("Initialized NoSQL database")
 
 logger.info("Initializing Redis database")
-redis_session = redis.Redis(
+redis_connection_pool = redis.asyncio.BlockingConnectionPool(
+    host=cache_configuration.host,
+    port=cache_configuration.port,
+    password=cache_configuration.password,
+    max_connections=cache_configuration.max_connections,
+    timeout=cache_configuration.pool_timeout_seconds,
+    socket_timeout=cache_configuration.socket_timeout_seconds,
+    socket_keepalive=True,
+    health_check_interval=cache_configuration.health_check_interval_seconds
+)
+redis_session = redis.asyncio.Redis(connection_pool=redis_connection_pool)
+redis_pubsub_session = redis.asyncio.Redis(
     host=cache_configuration.host,
     port=cache_configuration.port,
-    password=cache_configuration.password
+    password=cache_configuration.password,
+    socket_timeout=None,
+    socket_keepalive=True,
+    health_check_interval=cache_configuration.health_check_interval_seconds
 )
 
 if not redis_session:
     raise RuntimeError("No Redis session available")
 logger.info("Initialized Redis database")
 
+logger.info("Initializing websocket session registry")
+websocket_registry = WebsocketSessionRegistry(
+    node_id=ulid(),
+    redis_session=redis_session,
+    websockets_store=websockets_store,
+    pubsub_session=redis_pubsub_session
+)
+logger.info("Initialized websocket session registry")
+
 
 logger.info("Initializing Celery")
 redis_url: str = celery_configuration.backend_url.format(
@@ -162,10 +192,21 @@ celery = Celery(
     broker=redis_url,
     include=[
         "tasks.delete",
+        "tasks.rag",
     ]
 )
+celery.conf.broker_transport_options = {"visibility_timeout": rag_configuration.build_lock_ttl_seconds}
 logger.info("Initialized Celery")
 
+@worker_process_init.connect
+def connect_worker_process(**kwargs) -> None:
+    cassandra_utility.connect()
+    message_writer.prepare()
+
+@worker_process_shutdown.connect
+def shutdown_worker_process(**kwargs) -> None:
+    cassandra_utility.shutdown()
+
 logger.info("Initializing speech recognizer")
 speech_recognizer = speech_recognition.Recognizer()
 logger.info("Initialized speech recognizer")
@@ -177,10 +218,53 @@ conversation_llm = ChatGoogleGenerativeAI(model="gemini-1.5-pro-latest", google_
 rag_llm_model: BaseLanguageModel = ChatGoogleGenerativeAI(model="gemini-1.5-pro-latest", google_api_key=GOOGLE_API_KEY)
 logger.info("Initialised conversation llm")
 
+logger.info("Initialising inference scheduler")
+inference_scheduler = InferenceScheduler(
+    lanes=scheduler_configuration.lanes,
+    max_wait_seconds=scheduler_configuration.max_wait_seconds
+)
+logger.info("Initialised inference scheduler")
+
+logger.info("Initialising chat context builder")
+chat_context_builder = ChatContextBuilder(
+    token_budget=llm_configuration.context_token_budget,
+    max_chats=llm_configuration.context_max_chats,
+    chars_per_token=llm_configuration.chars_per_token
+)
+logger.info("Initialised chat context builder")
+
+logger.info("Initialising vector store cache")
+vector_store_cache = VectorStoreCache(
+    max_bytes=rag_configuration.vector_store_cache_max_bytes,
+    max_entries=rag_configuration.vector_store_cache_max_entries
+)
+logger.info("Initialised vector store cache")
+
 logger.info("Initialising Embedding function")
-embeddings_function: Embeddings = GoogleGenerativeAIEmbeddings(model="models/embedding-001")
+embeddings_function: Embeddings = CachedEmbeddings(
+    embeddings=GoogleGenerativeAIEmbeddings(model=rag_configuration.embedding_model),
+    model_name=rag_configuration.embedding_model,
+    path=rag_configuration.embedding_cache_path,
+    max_bytes=rag_configuration.embedding_cache_max_bytes
+)
 logger.debug("Initialised Embedding function")
 
+logger.debug("Initialising embedding rate limiter")
+embedding_rate_limiter = TokenBucket(
+    rate_per_second=rag_configuration.embedding_requests_per_minute / 60,
+    capacity=rag_configuration.embedding_concurrency
+)
+logger.debug("Initialised embedding rate limiter")
+
+logger.debug("Initialising cross encoder reranker")
+cross_encoder_reranker = CrossEncoderReranker(
+    model_name=rag_configuration.rerank_model,
+    scheduler=inference_scheduler,
+    max_length=rag_configuration.rerank_max_length,
+    cache_max_entries=rag_configuration.rerank_cache_max_entries
+)
+logger.debug("Initialised cross encoder reranker")
+
 logger.debug("Initialising rag prompt")
 rag_prompt = hub.pull("rlm/rag-prompt")
 logger.debug("Initialised rag prompt")
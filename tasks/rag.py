@@ -0,0 +1,149 @@
+import asyncio
+import time
+
+from datetime import datetime
+from typing_extensions import Any, Dict, List
+
+from constants.rag_build_status import RAGBuildStatus
+from constants.websocket_event import WebsocketEvent
+
+from repositories.nosql.redis.rag_build_job import RAGBuildJobRepository
+
+from services.apis.rag.build import BuildRetrievalAugmentedGenerationService
+
+from start_utils import celery, logger, rag_configuration
+
+from utilities.websockets import WebsocketUtility
+
+_event_loop: asyncio.AbstractEventLoop = None
+
+
+def get_event_loop() -> asyncio.AbstractEventLoop:
+    """
+    One event loop per worker process, reused across tasks so pooled async
+    clients (Redis) stay bound to the loop that opened their connections.
+    """
+    global _event_loop
+    if _event_loop is None or _event_loop.is_closed():
+        _event_loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(_event_loop)
+
+    return _event_loop
+
+
+async def keep_alive(job_repository: RAGBuildJobRepository, session_id: str, chat_urn: str, job_id: str, build: asyncio.Future) -> None:
+    """
+    Renew the build lock until the build finishes, and cancel the build if the
+    lock was taken over, so two builds never write the same vector store.
+    """
+    while not build.done():
+
+        await asyncio.sleep(rag_configuration.build_heartbeat_seconds)
+        try:
+            held: bool = await job_repository.heartbeat(session_id=session_id, chat_urn=chat_urn, job_id=job_id)
+        except Exception as err:
+            logger.warning(f"Failed to renew the build lock of rag build job {job_id}: {err}")
+            continue
+
+        if not held:
+            logger.error(f"Lost the build lock of rag build job {job_id}, cancelling it")
+            build.cancel()
+
+    return None
+
+
+async def run_build(job_id: str, data: Dict[str, Any]) -> None:
+
+    session_id: str = data.get("session_id")
+    chat_urn: str = data.get("chat_urn")
+    job_repository = RAGBuildJobRepository(urn=job_id)
+    websocket_utility = WebsocketUtility(urn=job_id)
+
+    if not await job_repository.heartbeat(session_id=session_id, chat_urn=chat_urn, job_id=job_id):
+        logger.warning(f"Skipping rag build job {job_id}, its build lock expired or was taken over")
+        await job_repository.update(
+            job_id=job_id,
+            status=RAGBuildStatus.FAILED,
+            finished_at=time.time(),
+            error="The build lock expired before the build ran."
+        )
+        return None
+
+    logger.info(f"Running rag build job: {job_id}")
+    await job_repository.update(job_id=job_id, status=RAGBuildStatus.RUNNING, started_at=time.time(), heartbeat_at=time.time())
+
+    try:
+
+        build_rag_service = BuildRetrievalAugmentedGenerationService(urn=job_id)
+        build: asyncio.Future = asyncio.ensure_future(build_rag_service.run(data=data))
+        heartbeat: asyncio.Task = asyncio.create_task(keep_alive(
+            job_repository=job_repository,
+            session_id=session_id,
+            chat_urn=chat_urn,
+            job_id=job_id,
+            build=build
+        ))
+        try:
+            result: Dict[str, Any] = await build
+        except asyncio.CancelledError:
+            raise RuntimeError("The build lock was taken over by a newer build.")
+        finally:
+            heartbeat.cancel()
+
+        await job_repository.update(
+            job_id=job_id,
+            status=RAGBuildStatus.SUCCEEDED,
+            finished_at=time.time(),
+            result=result
+        )
+        event: str = WebsocketEvent.RAG_BUILD_COMPLETE
+        status: str = RAGBuildStatus.SUCCEEDED
+        error: str = None
+        logger.info(f"Completed rag build job: {job_id}")
+
+    except Exception as err:
+
+        logger.error(f"Error occured while running rag build job {job_id}: {err}")
+        await job_repository.update(
+            job_id=job_id,
+            status=RAGBuildStatus.FAILED,
+            finished_at=time.time(),
+            error=str(err)
+        )
+        event: str = WebsocketEvent.RAG_BUILD_FAILED
+        status: str = RAGBuildStatus.FAILED
+        error: str = str(err)
+
+    finally:
+
+        await job_repository.release(session_id=session_id, chat_urn=chat_urn, job_id=job_id)
+
+    event_data: List[Dict[str, Any]] = [
+        {
+            "event": event,
+            "job_id": job_id,
+            "chat_urn": chat_urn,
+            "status": status,
+            "error": error,
+            "timestamp": f"{str(datetime.now().time().hour)}:{str(datetime.now().time().minute)}"
+        }
+    ]
+    await websocket_utility.send_json(
+        session_id=session_id,
+        event_data=event_data
+    )
+
+    return None
+
+
+@celery.task(
+    name='tasks.rag.build_rag',
+    acks_late=True,
+    reject_on_worker_lost=True,
+    time_limit=rag_configuration.build_time_limit_seconds
+)
+def build_rag(job_id: str, data: Dict[str, Any]) -> None:
+
+    get_event_loop().run_until_complete(run_build(job_id=job_id, data=data))
+
+    return None
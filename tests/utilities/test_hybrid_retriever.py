@@ -0,0 +1,75 @@
+import asyncio
+import pytest
+
+np = pytest.importorskip("numpy")
+faiss = pytest.importorskip("faiss")
+pytest.importorskip("langchain_community")
+
+from langchain.schema import Document
+from langchain_community.vectorstores import FAISS
+from langchain_core.embeddings import Embeddings
+from typing_extensions import List
+
+from utilities.docstore import SQLiteDocstore
+from utilities.hybrid_retriever import HybridRetriever
+
+
+TOPICS: List[str] = ["billing", "refunds", "shipping", "returns", "warranty"]
+
+
+class TopicEmbeddings(Embeddings):
+    """
+    One axis per topic, so dense search ranks chunks by the topic they mention.
+    """
+
+    def embed_query(self, text: str) -> List[float]:
+        return [1.0 if topic in text.lower() else 0.0 for topic in TOPICS]
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self.embed_query(text) for text in texts]
+
+
+@pytest.fixture
+def retriever(tmp_path) -> HybridRetriever:
+
+    embeddings: TopicEmbeddings = TopicEmbeddings()
+    docstore: SQLiteDocstore = SQLiteDocstore(path=str(tmp_path / "docstore.db"))
+    index = faiss.IndexFlatL2(len(TOPICS))
+
+    texts: List[str] = [f"Chunk about {topic}, reference INV-{position}" for position, topic in enumerate(TOPICS)]
+    ids: List[str] = [f"chunk-{position}" for position in range(len(texts))]
+    docstore.add({id: Document(page_content=text) for id, text in zip(ids, texts)})
+    index.add(np.asarray(embeddings.embed_documents(texts), dtype=np.float32))
+    docstore.index_to_docstore_id().update(dict(enumerate(ids)))
+
+    vector_store: FAISS = FAISS(
+        embedding_function=embeddings,
+        index=index,
+        docstore=docstore,
+        index_to_docstore_id=docstore.index_to_docstore_id()
+    )
+
+    return HybridRetriever(vector_store=vector_store, max_position=len(texts), k=2, fetch_k=len(texts))
+
+
+def test_ainvoke_over_fetches_rerank_candidates(retriever: HybridRetriever) -> None:
+
+    documents: List[Document] = asyncio.run(retriever.ainvoke("refunds for INV-4", k=4))
+
+    assert len(documents) == 4
+    contents: List[str] = [document.page_content for document in documents]
+    assert "Chunk about refunds, reference INV-1" in contents
+    assert "Chunk about warranty, reference INV-4" in contents
+
+
+def test_ainvoke_defaults_to_k(retriever: HybridRetriever) -> None:
+
+    documents: List[Document] = asyncio.run(retriever.ainvoke("shipping"))
+
+    assert len(documents) == 2
+    assert documents[0].page_content == "Chunk about shipping, reference INV-2"
+
+
+def test_ainvoke_matches_invoke(retriever: HybridRetriever) -> None:
+
+    assert asyncio.run(retriever.ainvoke("returns", k=3)) == retriever.invoke("returns", k=3)
@@ -1,6 +1,8 @@
+import io
 import os
 
 from pydub import AudioSegment
+from typing_extensions import BinaryIO
 
 from abstractions.utility import IUtility
 
@@ -52,3 +54,19 @@ class AudioUtility(IUtility):
         self.logger.debug("Converted Audio bytes to WAV")
 
         return audio_file_path
+
+    async def convert_buffer_to_wav(self, audio_buffer: BinaryIO) -> io.BytesIO:
+        """
+        Convert an in-memory audio upload to a high bit rate wav buffer without touching disk.
+        """
+        self.logger.debug("Decoding audio buffer")
+        audio = AudioSegment.from_file(audio_buffer)
+        self.logger.debug("Decoded audio buffer")
+
+        self.logger.debug("Exporting audio buffer as high bit rate wav.")
+        wav_buffer = io.BytesIO()
+        audio.export(wav_buffer, format="wav", bitrate="320k")
+        wav_buffer.seek(0)
+        self.logger.debug("Exported audio buffer as high bit rate wav.")
+
+        return wav_buffer
@@ -0,0 +1,74 @@
+import json
+
+from typing_extensions import Any, Dict, List
+
+from abstractions.utility import IUtility
+
+from start_utils import redis_session
+
+
+class CacheUtility(IUtility):
+    """
+    Async helpers over the pooled Redis client. Multi-key helpers are sent as a
+    single pipeline so a batch costs one network round-trip.
+    """
+
+    def __init__(self, urn: str = None) -> None:
+        super().__init__(urn)
+        self.urn = urn
+
+    async def ping(self) -> bool:
+
+        try:
+            return bool(await redis_session.ping())
+        except Exception as err:
+            self.logger.error(f"Redis health check failed: {err}")
+            return False
+
+    async def get_json(self, key: str, default: Any = None) -> Any:
+
+        value = await redis_session.get(key)
+        if value is None:
+            return default
+
+        return json.loads(value)
+
+    async def set_json(self, key: str, value: Any, ttl: int = None, nx: bool = False) -> bool:
+
+        return bool(await redis_session.set(key, json.dumps(value), ex=ttl, nx=nx))
+
+    async def get_many_json(self, keys: List[str], default: Any = None) -> Dict[str, Any]:
+
+        if not keys:
+            return {}
+
+        async with redis_session.pipeline(transaction=False) as pipeline:
+            for key in keys:
+                pipeline.get(key)
+            values: List[Any] = await pipeline.execute()
+
+        return {key: json.loads(value) if value is not None else default for key, value in zip(keys, values)}
+
+    async def set_many_json(self, values: Dict[str, Any], ttl: int = None, nx: bool = False) -> Dict[str, bool]:
+        """
+        Write every key in ``values`` in one round-trip. With ``nx`` existing keys are left untouched.
+
+        Returns:
+            Dict[str, bool]: Whether each key was written.
+        """
+        if not values:
+            return {}
+
+        async with redis_session.pipeline(transaction=False) as pipeline:
+            for key, value in values.items():
+                pipeline.set(key, json.dumps(value), ex=ttl, nx=nx)
+            results: List[Any] = await pipeline.execute()
+
+        return {key: bool(result) for key, result in zip(values.keys(), results)}
+
+    async def delete(self, *keys: str) -> int:
+
+        if not keys:
+            return 0
+
+        return await redis_session.delete(*keys)
@@ -0,0 +1,165 @@
+import asyncio
+import threading
+
+from cassandra.auth import PlainTextAuthProvider
+from cassandra.cluster import ResponseFuture, ResultSet, Session
+from cassandra.cqlengine import connection
+from cassandra.policies import DCAwareRoundRobinPolicy, TokenAwarePolicy
+from cassandra.query import PreparedStatement
+from typing_extensions import Any, Dict, List, Optional, Sequence, Tuple
+
+from abstractions.utility import IUtility
+
+
+class CassandraUtility(IUtility):
+    """
+    Owns the process wide Cassandra cluster and session used by the cqlengine
+    models.
+
+    ``connect`` is called once per process, from the app lifespan, the Celery
+    worker process init signal or a script, and is a no-op when already
+    connected. Repositories never open connections themselves; schema changes
+    are applied by ``scripts/nosql/cassandra/migrate.py``.
+
+    Requests are routed token aware, straight to a replica of the partition
+    for prepared statements. ``execute_async`` and ``execute_page`` bridge the
+    driver's response futures to asyncio so queries never block the event loop.
+    """
+
+    def __init__(
+        self,
+        hosts: List[str],
+        keyspace: str,
+        username: str = None,
+        password: str = None,
+        protocol_version: int = 3,
+        urn: str = None
+    ) -> None:
+        super().__init__(urn)
+        self.urn = urn
+        self.hosts = hosts
+        self.keyspace = keyspace
+        self.username = username
+        self.password = password
+        self.protocol_version = protocol_version
+        self.lock = threading.Lock()
+        self.connected: bool = False
+        self.prepared_statements: Dict[str, PreparedStatement] = {}
+
+    def connect(self) -> None:
+
+        with self.lock:
+
+            if self.connected:
+                return None
+
+            self.logger.info(f"Connecting to Cassandra: {self.hosts}")
+            connection.setup(
+                hosts=self.hosts,
+                default_keyspace=self.keyspace,
+                protocol_version=self.protocol_version,
+                auth_provider=PlainTextAuthProvider(username=self.username, password=self.password),
+                load_balancing_policy=TokenAwarePolicy(DCAwareRoundRobinPolicy())
+            )
+            self.connected = True
+            self.logger.info(f"Connected to Cassandra: {self.hosts}")
+
+        return None
+
+    def session(self) -> Session:
+
+        self.connect()
+
+        return connection.get_session()
+
+    def prepare(self, query: str) -> PreparedStatement:
+        """
+        Prepares ``query`` once per connection. Blocks on the first call for a
+        query, so call it from an executor or at startup.
+        """
+
+        statement: PreparedStatement = self.prepared_statements.get(query)
+        if statement is None:
+            statement = self.session().prepare(query)
+            self.prepared_statements[query] = statement
+
+        return statement
+
+    async def __session(self) -> Session:
+        """
+        ``session`` for coroutines: connecting blocks, so a connection the
+        startup could not open is retried in an executor.
+        """
+
+        if not self.connected:
+            await asyncio.get_running_loop().run_in_executor(None, self.connect)
+
+        return connection.get_session()
+
+    async def __await_response(self, response_future: ResponseFuture) -> Any:
+
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future = loop.create_future()
+
+        def resolve(result: Any) -> None:
+            if not future.done():
+                future.set_result(result)
+
+        def reject(err: BaseException) -> None:
+            if not future.done():
+                future.set_exception(err)
+
+        response_future.add_callbacks(
+            callback=lambda rows: loop.call_soon_threadsafe(resolve, rows),
+            errback=lambda err: loop.call_soon_threadsafe(reject, err)
+        )
+
+        return await future
+
+    async def execute_async(self, statement: Any, parameters: Sequence[Any] = None) -> Any:
+        """
+        Runs ``statement`` with ``session.execute_async`` and awaits the result
+        without blocking the event loop.
+        """
+
+        session: Session = await self.__session()
+
+        return await self.__await_response(session.execute_async(statement, parameters))
+
+    async def execute_page(
+        self,
+        statement: Any,
+        parameters: Sequence[Any] = None,
+        paging_state: Optional[bytes] = None
+    ) -> Tuple[List[Any], Optional[bytes]]:
+        """
+        Awaits the single page of ``statement`` that starts at ``paging_state``,
+        sized by the statement's ``fetch_size``.
+
+        Returns:
+            Tuple[List[Any], Optional[bytes]]: The page's rows and the paging
+            state of the next page, None when the query is exhausted.
+        """
+
+        session: Session = await self.__session()
+        response_future: ResponseFuture = session.execute_async(statement, parameters, paging_state=paging_state)
+        await self.__await_response(response_future)
+
+        # The page has arrived, so ``result`` returns without blocking.
+        result_set: ResultSet = response_future.result()
+
+        return list(result_set.current_rows), result_set.paging_state
+
+    def shutdown(self) -> None:
+
+        with self.lock:
+
+            if not self.connected:
+                return None
+
+            self.logger.info("Shutting down Cassandra connection")
+            connection.get_cluster().shutdown()
+            self.connected = False
+            self.prepared_statements.clear()
+
+        return None
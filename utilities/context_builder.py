@@ -0,0 +1,135 @@
+import math
+
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
+from typing_extensions import Any, Deque, Dict, List, Tuple
+
+from abstractions.utility import IUtility
+
+
+@dataclass
+class ChatContext:
+
+    sequence: int
+    messages: Deque[Tuple[BaseMessage, int]] = field(default_factory=deque)
+    tokens: int = 0
+
+
+class ChatContextBuilder(IUtility):
+    """
+    Builds the llm message list for a chat within a token budget.
+
+    The prepared history of each chat is cached together with the conversation
+    sequence it reflects, so a turn only converts the turns appended since the
+    previous one. Instructions and the pending prompt are always kept; the oldest
+    history is dropped first when the budget is exceeded. Token counts are an
+    estimate of ``chars_per_token`` characters per token.
+    """
+
+    MESSAGE_OVERHEAD_TOKENS: int = 4
+
+    def __init__(self, token_budget: int, max_chats: int, chars_per_token: int = 4, urn: str = None) -> None:
+        super().__init__(urn)
+        self.urn = urn
+        self.token_budget = token_budget
+        self.max_chats = max_chats
+        self.chars_per_token = chars_per_token
+        self.contexts: "OrderedDict[str, ChatContext]" = OrderedDict()
+        self.hits: int = 0
+        self.misses: int = 0
+
+    def count_tokens(self, message: BaseMessage) -> int:
+        return math.ceil(len(str(message.content)) / self.chars_per_token) + self.MESSAGE_OVERHEAD_TOKENS
+
+    def to_message(self, turn: Dict[str, str]) -> BaseMessage:
+
+        if "ai" in turn:
+            return AIMessage(content=turn.get("ai", ""))
+
+        return HumanMessage(content=turn.get("human", ""))
+
+    def sequence(self, chat_urn: str) -> Any:
+
+        context: ChatContext = self.contexts.get(chat_urn)
+
+        return context.sequence if context else None
+
+    def update(self, chat_urn: str, base_sequence: Any, sequence: int, full: bool, turns: List[Dict[str, str]]) -> bool:
+        """
+        Apply turns read from the conversation store after ``base_sequence``.
+
+        Returns:
+            bool: False if the turns are a delta that no longer lines up with the cached
+            history (another turn updated it in between); the caller should re-read the full window.
+        """
+        context: ChatContext = self.contexts.get(chat_urn)
+
+        if full or context is None:
+            self.misses += 1
+            context = ChatContext(sequence=sequence)
+        elif context.sequence == sequence:
+            self.hits += 1
+            self.contexts.move_to_end(chat_urn)
+            return True
+        elif context.sequence != base_sequence:
+            self.contexts.pop(chat_urn, None)
+            return False
+        else:
+            self.hits += 1
+            context.sequence = sequence
+
+        for turn in turns:
+            message: BaseMessage = self.to_message(turn=turn)
+            tokens: int = self.count_tokens(message=message)
+            context.messages.append((message, tokens))
+            context.tokens += tokens
+
+        while context.messages and context.tokens > self.token_budget:
+            _, tokens = context.messages.popleft()
+            context.tokens -= tokens
+
+        self.contexts[chat_urn] = context
+        self.contexts.move_to_end(chat_urn)
+        while len(self.contexts) > self.max_chats:
+            self.contexts.popitem(last=False)
+
+        return True
+
+    def build(self, chat_urn: str, pending: List[BaseMessage], instructions: List[BaseMessage]) -> List[BaseMessage]:
+        """
+        Assemble history, then ``pending`` and ``instructions``, keeping as much recent
+        history as fits in the budget left after the messages that must be sent.
+        """
+        reserved: int = sum(self.count_tokens(message=message) for message in pending + instructions)
+        remaining: int = self.token_budget - reserved
+
+        history: List[BaseMessage] = []
+        context: ChatContext = self.contexts.get(chat_urn)
+        if context is not None:
+            for message, tokens in reversed(context.messages):
+                if tokens > remaining:
+                    break
+                history.append(message)
+                remaining -= tokens
+            history.reverse()
+
+        while history and isinstance(history[0], AIMessage):
+            history.pop(0)
+
+        return history + pending + instructions
+
+    def evict(self, chat_urn: str) -> None:
+
+        self.contexts.pop(chat_urn, None)
+
+        return None
+
+    def metrics(self) -> Dict[str, int]:
+
+        return {
+            "chats": len(self.contexts),
+            "hits": self.hits,
+            "misses": self.misses,
+            "token_budget": self.token_budget
+        }
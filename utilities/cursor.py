@@ -0,0 +1,75 @@
+import base64
+import hashlib
+import hmac
+import json
+
+from typing import Dict, Optional
+
+from abstractions.utility import IUtility
+
+
+class CursorUtility(IUtility):
+    """
+    Opaque continuation tokens for paged reads.
+
+    A token wraps the Cassandra paging state of the next page together with the
+    scope of the query it belongs to (user, chat, chat type, ...), signed with
+    HMAC-SHA256. Clients can only hand back tokens the API issued, and a token
+    is only accepted by the same query it was issued for.
+    """
+
+    def __init__(self, secret_key: str, urn: str = None) -> None:
+        super().__init__(urn)
+        self.urn = urn
+        self.secret_key = (secret_key or "").encode("utf-8")
+
+    def __sign(self, payload: bytes) -> str:
+        return base64.urlsafe_b64encode(hmac.new(self.secret_key, payload, hashlib.sha256).digest()).decode("ascii").rstrip("=")
+
+    @staticmethod
+    def __pad(value: str) -> str:
+        return value + "=" * (-len(value) % 4)
+
+    def encode(self, paging_state: Optional[bytes], **scope: str) -> Optional[str]:
+        """
+        Returns the token for ``paging_state``, or None when there is no next page.
+        """
+
+        if not paging_state:
+            return None
+
+        payload: bytes = json.dumps(
+            {"scope": scope, "paging_state": base64.b64encode(paging_state).decode("ascii")},
+            separators=(",", ":"),
+            sort_keys=True
+        ).encode("utf-8")
+
+        return f"{base64.urlsafe_b64encode(payload).decode('ascii').rstrip('=')}.{self.__sign(payload)}"
+
+    def decode(self, cursor: Optional[str], **scope: str) -> Optional[bytes]:
+        """
+        Returns the paging state wrapped in ``cursor``, None for the first page.
+
+        Raises:
+            ValueError: If the token is malformed, was not issued by this API or
+                belongs to a different query.
+        """
+
+        if not cursor:
+            return None
+
+        try:
+
+            encoded_payload, signature = cursor.split(".", 1)
+            payload: bytes = base64.urlsafe_b64decode(self.__pad(encoded_payload))
+            if not hmac.compare_digest(signature, self.__sign(payload)):
+                raise ValueError("signature mismatch")
+
+            decoded: Dict = json.loads(payload)
+            if decoded.get("scope") != scope:
+                raise ValueError("scope mismatch")
+
+            return base64.b64decode(decoded["paging_state"])
+
+        except (ValueError, KeyError, TypeError) as err:
+            raise ValueError(f"Invalid cursor: {err}") from err
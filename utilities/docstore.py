@@ -0,0 +1,302 @@
+import json
+import os
+import re
+import sqlite3
+import threading
+
+from collections.abc import MutableMapping
+from langchain.schema import Document
+from langchain_community.docstore.base import AddableMixin, Docstore
+from typing_extensions import Dict, Iterator, List, Set, Union
+
+from abstractions.utility import IUtility
+
+
+class SQLiteIndexToDocstoreId(MutableMapping):
+    """
+    ``index_to_docstore_id`` of a LangChain FAISS store, read from the docstore's
+    positions table on access instead of being held in memory.
+    """
+
+    def __init__(self, docstore: "SQLiteDocstore") -> None:
+        self.docstore = docstore
+
+    def __getitem__(self, position: int) -> str:
+
+        with self.docstore.lock:
+            row = self.docstore.connection.execute(
+                "SELECT id FROM positions WHERE position = ?",
+                (int(position),)
+            ).fetchone()
+
+        if row is None:
+            raise KeyError(position)
+
+        return row[0]
+
+    def __setitem__(self, position: int, id: str) -> None:
+        self.update({position: id})
+
+    def __delitem__(self, position: int) -> None:
+
+        with self.docstore.lock:
+            self.docstore.connection.execute("DELETE FROM positions WHERE position = ?", (int(position),))
+            self.docstore.connection.commit()
+
+        return None
+
+    def __iter__(self) -> Iterator[int]:
+
+        with self.docstore.lock:
+            positions: List[int] = [
+                row[0] for row in self.docstore.connection.execute("SELECT position FROM positions ORDER BY position")
+            ]
+
+        return iter(positions)
+
+    def __len__(self) -> int:
+
+        with self.docstore.lock:
+            return self.docstore.connection.execute("SELECT COUNT(*) FROM positions").fetchone()[0]
+
+    def update(self, positions: Dict[int, str] = (), **kwargs) -> None:
+
+        rows = [(int(position), id) for position, id in dict(positions, **kwargs).items()]
+        with self.docstore.lock:
+            self.docstore.connection.executemany(
+                "INSERT OR REPLACE INTO positions (position, id) VALUES (?, ?)",
+                rows
+            )
+            self.docstore.connection.commit()
+
+        return None
+
+
+class SQLiteDocstore(IUtility, Docstore, AddableMixin):
+    """
+    Chunk texts and metadata of one vector store, kept in SQLite next to its
+    FAISS index and read by id when a search returns them.
+
+    Replaces the pickled in-memory docstore, so opening a store costs a file
+    open rather than deserializing every chunk. The FAISS position to chunk id
+    mapping lives in the same database (see ``SQLiteIndexToDocstoreId``), as
+    does an FTS5 index of the chunk texts used for BM25 keyword search and a
+    registry of which uploaded documents each chunk came from.
+    """
+
+    FILE_NAME: str = "docstore.sqlite3"
+    TOKEN_PATTERN = re.compile(r"\w+")
+    BATCH_SIZE: int = 500
+
+    def __init__(self, path: str, urn: str = None) -> None:
+        super().__init__(urn)
+        self.urn = urn
+        self.path = path
+        self.lock = threading.Lock()
+
+        directory: str = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS documents (
+                id TEXT PRIMARY KEY,
+                page_content TEXT NOT NULL,
+                metadata TEXT NOT NULL
+            )
+            """
+        )
+        self.connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS positions (
+                position INTEGER PRIMARY KEY,
+                id TEXT NOT NULL
+            )
+            """
+        )
+        self.connection.execute("CREATE INDEX IF NOT EXISTS positions_id ON positions (id)")
+        self.connection.execute("CREATE VIRTUAL TABLE IF NOT EXISTS documents_fts USING fts5 (page_content)")
+        self.connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS document_chunks (
+                document_id TEXT NOT NULL,
+                chunk_id TEXT NOT NULL,
+                PRIMARY KEY (document_id, chunk_id)
+            )
+            """
+        )
+        self.connection.execute("CREATE INDEX IF NOT EXISTS document_chunks_chunk_id ON document_chunks (chunk_id)")
+        self.connection.commit()
+
+    def search(self, search: str) -> Union[str, Document]:
+
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT page_content, metadata FROM documents WHERE id = ?",
+                (search,)
+            ).fetchone()
+
+        if row is None:
+            return f"ID {search} not found."
+
+        return Document(page_content=row[0], metadata=json.loads(row[1]))
+
+    def add(self, texts: Dict[str, Document]) -> None:
+
+        rows = [
+            (id, document.page_content, json.dumps(document.metadata))
+            for id, document in texts.items()
+        ]
+        with self.lock:
+            self.connection.executemany(
+                """
+                INSERT INTO documents (id, page_content, metadata) VALUES (?, ?, ?)
+                ON CONFLICT (id) DO UPDATE SET page_content = excluded.page_content, metadata = excluded.metadata
+                """,
+                rows
+            )
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO documents_fts (rowid, page_content) SELECT rowid, page_content FROM documents WHERE id = ?",
+                [(row[0],) for row in rows]
+            )
+            self.connection.commit()
+
+        return None
+
+    def __delete(self, ids: List[str]) -> None:
+
+        self.connection.executemany(
+            "DELETE FROM documents_fts WHERE rowid IN (SELECT rowid FROM documents WHERE id = ?)",
+            [(id,) for id in ids]
+        )
+        self.connection.executemany("DELETE FROM documents WHERE id = ?", [(id,) for id in ids])
+
+        return None
+
+    def delete(self, ids: List[str]) -> None:
+
+        with self.lock:
+            self.__delete(ids=ids)
+            self.connection.commit()
+
+        return None
+
+    def indexed(self, ids: List[str]) -> Set[str]:
+        """
+        Returns:
+            Set[str]: The chunk ids among ``ids`` that already have an index position.
+        """
+        indexed: Set[str] = set()
+        with self.lock:
+            for start in range(0, len(ids), self.BATCH_SIZE):
+                batch: List[str] = ids[start:start + self.BATCH_SIZE]
+                rows = self.connection.execute(
+                    f"SELECT DISTINCT id FROM positions WHERE id IN ({','.join('?' * len(batch))})",
+                    batch
+                ).fetchall()
+                indexed.update(row[0] for row in rows)
+
+        return indexed
+
+    def next_position(self) -> int:
+
+        with self.lock:
+            return self.connection.execute("SELECT COALESCE(MAX(position) + 1, 0) FROM positions").fetchone()[0]
+
+    def link(self, document_id: str, chunk_ids: List[str]) -> None:
+
+        with self.lock:
+            self.connection.executemany(
+                "INSERT OR IGNORE INTO document_chunks (document_id, chunk_id) VALUES (?, ?)",
+                [(document_id, chunk_id) for chunk_id in chunk_ids]
+            )
+            self.connection.commit()
+
+        return None
+
+    def document_chunk_count(self, document_id: str) -> int:
+
+        with self.lock:
+            return self.connection.execute(
+                "SELECT COUNT(*) FROM document_chunks WHERE document_id = ?",
+                (document_id,)
+            ).fetchone()[0]
+
+    def exclusive_positions(self, document_id: str) -> Dict[int, str]:
+        """
+        Returns:
+            Dict[int, str]: Index positions and ids of the chunks of ``document_id``
+            that no other document shares.
+        """
+        with self.lock:
+            rows = self.connection.execute(
+                """
+                SELECT positions.position, positions.id FROM document_chunks
+                JOIN positions ON positions.id = document_chunks.chunk_id
+                WHERE document_chunks.document_id = ?
+                AND NOT EXISTS (
+                    SELECT 1 FROM document_chunks AS other
+                    WHERE other.chunk_id = document_chunks.chunk_id AND other.document_id != document_chunks.document_id
+                )
+                """,
+                (document_id,)
+            ).fetchall()
+
+        return {position: id for position, id in rows}
+
+    def remove_document(self, document_id: str, positions: Dict[int, str]) -> None:
+        """
+        Unlink ``document_id`` and delete its exclusive chunks at ``positions``,
+        once they have been removed from the index.
+        """
+        with self.lock:
+            self.connection.executemany("DELETE FROM positions WHERE position = ?", [(position,) for position in positions])
+            self.__delete(ids=list(positions.values()))
+            self.connection.execute("DELETE FROM document_chunks WHERE document_id = ?", (document_id,))
+            self.connection.commit()
+
+        return None
+
+    def keyword_search(self, query: str, k: int, max_position: int) -> List[str]:
+        """
+        BM25 search over the chunk texts, any query term matching.
+
+        Returns:
+            List[str]: Ids of the best ``k`` chunks at index positions below ``max_position``.
+        """
+        terms: List[str] = list(dict.fromkeys(self.TOKEN_PATTERN.findall(query.lower())))
+        if not terms:
+            return []
+
+        with self.lock:
+            rows = self.connection.execute(
+                """
+                SELECT documents.id FROM documents_fts
+                JOIN documents ON documents.rowid = documents_fts.rowid
+                JOIN positions ON positions.id = documents.id
+                WHERE documents_fts MATCH ? AND positions.position < ?
+                ORDER BY bm25(documents_fts)
+                LIMIT ?
+                """,
+                (" OR ".join(f'"{term}"' for term in terms), max_position, k)
+            ).fetchall()
+
+        return [row[0] for row in rows]
+
+    def truncate(self, max_position: int) -> None:
+        """
+        Drop positions at or past ``max_position``, left behind by a build that
+        wrote chunks but failed before saving its index.
+        """
+        with self.lock:
+            self.connection.execute("DELETE FROM positions WHERE position >= ?", (max_position,))
+            self.connection.commit()
+
+        return None
+
+    def index_to_docstore_id(self) -> SQLiteIndexToDocstoreId:
+        return SQLiteIndexToDocstoreId(docstore=self)
@@ -0,0 +1,188 @@
+import asyncio
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+import numpy as np
+
+from langchain_core.embeddings import Embeddings
+from typing_extensions import Dict, List, Tuple
+
+from abstractions.utility import IUtility
+
+
+class CachedEmbeddings(IUtility, Embeddings):
+    """
+    Content addressed, on-disk cache in front of an embeddings provider.
+
+    Document vectors are stored in SQLite keyed by sha256(model name, text), so
+    re-embedding a chunk that was seen before, in any upload, costs a local
+    lookup instead of a provider call. Once the stored vectors exceed
+    ``max_bytes`` the least recently used ones are evicted. Query embeddings are
+    passed straight through.
+    """
+
+    BATCH_SIZE: int = 500
+    EVICTION_WATERMARK: float = 0.9
+
+    def __init__(self, embeddings: Embeddings, model_name: str, path: str, max_bytes: int, urn: str = None) -> None:
+        super().__init__(urn)
+        self.urn = urn
+        self.embeddings = embeddings
+        self.model_name = model_name
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+        self.lock = threading.Lock()
+
+        directory: str = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS embeddings (
+                key TEXT PRIMARY KEY,
+                vector BLOB NOT NULL,
+                nbytes INTEGER NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self.connection.execute("CREATE INDEX IF NOT EXISTS embeddings_accessed_at ON embeddings (accessed_at)")
+        self.connection.commit()
+        self.nbytes: int = self.connection.execute("SELECT COALESCE(SUM(nbytes), 0) FROM embeddings").fetchone()[0]
+
+    def key(self, text: str) -> str:
+        return hashlib.sha256(f"{self.model_name}\0{text}".encode("utf-8")).hexdigest()
+
+    def __lookup(self, keys: List[str]) -> Dict[str, List[float]]:
+
+        vectors: Dict[str, List[float]] = {}
+        for start in range(0, len(keys), self.BATCH_SIZE):
+            batch: List[str] = keys[start:start + self.BATCH_SIZE]
+            placeholders: str = ",".join("?" * len(batch))
+            rows: List[Tuple[str, bytes]] = self.connection.execute(
+                f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})",
+                batch
+            ).fetchall()
+            for key, vector in rows:
+                vectors[key] = np.frombuffer(vector, dtype=np.float32).tolist()
+
+            self.connection.execute(
+                f"UPDATE embeddings SET accessed_at = ? WHERE key IN ({placeholders})",
+                [time.time(), *batch]
+            )
+
+        return vectors
+
+    def __store(self, vectors: Dict[str, List[float]]) -> None:
+
+        now: float = time.time()
+        rows = []
+        for key, vector in vectors.items():
+            blob: bytes = np.asarray(vector, dtype=np.float32).tobytes()
+            rows.append((key, blob, len(blob), now))
+
+        cursor = self.connection.executemany(
+            "INSERT OR IGNORE INTO embeddings (key, vector, nbytes, accessed_at) VALUES (?, ?, ?, ?)",
+            rows
+        )
+        if cursor.rowcount == len(rows):
+            self.nbytes += sum(row[2] for row in rows)
+        else:
+            self.nbytes = self.connection.execute("SELECT COALESCE(SUM(nbytes), 0) FROM embeddings").fetchone()[0]
+
+        return None
+
+    def __evict(self) -> None:
+
+        if self.nbytes <= self.max_bytes:
+            return None
+
+        target: int = int(self.max_bytes * self.EVICTION_WATERMARK)
+        keys: List[str] = []
+        for key, nbytes in self.connection.execute("SELECT key, nbytes FROM embeddings ORDER BY accessed_at"):
+            if self.nbytes <= target:
+                break
+            keys.append(key)
+            self.nbytes -= nbytes
+
+        for start in range(0, len(keys), self.BATCH_SIZE):
+            batch: List[str] = keys[start:start + self.BATCH_SIZE]
+            self.connection.execute(f"DELETE FROM embeddings WHERE key IN ({','.join('?' * len(batch))})", batch)
+
+        self.evictions += len(keys)
+        self.logger.debug(f"Evicted {len(keys)} cached embeddings")
+
+        return None
+
+    def lookup(self, texts: List[str]) -> Dict[int, List[float]]:
+        """
+        Returns:
+            Dict[int, List[float]]: Cached vectors by position in ``texts``.
+        """
+        keys: List[str] = [self.key(text=text) for text in texts]
+
+        with self.lock:
+            vectors: Dict[str, List[float]] = self.__lookup(keys=list(dict.fromkeys(keys)))
+            self.connection.commit()
+
+        cached: Dict[int, List[float]] = {index: vectors[key] for index, key in enumerate(keys) if key in vectors}
+        self.hits += len(cached)
+        self.misses += len(texts) - len(cached)
+        self.logger.debug(f"Embedding cache hits: {len(cached)}, misses: {len(texts) - len(cached)}")
+
+        return cached
+
+    def store(self, texts: List[str], vectors: List[List[float]]) -> None:
+
+        with self.lock:
+            self.__store(vectors={self.key(text=text): vector for text, vector in zip(texts, vectors)})
+            self.__evict()
+            self.connection.commit()
+
+        return None
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+
+        vectors: Dict[int, List[float]] = self.lookup(texts=texts)
+        missing: List[int] = [index for index in range(len(texts)) if index not in vectors]
+
+        if missing:
+
+            missing_texts: List[str] = [texts[index] for index in missing]
+            embedded: List[List[float]] = self.embeddings.embed_documents(missing_texts)
+            self.store(texts=missing_texts, vectors=embedded)
+            vectors.update(zip(missing, embedded))
+
+        return [vectors[index] for index in range(len(texts))]
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+
+        loop = asyncio.get_running_loop()
+
+        return await loop.run_in_executor(None, self.embed_documents, texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embeddings.embed_query(text)
+
+    async def aembed_query(self, text: str) -> List[float]:
+        return await self.embeddings.aembed_query(text)
+
+    def metrics(self) -> Dict[str, int]:
+
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "bytes": self.nbytes,
+            "max_bytes": self.max_bytes
+        }
@@ -0,0 +1,168 @@
+import asyncio
+import random
+
+from google.api_core.exceptions import ResourceExhausted
+from langchain_core.embeddings import Embeddings
+from langchain_google_genai._common import GoogleGenerativeAIError
+from typing_extensions import Awaitable, Callable, Dict, List, Optional
+
+from abstractions.utility import IUtility
+
+from errors.service_busy_error import ServiceBusyError
+
+from start_utils import embedding_rate_limiter, inference_scheduler, rag_configuration
+
+from utilities.embedding_cache import CachedEmbeddings
+
+
+class EmbeddingExecutor(IUtility):
+    """
+    Embeds chunks in packed batches with several batches in flight.
+
+    Cached vectors are resolved locally first. The remaining texts are packed into
+    batches bounded by both item count and characters, and each batch waits for
+    the shared rate limiter and an ``embeddings`` scheduler slot before it is
+    sent. Quota errors drain the rate limiter and the batch is retried with
+    exponential backoff; a full embeddings lane is retried the same way, waiting
+    at least its ``retry_after``.
+    """
+
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        urn: str = None,
+        priority: int = 0,
+        batch_size: int = None,
+        batch_max_chars: int = None,
+        concurrency: int = None,
+        max_retries: int = None,
+        backoff_seconds: float = None,
+        max_backoff_seconds: float = None
+    ) -> None:
+        super().__init__(urn)
+        self.urn = urn
+        self.embeddings = embeddings
+        self.priority = priority
+        self.batch_size = batch_size or rag_configuration.embedding_batch_size
+        self.batch_max_chars = batch_max_chars or rag_configuration.embedding_batch_max_chars
+        self.concurrency = concurrency or rag_configuration.embedding_concurrency
+        self.max_retries = max_retries if max_retries is not None else rag_configuration.embedding_max_retries
+        self.backoff_seconds = backoff_seconds or rag_configuration.embedding_backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds or rag_configuration.embedding_max_backoff_seconds
+
+    def pack(self, indices: List[int], texts: List[str]) -> List[List[int]]:
+        """
+        Greedily pack ``indices`` into batches of at most ``batch_size`` texts and ``batch_max_chars`` characters.
+        """
+        batches: List[List[int]] = []
+        batch: List[int] = []
+        batch_chars: int = 0
+        for index in indices:
+
+            chars: int = len(texts[index])
+            if batch and (len(batch) >= self.batch_size or batch_chars + chars > self.batch_max_chars):
+                batches.append(batch)
+                batch, batch_chars = [], 0
+
+            batch.append(index)
+            batch_chars += chars
+
+        if batch:
+            batches.append(batch)
+
+        return batches
+
+    async def __embed_batch(self, texts: List[str]) -> List[List[float]]:
+
+        provider: Embeddings = self.embeddings.embeddings if isinstance(self.embeddings, CachedEmbeddings) else self.embeddings
+
+        attempt: int = 0
+        while True:
+
+            await embedding_rate_limiter.acquire()
+            try:
+
+                return await inference_scheduler.run(
+                    "embeddings",
+                    provider.embed_documents,
+                    texts,
+                    priority=self.priority
+                )
+
+            except (GoogleGenerativeAIError, ResourceExhausted, ServiceBusyError) as err:
+
+                if isinstance(err, GoogleGenerativeAIError) and not isinstance(err.__cause__, ResourceExhausted):
+                    raise err
+
+                attempt += 1
+                if attempt > self.max_retries:
+                    self.logger.error(f"Embedding batch still rejected after {self.max_retries} retries: {err}")
+                    raise err
+
+                backoff: float = min(self.max_backoff_seconds, self.backoff_seconds * 2 ** (attempt - 1))
+                backoff += random.uniform(0, backoff / 2)
+
+                if isinstance(err, ServiceBusyError):
+                    backoff = max(backoff, err.retry_after or 0)
+                    self.logger.debug(f"Embeddings lane busy, retrying batch in {backoff:.2f}s (attempt {attempt})")
+                else:
+                    self.logger.debug(f"Embedding quota exhausted, retrying batch in {backoff:.2f}s (attempt {attempt})")
+                    embedding_rate_limiter.penalize(seconds=backoff)
+
+                await asyncio.sleep(backoff)
+
+    async def embed(
+        self,
+        texts: List[str],
+        on_progress: Optional[Callable[[int, int], Awaitable[None]]] = None
+    ) -> List[List[float]]:
+        """
+        Embed ``texts``, calling ``on_progress(embedded, total)`` as batches complete.
+
+        Returns:
+            List[List[float]]: One vector per text, in order.
+        """
+        if not texts:
+            return []
+
+        vectors: Dict[int, List[float]] = {}
+        if isinstance(self.embeddings, CachedEmbeddings):
+            loop = asyncio.get_running_loop()
+            vectors = await loop.run_in_executor(None, self.embeddings.lookup, texts)
+
+        missing: List[int] = [index for index in range(len(texts)) if index not in vectors]
+        batches: List[List[int]] = self.pack(indices=missing, texts=texts)
+        self.logger.debug(f"Embedding {len(missing)} of {len(texts)} texts in {len(batches)} batches")
+
+        if on_progress is not None:
+            await on_progress(len(vectors), len(texts))
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def run_batch(batch: List[int]) -> None:
+
+            async with semaphore:
+
+                batch_texts: List[str] = [texts[index] for index in batch]
+                batch_vectors: List[List[float]] = await self.__embed_batch(texts=batch_texts)
+
+            if isinstance(self.embeddings, CachedEmbeddings):
+                loop = asyncio.get_running_loop()
+                await loop.run_in_executor(None, self.embeddings.store, batch_texts, batch_vectors)
+
+            vectors.update(zip(batch, batch_vectors))
+            if on_progress is not None:
+                await on_progress(len(vectors), len(texts))
+
+            return None
+
+        tasks: List[asyncio.Task] = [asyncio.create_task(run_batch(batch=batch)) for batch in batches]
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+
+        return [vectors[index] for index in range(len(texts))]
@@ -0,0 +1,141 @@
+import re
+
+from dataclasses import dataclass
+from typing_extensions import Any, Callable, Dict, List, Optional, Tuple
+
+from abstractions.utility import IUtility
+
+
+@dataclass
+class EventRoute:
+
+    event_pattern: str
+    func: Callable
+    class_name: str
+    regex: Optional[re.Pattern] = None
+    handler_class: Optional[type] = None
+
+
+class EventRouter(IUtility):
+    """
+    Websocket event router.
+
+    Patterns that are plain anchored literals (``^message/image/captioning$``) are
+    stored in a dict and resolved with a single lookup; only true regex patterns
+    are scanned. Handler classes are resolved once in ``bind`` instead of on
+    every dispatch.
+    """
+
+    def __init__(self, urn: str = None) -> None:
+        super().__init__(urn)
+        self.urn = urn
+        self.exact_routes: Dict[str, EventRoute] = {}
+        self.pattern_routes: List[EventRoute] = []
+        self.handler_names: Dict[str, str] = {}
+
+    @staticmethod
+    def literal_event_name(event_pattern: str) -> Optional[str]:
+        """
+        Return the event name matched by ``event_pattern`` if it is an anchored literal, else None.
+        """
+        if not event_pattern.endswith("$"):
+            return None
+
+        event_name: str = event_pattern[1:-1] if event_pattern.startswith("^") else event_pattern[:-1]
+        if re.escape(event_name) != event_name:
+            return None
+
+        return event_name
+
+    def register(self, event_pattern: str, func: Callable) -> Callable:
+
+        self.logger.debug(f"Registering event: {event_pattern}")
+        qualname: str = func.__qualname__
+        if qualname in self.handler_names:
+            raise RuntimeError(
+                f"Handler {qualname} is bound to both {self.handler_names[qualname]} and {event_pattern}. "
+                "The later definition overwrites the earlier one on the class."
+            )
+
+        route = EventRoute(
+            event_pattern=event_pattern,
+            func=func,
+            class_name=qualname.split(".")[0]
+        )
+
+        event_name: Optional[str] = self.literal_event_name(event_pattern)
+        if event_name is not None:
+
+            if event_name in self.exact_routes:
+                raise RuntimeError(f"Event {event_name} is already registered to {self.exact_routes[event_name].func.__qualname__}.")
+            self.exact_routes[event_name] = route
+
+        else:
+
+            if any(pattern_route.event_pattern == event_pattern for pattern_route in self.pattern_routes):
+                raise RuntimeError(f"Event pattern {event_pattern} is already registered.")
+            route.regex = re.compile(event_pattern)
+            self.pattern_routes.append(route)
+
+        self.handler_names[qualname] = event_pattern
+        self.logger.debug(f"Registered event: {event_pattern}")
+
+        return func
+
+    def on_event(self, event_pattern: str) -> Callable:
+        """
+        A decorator that registers a websocket handler method to an event pattern.
+        """
+        def decorator(func: Callable) -> Callable:
+            return self.register(event_pattern=event_pattern, func=func)
+        return decorator
+
+    def bind(self, handler_classes: Dict[str, type]) -> None:
+        """
+        Resolve the handler class of every registered route.
+
+        Raises:
+            RuntimeError: If a class is missing or a handler was shadowed on its class.
+        """
+        self.logger.debug("Binding websocket handler classes")
+        for route in [*self.exact_routes.values(), *self.pattern_routes]:
+
+            handler_class: Optional[type] = handler_classes.get(route.class_name, route.handler_class)
+            if handler_class is None:
+                continue
+
+            if getattr(handler_class, route.func.__name__, None) is not route.func:
+                raise RuntimeError(f"Handler {route.func.__qualname__} for {route.event_pattern} is shadowed by another attribute on {route.class_name}.")
+            route.handler_class = handler_class
+        self.logger.debug("Bound websocket handler classes")
+
+        return None
+
+    def resolve(self, event_name: str) -> Tuple[Optional[EventRoute], Dict[str, Any]]:
+
+        route: Optional[EventRoute] = self.exact_routes.get(event_name)
+        if route is not None:
+            return route, {}
+
+        for route in self.pattern_routes:
+            match = route.regex.match(event_name)
+            if match:
+                return route, match.groupdict()
+
+        return None, {}
+
+    async def dispatch(self, event_name: str, *args: Any, **kwargs: Any) -> Any:
+        """
+        Trigger the handler registered for ``event_name``.
+        """
+        self.logger.debug(f"Triggering event: {event_name}")
+        route, groups = self.resolve(event_name)
+
+        if route is None:
+            self.logger.debug(f"No route registered for event '{event_name}'")
+            return None
+
+        if route.handler_class is None:
+            raise RuntimeError(f"Found no websocket handler class with name {route.class_name} binded to event {event_name}.")
+
+        return await route.func(route.handler_class, *args, **kwargs, **groups)
@@ -0,0 +1,202 @@
+import math
+
+import faiss
+import numpy as np
+
+from typing_extensions import Tuple
+
+from abstractions.utility import IUtility
+
+
+class FAISSIndexUtility(IUtility):
+    """
+    Chooses and (re)builds the FAISS index type for a chat by corpus size.
+
+    Small corpora stay on an exact flat index, mid-sized ones move to HNSW and
+    large ones to IVF with optional SQ8/PQ compression. An index is rebuilt only
+    when its size crosses into another tier or outgrows its IVF partitioning by
+    ``nlist_growth``; the vectors are reconstructed from the current index.
+
+    Built indexes are wrapped in ``IDMap2`` so every vector keeps its label (its
+    docstore position) across rebuilds and removals.
+    """
+
+    def __init__(
+        self,
+        flat_max_vectors: int,
+        hnsw_max_vectors: int,
+        hnsw_m: int = 32,
+        hnsw_ef_search: int = 64,
+        ivf_nprobe: int = 16,
+        compression: str = "Flat",
+        nlist_growth: float = 2.0,
+        urn: str = None
+    ) -> None:
+        super().__init__(urn)
+        self.urn = urn
+        self.flat_max_vectors = flat_max_vectors
+        self.hnsw_max_vectors = hnsw_max_vectors
+        self.hnsw_m = hnsw_m
+        self.hnsw_ef_search = hnsw_ef_search
+        self.ivf_nprobe = ivf_nprobe
+        self.compression = compression
+        self.nlist_growth = nlist_growth
+
+    def nlist(self, n_vectors: int) -> int:
+        """
+        Number of IVF partitions, about 4 * sqrt(n) rounded to a power of two, while
+        keeping at least 39 training points per partition.
+        """
+        nlist: int = 2 ** round(math.log2(max(16.0, 4 * math.sqrt(n_vectors))))
+
+        return max(1, min(nlist, n_vectors // 39))
+
+    def index_spec(self, n_vectors: int) -> Tuple[str, str]:
+        """
+        Returns:
+            Tuple[str, str]: The tier (flat, hnsw or ivf) and the faiss index factory string.
+        """
+        if n_vectors <= self.flat_max_vectors:
+            return "flat", "Flat"
+
+        if n_vectors <= self.hnsw_max_vectors:
+            return "hnsw", f"HNSW{self.hnsw_m}"
+
+        return "ivf", f"IVF{self.nlist(n_vectors=n_vectors)},{self.compression}"
+
+    def unwrap(self, index: faiss.Index) -> faiss.Index:
+
+        index = faiss.downcast_index(index)
+        if isinstance(index, faiss.IndexIDMap):
+            return faiss.downcast_index(index.index)
+
+        return index
+
+    def ids(self, index: faiss.Index) -> np.ndarray:
+        """
+        Returns:
+            np.ndarray: The labels of the vectors in ``index``, in storage order.
+        """
+        downcast = faiss.downcast_index(index)
+        if isinstance(downcast, faiss.IndexIDMap):
+            return faiss.vector_to_array(downcast.id_map)
+
+        return np.arange(index.ntotal, dtype=np.int64)
+
+    def next_id(self, index: faiss.Index) -> int:
+
+        ids: np.ndarray = self.ids(index=index)
+
+        return int(ids.max()) + 1 if len(ids) else 0
+
+    def describe(self, index: faiss.Index) -> Tuple[str, int]:
+        """
+        Returns:
+            Tuple[str, int]: The tier of ``index`` and its number of IVF partitions (0 otherwise).
+        """
+        index = self.unwrap(index=index)
+        if isinstance(index, faiss.IndexIVF):
+            return "ivf", index.nlist
+        if isinstance(index, faiss.IndexHNSW):
+            return "hnsw", 0
+
+        return "flat", 0
+
+    def needs_rebuild(self, index: faiss.Index) -> bool:
+
+        tier, nlist = self.describe(index=index)
+        target_tier, _ = self.index_spec(n_vectors=index.ntotal)
+        if tier != target_tier:
+            return True
+
+        return tier == "ivf" and self.nlist(n_vectors=index.ntotal) >= nlist * self.nlist_growth
+
+    def reconstruct(self, index: faiss.Index) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: The labels and the vectors stored in ``index``.
+        """
+        inner: faiss.Index = self.unwrap(index=index)
+        ivf_index = faiss.try_extract_index_ivf(inner)
+        if ivf_index is not None:
+            ivf_index.make_direct_map()
+
+        return self.ids(index=index), inner.reconstruct_n(0, inner.ntotal)
+
+    def configure(self, index: faiss.Index) -> faiss.Index:
+        """
+        Apply the search time parameters of the index tier.
+        """
+        downcast = self.unwrap(index=index)
+        if isinstance(downcast, faiss.IndexIVF):
+            downcast.nprobe = min(self.ivf_nprobe, downcast.nlist)
+        elif isinstance(downcast, faiss.IndexHNSW):
+            downcast.hnsw.efSearch = self.hnsw_ef_search
+
+        return index
+
+    def build(self, vectors: np.ndarray, ids: np.ndarray = None, metric: int = faiss.METRIC_L2) -> faiss.Index:
+
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        ids = np.arange(len(vectors), dtype=np.int64) if ids is None else np.asarray(ids, dtype=np.int64)
+        _, spec = self.index_spec(n_vectors=len(vectors))
+        self.logger.debug(f"Building {spec} index over {len(vectors)} vectors")
+
+        index: faiss.Index = faiss.index_factory(vectors.shape[1], f"IDMap2,{spec}", metric)
+        if not index.is_trained:
+            index.train(vectors)
+        index.add_with_ids(vectors, ids)
+
+        return self.configure(index=index)
+
+    def add(self, index: faiss.Index, vectors: np.ndarray, ids: np.ndarray) -> faiss.Index:
+        """
+        Add ``vectors`` labelled ``ids``. Returns ``index``, or a rebuilt one when
+        an index without an id map cannot take the labels in order.
+        """
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        ids = np.asarray(ids, dtype=np.int64)
+
+        if isinstance(faiss.downcast_index(index), faiss.IndexIDMap):
+            index.add_with_ids(vectors, ids)
+            return index
+
+        if np.array_equal(ids, np.arange(index.ntotal, index.ntotal + len(ids))):
+            index.add(vectors)
+            return index
+
+        existing_ids, existing_vectors = self.reconstruct(index=index)
+
+        return self.build(
+            vectors=np.vstack([existing_vectors, vectors]),
+            ids=np.concatenate([existing_ids, ids]),
+            metric=index.metric_type
+        )
+
+    def remove(self, index: faiss.Index, ids: np.ndarray) -> faiss.Index:
+        """
+        Returns:
+            faiss.Index: An index of the right type for the remaining size, holding
+            every vector of ``index`` except those labelled ``ids``.
+        """
+        existing_ids, vectors = self.reconstruct(index=index)
+        keep: np.ndarray = ~np.isin(existing_ids, np.asarray(ids, dtype=np.int64))
+        self.logger.debug(f"Removing {int((~keep).sum())} of {len(existing_ids)} vectors")
+
+        return self.build(vectors=vectors[keep], ids=existing_ids[keep], metric=index.metric_type)
+
+    def adapt(self, index: faiss.Index) -> faiss.Index:
+        """
+        Return ``index`` unchanged if it still suits its size, otherwise a rebuilt
+        index of the right type holding the same labelled vectors.
+        """
+        if not self.needs_rebuild(index=index):
+            return self.configure(index=index)
+
+        self.logger.debug(f"Re-indexing {index.ntotal} vectors, current index: {self.describe(index=index)}")
+        ids, vectors = self.reconstruct(index=index)
+
+        return self.build(vectors=vectors, ids=ids, metric=index.metric_type)
+
+    def memory_bytes(self, index: faiss.Index) -> int:
+        return int(faiss.serialize_index(index).nbytes)
@@ -0,0 +1,87 @@
+import asyncio
+import numpy as np
+
+from langchain.schema import Document
+from langchain_community.vectorstores import FAISS
+from langchain_core.callbacks import AsyncCallbackManagerForRetrieverRun, CallbackManagerForRetrieverRun
+from langchain_core.retrievers import BaseRetriever
+from pydantic import ConfigDict
+from typing_extensions import Any, Dict, List, Optional
+
+
+class HybridRetriever(BaseRetriever):
+    """
+    Dense FAISS search and BM25 keyword search over the same chunks, merged with
+    reciprocal rank fusion.
+
+    Each ranking contributes ``1 / (rrf_k + rank)`` per chunk, so a chunk found
+    by exact terms (identifiers, numbers) is retrieved even when its embedding
+    is not among the nearest. Needs a vector store backed by ``SQLiteDocstore``;
+    ``max_position`` is one past the highest position in its index, so keyword
+    hits on chunks a running build has not yet indexed are skipped.
+    """
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    vector_store: FAISS
+    max_position: int
+    k: int = 6
+    fetch_k: int = 20
+    rrf_k: int = 60
+
+    def dense_search(self, embedding: List[float]) -> List[str]:
+
+        vector: np.ndarray = np.asarray([embedding], dtype=np.float32)
+        _, positions = self.vector_store.index.search(vector, self.fetch_k)
+
+        return [self.vector_store.index_to_docstore_id[position] for position in positions[0] if position != -1]
+
+    def keyword_search(self, query: str) -> List[str]:
+
+        return self.vector_store.docstore.keyword_search(
+            query=query,
+            k=self.fetch_k,
+            max_position=self.max_position
+        )
+
+    def fuse(self, *rankings: List[str], k: Optional[int] = None) -> List[str]:
+
+        scores: Dict[str, float] = {}
+        for ranking in rankings:
+            for rank, id in enumerate(ranking, start=1):
+                scores[id] = scores.get(id, 0.0) + 1.0 / (self.rrf_k + rank)
+
+        return sorted(scores, key=scores.get, reverse=True)[:k or self.k]
+
+    def retrieve(self, query: str, embedding: List[float], k: Optional[int] = None) -> List[Document]:
+
+        ids: List[str] = self.fuse(self.dense_search(embedding=embedding), self.keyword_search(query=query), k=k)
+        documents = [self.vector_store.docstore.search(id) for id in ids]
+
+        return [document for document in documents if isinstance(document, Document)]
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun, **kwargs: Any) -> List[Document]:
+        """
+        Accepts ``k`` to return more (or fewer) fused results than the default,
+        e.g. to over-fetch candidates for reranking.
+        """
+        return self.retrieve(
+            query=query,
+            embedding=self.vector_store.embedding_function.embed_query(query),
+            k=kwargs.get("k")
+        )
+
+    async def _aget_relevant_documents(self, query: str, *, run_manager: AsyncCallbackManagerForRetrieverRun, **kwargs: Any) -> List[Document]:
+        """
+        Async twin of ``_get_relevant_documents``, also accepting ``k``; the
+        blocking FAISS and SQLite searches run in an executor.
+        """
+        embedding: List[float] = await self.vector_store.embedding_function.aembed_query(query)
+
+        return await asyncio.get_running_loop().run_in_executor(
+            None,
+            self.retrieve,
+            query,
+            embedding,
+            kwargs.get("k")
+        )
@@ -0,0 +1,194 @@
+import asyncio
+import heapq
+import itertools
+import time
+
+from contextlib import asynccontextmanager
+from http import HTTPStatus
+from typing_extensions import Any, AsyncIterator, Callable, Dict, List, Tuple
+
+from abstractions.utility import IUtility
+
+from errors.service_busy_error import ServiceBusyError
+
+
+class InferenceLane:
+    """
+    Concurrency budget and bounded priority queue for a single inference backend.
+    """
+
+    def __init__(self, name: str, concurrency: int, queue_size: int) -> None:
+        self.name = name
+        self.concurrency = concurrency
+        self.queue_size = queue_size
+        self.running: int = 0
+        self.waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self.sequence = itertools.count()
+        self.admitted: int = 0
+        self.rejected: int = 0
+        self.completed: int = 0
+        self.wait_seconds_total: float = 0.0
+        self.wait_seconds_max: float = 0.0
+        self.execution_seconds_total: float = 0.0
+        self.execution_seconds_max: float = 0.0
+
+    def __busy(self, reason: str) -> ServiceBusyError:
+
+        self.rejected += 1
+        average_execution: float = self.execution_seconds_total / self.completed if self.completed else 1.0
+
+        return ServiceBusyError(
+            response_message=f"The {self.name} backend is busy, please try again shortly.",
+            response_key=reason,
+            http_status_code=HTTPStatus.SERVICE_UNAVAILABLE,
+            backend=self.name,
+            retry_after=round(average_execution * (len(self.waiters) + 1) / self.concurrency, 2)
+        )
+
+    async def acquire(self, priority: int, max_wait_seconds: float) -> float:
+        """
+        Wait for an execution slot. Higher ``priority`` values are served first.
+
+        Returns:
+            float: Seconds spent waiting in the queue.
+
+        Raises:
+            ServiceBusyError: If the queue is full or the wait exceeds ``max_wait_seconds``.
+        """
+        if self.running < self.concurrency and not self.waiters:
+            self.running += 1
+            self.admitted += 1
+            return 0.0
+
+        if len(self.waiters) >= self.queue_size:
+            raise self.__busy(reason="error_backend_queue_full")
+
+        start_time: float = time.monotonic()
+        future: asyncio.Future = asyncio.get_running_loop().create_future()
+        entry: Tuple[int, int, asyncio.Future] = (-priority, next(self.sequence), future)
+        heapq.heappush(self.waiters, entry)
+
+        try:
+
+            await asyncio.wait_for(future, timeout=max_wait_seconds)
+
+        except (asyncio.TimeoutError, asyncio.CancelledError) as err:
+
+            if future.done() and not future.cancelled():
+                self.release()
+            elif entry in self.waiters:
+                self.waiters.remove(entry)
+                heapq.heapify(self.waiters)
+
+            if isinstance(err, asyncio.TimeoutError):
+                raise self.__busy(reason="error_backend_wait_timeout")
+            raise
+
+        wait_seconds: float = time.monotonic() - start_time
+        self.admitted += 1
+        self.wait_seconds_total += wait_seconds
+        self.wait_seconds_max = max(self.wait_seconds_max, wait_seconds)
+
+        return wait_seconds
+
+    def release(self) -> None:
+        """
+        Hand the slot to the highest priority waiter, or free it.
+        """
+        while self.waiters:
+            _, _, future = heapq.heappop(self.waiters)
+            if not future.done():
+                future.set_result(None)
+                return None
+
+        self.running -= 1
+
+        return None
+
+    def record_execution(self, execution_seconds: float) -> None:
+
+        self.completed += 1
+        self.execution_seconds_total += execution_seconds
+        self.execution_seconds_max = max(self.execution_seconds_max, execution_seconds)
+
+        return None
+
+    def metrics(self) -> Dict[str, Any]:
+
+        return {
+            "concurrency": self.concurrency,
+            "queue_size": self.queue_size,
+            "running": self.running,
+            "queued": len(self.waiters),
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "completed": self.completed,
+            "wait_seconds_avg": self.wait_seconds_total / self.admitted if self.admitted else 0.0,
+            "wait_seconds_max": self.wait_seconds_max,
+            "execution_seconds_avg": self.execution_seconds_total / self.completed if self.completed else 0.0,
+            "execution_seconds_max": self.execution_seconds_max
+        }
+
+
+class InferenceScheduler(IUtility):
+    """
+    Process wide admission control for model backends (llm, embeddings, captioning,
+    image generation, stt, tts). Each backend gets its own concurrency budget and a
+    bounded priority queue; work beyond that is rejected with ``ServiceBusyError``.
+    """
+
+    def __init__(self, lanes: Dict[str, Dict[str, int]], max_wait_seconds: float, urn: str = None) -> None:
+        super().__init__(urn)
+        self.urn = urn
+        self.max_wait_seconds = max_wait_seconds
+        self.lanes: Dict[str, InferenceLane] = {
+            name: InferenceLane(
+                name=name,
+                concurrency=lane.get("concurrency", 1),
+                queue_size=lane.get("queue_size", 0)
+            )
+            for name, lane in lanes.items()
+        }
+
+    def lane(self, backend: str) -> InferenceLane:
+
+        lane: InferenceLane = self.lanes.get(backend)
+        if lane is None:
+            raise RuntimeError(f"No inference lane configured for backend {backend}")
+
+        return lane
+
+    @asynccontextmanager
+    async def slot(self, backend: str, priority: int = 0) -> AsyncIterator[None]:
+        """
+        Hold an execution slot on ``backend`` for the duration of the block.
+        """
+        lane: InferenceLane = self.lane(backend=backend)
+        wait_seconds: float = await lane.acquire(priority=priority, max_wait_seconds=self.max_wait_seconds)
+        self.logger.debug(f"Acquired {backend} slot after {wait_seconds:.3f}s")
+
+        start_time: float = time.monotonic()
+        try:
+            yield None
+        finally:
+            execution_seconds: float = time.monotonic() - start_time
+            lane.record_execution(execution_seconds=execution_seconds)
+            lane.release()
+            self.logger.debug(f"Released {backend} slot after {execution_seconds:.3f}s")
+
+    async def run(self, backend: str, func: Callable, *args: Any, priority: int = 0, **kwargs: Any) -> Any:
+        """
+        Run ``func`` on ``backend``. Coroutine functions are awaited, blocking
+        functions run in the default executor so they do not stall the event loop.
+        """
+        async with self.slot(backend=backend, priority=priority):
+
+            if asyncio.iscoroutinefunction(func):
+                return await func(*args, **kwargs)
+
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(None, lambda: func(*args, **kwargs))
+
+    def metrics(self) -> Dict[str, Dict[str, Any]]:
+
+        return {name: lane.metrics() for name, lane in self.lanes.items()}
@@ -0,0 +1,80 @@
+import asyncio
+
+from langchain_core.runnables import Runnable
+from typing_extensions import Any, AsyncIterator
+
+from abstractions.utility import IUtility
+
+from start_utils import inference_scheduler, llm_configuration
+
+
+class LLMUtility(IUtility):
+
+    def __init__(self, urn: str = None, timeout_seconds: float = None, priority: int = 0) -> None:
+        super().__init__(urn)
+        self.urn = urn
+        self.timeout_seconds = timeout_seconds or llm_configuration.timeout_seconds
+        self.priority = priority
+
+    async def invoke(self, runnable: Runnable, input: Any) -> Any:
+        """
+        Invoke a runnable (chat model or LCEL chain) without blocking the event loop.
+
+        The call goes through the runnable's async API, waits for a slot on the
+        scheduler's llm lane and is bounded by the configured timeout.
+        Cancelling the calling task cancels the in-flight request.
+
+        Raises:
+            asyncio.TimeoutError: If the call does not complete within the timeout.
+            ServiceBusyError: If the llm lane rejects the call.
+        """
+        self.logger.debug("Waiting for llm slot")
+        async with inference_scheduler.slot(backend="llm", priority=self.priority):
+            self.logger.debug("Acquired llm slot")
+
+            self.logger.debug("Invoking llm asynchronously")
+            response = await asyncio.wait_for(
+                runnable.ainvoke(input),
+                timeout=self.timeout_seconds
+            )
+            self.logger.debug("Invoked llm asynchronously")
+
+        return response
+
+    async def stream(self, runnable: Runnable, input: Any) -> AsyncIterator[Any]:
+        """
+        Stream chunks from a runnable through its async streaming API.
+
+        The llm slot is held until the stream is exhausted or closed, and the
+        timeout applies to the wait for each individual chunk.
+
+        Raises:
+            asyncio.TimeoutError: If no chunk arrives within the timeout.
+            ServiceBusyError: If the llm lane rejects the call.
+        """
+        self.logger.debug("Waiting for llm slot")
+        async with inference_scheduler.slot(backend="llm", priority=self.priority):
+            self.logger.debug("Acquired llm slot")
+
+            self.logger.debug("Streaming llm response")
+            iterator = runnable.astream(input).__aiter__()
+            try:
+
+                while True:
+
+                    try:
+                        chunk = await asyncio.wait_for(
+                            iterator.__anext__(),
+                            timeout=self.timeout_seconds
+                        )
+                    except StopAsyncIteration:
+                        break
+
+                    yield chunk
+
+            finally:
+
+                if hasattr(iterator, "aclose"):
+                    await iterator.aclose()
+
+            self.logger.debug("Streamed llm response")
@@ -0,0 +1,523 @@
+import asyncio
+import fcntl
+import json
+import os
+
+from collections import deque
+from datetime import datetime
+from typing import Any, Deque, Dict, IO, List, Optional, Tuple
+
+from cassandra import InvalidRequest
+
+from abstractions.utility import IUtility
+
+from utilities.message_writer import MessageWriter
+
+
+class MessageJournal(IUtility):
+    """
+    Write-behind persistence for chat messages.
+
+    ``write`` appends the message to a local append-only journal and returns
+    once it is fsynced; appends arriving within ``fsync_interval_ms`` share one
+    fsync. A background flusher drains the journal to Cassandra in order, with
+    ``MessageWriter.write_many`` batching each chat's rows into single
+    partition batches, and retries transient failures with exponential
+    backoff until the write succeeds. A batch Cassandra rejects outright is
+    written message by message, and the messages it still rejects are appended
+    to the slot's dead letter file instead of blocking the messages behind
+    them. A checkpoint records the last flushed message, and whatever follows
+    it is replayed on the next start, so an acknowledged message is never
+    lost; replays re-upsert the same rows.
+
+    Each process locks one of ``slots`` journal directories, so app workers
+    never share a file and a restarted worker picks up a crashed one's journal.
+    On start it also adopts the unflushed messages of every other unlocked
+    slot, such as slots above a reduced worker count. Without a free slot, or
+    before ``start``, ``write`` goes straight to the ``MessageWriter``.
+    Messages are readable from Cassandra once flushed, usually a few
+    milliseconds after the acknowledgement.
+    """
+
+    LOCK_FILE_NAME: str = "LOCK"
+    CHECKPOINT_FILE_NAME: str = "checkpoint.json"
+    DEAD_LETTER_FILE_NAME: str = "dead_letter.jsonl"
+    SEGMENT_FILE_NAME: str = "{segment:010d}.log"
+    SLOT_DIRECTORY_PREFIX: str = "slot-"
+    PERMANENT_ERRORS: Tuple[type, ...] = (InvalidRequest, TypeError)
+
+    def __init__(
+        self,
+        message_writer: MessageWriter,
+        directory: str,
+        write_behind: bool = True,
+        slots: int = 8,
+        fsync_interval_ms: int = 5,
+        flush_batch_size: int = 256,
+        segment_max_bytes: int = 64 * 1024 * 1024,
+        retry_backoff_ms: int = 500,
+        retry_backoff_max_ms: int = 30000,
+        shutdown_flush_timeout_seconds: float = 10,
+        urn: str = None
+    ) -> None:
+        super().__init__(urn)
+        self.urn = urn
+        self.message_writer = message_writer
+        self.directory = directory
+        self.write_behind = write_behind
+        self.slots = slots
+        self.fsync_interval_seconds = fsync_interval_ms / 1000
+        self.flush_batch_size = flush_batch_size
+        self.segment_max_bytes = segment_max_bytes
+        self.retry_backoff_seconds = retry_backoff_ms / 1000
+        self.retry_backoff_max_seconds = retry_backoff_max_ms / 1000
+        self.shutdown_flush_timeout_seconds = shutdown_flush_timeout_seconds
+
+        self.slot_directory: Optional[str] = None
+        self.lock_file: Optional[IO] = None
+        self.segment_file: Optional[IO] = None
+        self.segment: int = 0
+        self.segment_size: int = 0
+        self.next_id: int = 1
+
+        self.buffer: List[Tuple[bytes, Dict[str, Any]]] = []
+        self.commit_future: Optional[asyncio.Future] = None
+        self.commit_lock: Optional[asyncio.Lock] = None
+        self.pending: Deque[Tuple[int, int, Dict[str, Any]]] = deque()
+        self.wake: Optional[asyncio.Event] = None
+        self.flusher_task: Optional[asyncio.Task] = None
+
+        self.replayed: int = 0
+        self.adopted: int = 0
+        self.appended: int = 0
+        self.flushed: int = 0
+        self.flush_failures: int = 0
+        self.dead_lettered: int = 0
+        self.last_error: Optional[str] = None
+
+    @property
+    def running(self) -> bool:
+        return self.flusher_task is not None
+
+    def __segment_path(self, segment: int, slot_directory: str = None) -> str:
+        return os.path.join(slot_directory or self.slot_directory, self.SEGMENT_FILE_NAME.format(segment=segment))
+
+    def __segments(self, slot_directory: str = None) -> List[int]:
+        return sorted(int(name.split(".")[0]) for name in os.listdir(slot_directory or self.slot_directory) if name.endswith(".log"))
+
+    def __sync_directory(self, slot_directory: str = None) -> None:
+
+        directory_fd: int = os.open(slot_directory or self.slot_directory, os.O_RDONLY)
+        try:
+            os.fsync(directory_fd)
+        finally:
+            os.close(directory_fd)
+
+    def __open_segment(self, segment: int) -> None:
+
+        if self.segment_file is not None:
+            self.segment_file.close()
+
+        self.segment = segment
+        self.segment_file = open(self.__segment_path(segment), "ab")
+        self.segment_size = self.segment_file.tell()
+        self.__sync_directory()
+
+    def __lock_slot(self, slot_directory: str) -> Optional[IO]:
+
+        lock_file = open(os.path.join(slot_directory, self.LOCK_FILE_NAME), "a")
+        try:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            lock_file.close()
+            return None
+
+        return lock_file
+
+    def __acquire_slot(self) -> bool:
+
+        for slot in range(self.slots):
+
+            slot_directory: str = os.path.join(self.directory, f"{self.SLOT_DIRECTORY_PREFIX}{slot}")
+            os.makedirs(slot_directory, exist_ok=True)
+            lock_file: Optional[IO] = self.__lock_slot(slot_directory)
+            if lock_file is None:
+                continue
+
+            self.slot_directory = slot_directory
+            self.lock_file = lock_file
+            return True
+
+        return False
+
+    def __read_checkpoint(self, slot_directory: str = None) -> Dict[str, int]:
+
+        try:
+            with open(os.path.join(slot_directory or self.slot_directory, self.CHECKPOINT_FILE_NAME)) as checkpoint_file:
+                checkpoint: Dict[str, int] = json.load(checkpoint_file)
+            return {"segment": int(checkpoint["segment"]), "id": int(checkpoint["id"])}
+        except FileNotFoundError:
+            return {"segment": 0, "id": 0}
+        except (ValueError, TypeError, KeyError) as err:
+            self.logger.warning(f"Unreadable journal checkpoint in {slot_directory or self.slot_directory}, replaying every segment: {err}")
+            return {"segment": 0, "id": 0}
+
+    def __write_checkpoint(self, segment: int, last_id: int, slot_directory: str = None) -> None:
+
+        path: str = os.path.join(slot_directory or self.slot_directory, self.CHECKPOINT_FILE_NAME)
+        with open(f"{path}.tmp", "w") as checkpoint_file:
+            json.dump({"segment": segment, "id": last_id}, checkpoint_file)
+            checkpoint_file.flush()
+            os.fsync(checkpoint_file.fileno())
+        os.replace(f"{path}.tmp", path)
+        self.__sync_directory(slot_directory)
+
+        for old_segment in self.__segments(slot_directory):
+            if old_segment < segment:
+                os.remove(self.__segment_path(old_segment, slot_directory))
+
+    def __read_journal(self, slot_directory: str) -> Tuple[List[Tuple[int, int, Dict[str, Any]]], int, int]:
+        """
+        Reads the messages a slot's journal holds past its checkpoint, removing
+        segments the checkpoint has passed.
+
+        Returns:
+            Tuple[List[Tuple[int, int, Dict[str, Any]]], int, int]: The
+            ``(id, segment, message)`` entries, the highest message id and the
+            highest segment of the slot.
+        """
+
+        checkpoint: Dict[str, int] = self.__read_checkpoint(slot_directory)
+        last_id: int = checkpoint["id"]
+        segments: List[int] = self.__segments(slot_directory)
+        entries: List[Tuple[int, int, Dict[str, Any]]] = []
+        for segment in segments:
+
+            if segment < checkpoint["segment"]:
+                os.remove(self.__segment_path(segment, slot_directory))
+                continue
+
+            with open(self.__segment_path(segment, slot_directory), "rb") as segment_file:
+                for line in segment_file:
+
+                    try:
+                        record: Dict[str, Any] = json.loads(line)
+                    except json.JSONDecodeError:
+                        self.logger.warning(f"Skipping torn journal record in {slot_directory} segment {segment}")
+                        break
+
+                    last_id = max(last_id, record["id"])
+                    if record["id"] > checkpoint["id"]:
+                        record["time_stamp"] = datetime.fromisoformat(record["time_stamp"])
+                        entries.append((record.pop("id"), segment, record))
+
+        return entries, last_id, max([checkpoint["segment"], *segments])
+
+    def __adopt_orphans(self) -> int:
+        """
+        Moves the unflushed messages of every other unlocked slot into this
+        slot's journal, then checkpoints those slots past them. A crash in
+        between leaves the messages in both journals, which only re-upserts
+        them.
+        """
+
+        adopted: int = 0
+        for name in sorted(os.listdir(self.directory)):
+
+            slot_directory: str = os.path.join(self.directory, name)
+            if not name.startswith(self.SLOT_DIRECTORY_PREFIX) or slot_directory == self.slot_directory or not os.path.isdir(slot_directory):
+                continue
+
+            lock_file: Optional[IO] = self.__lock_slot(slot_directory)
+            if lock_file is None:
+                continue
+
+            try:
+
+                entries, last_id, last_segment = self.__read_journal(slot_directory)
+                if not entries:
+                    continue
+
+                records: List[Dict[str, Any]] = []
+                for _, _, record in entries:
+                    records.append({"id": self.next_id, **record})
+                    self.next_id += 1
+                segment: int = self.__append([self.__serialize(record) for record in records])
+                for record in records:
+                    self.pending.append((record.pop("id"), segment, record))
+
+                self.__write_checkpoint(last_segment + 1, last_id, slot_directory)
+                self.logger.info(f"Adopted {len(records)} journaled messages from {slot_directory}")
+                adopted += len(records)
+
+            finally:
+                lock_file.close()
+
+        return adopted
+
+    def __open(self) -> bool:
+        """
+        Locks a slot, queues the messages its journal holds past the checkpoint,
+        opens a fresh segment for appends and adopts orphaned slots' messages.
+        Blocking, runs in an executor.
+        """
+
+        if not self.__acquire_slot():
+            return False
+
+        entries, last_id, last_segment = self.__read_journal(self.slot_directory)
+        self.pending.extend(entries)
+        self.replayed = len(self.pending)
+        self.next_id = last_id + 1
+        self.__open_segment(last_segment + 1)
+        self.adopted = self.__adopt_orphans()
+
+        return True
+
+    def __close(self) -> None:
+
+        if self.segment_file is not None:
+            self.segment_file.close()
+            self.segment_file = None
+
+        if self.lock_file is not None:
+            fcntl.flock(self.lock_file.fileno(), fcntl.LOCK_UN)
+            self.lock_file.close()
+            self.lock_file = None
+
+    def __append(self, lines: List[bytes]) -> int:
+        """
+        Appends and fsyncs ``lines``, rolling over to a new segment when the
+        current one is full. A failed append also rolls over, so a torn record
+        can only be the last one of a segment. Returns the segment written to.
+        """
+
+        if self.segment_size >= self.segment_max_bytes:
+            self.__open_segment(self.segment + 1)
+
+        data: bytes = b"".join(lines)
+        try:
+            self.segment_file.write(data)
+            self.segment_file.flush()
+            os.fsync(self.segment_file.fileno())
+        except OSError:
+            self.segment_size = self.segment_max_bytes
+            raise
+        self.segment_size += len(data)
+
+        return self.segment
+
+    async def __commit(self, future: asyncio.Future) -> None:
+
+        await asyncio.sleep(self.fsync_interval_seconds)
+
+        async with self.commit_lock:
+
+            if self.commit_future is future:
+                self.commit_future = None
+            batch, self.buffer = self.buffer, []
+
+            try:
+                segment: int = await asyncio.get_running_loop().run_in_executor(
+                    None,
+                    self.__append,
+                    [line for line, _ in batch]
+                )
+            except Exception as err:
+                self.logger.error(f"Failed to append {len(batch)} messages to the journal: {err}")
+                future.set_exception(err)
+                return None
+
+        for _, record in batch:
+            self.pending.append((record.pop("id"), segment, record))
+        self.appended += len(batch)
+        self.wake.set()
+        future.set_result(None)
+
+        return None
+
+    @staticmethod
+    def __serialize(record: Dict[str, Any]) -> bytes:
+        return (json.dumps({**record, "time_stamp": record["time_stamp"].isoformat()}, separators=(",", ":")) + "\n").encode("utf-8")
+
+    async def write(self, **message: Any) -> datetime:
+        """
+        Journals one message, taking the same arguments as ``MessageWriter.write``.
+
+        Returns:
+            datetime: The message's time stamp.
+        """
+
+        if not self.running:
+            return await self.message_writer.write(**message)
+
+        message["time_stamp"] = message.get("time_stamp") or datetime.now()
+        record: Dict[str, Any] = {"id": self.next_id, **message}
+        self.next_id += 1
+        line: bytes = self.__serialize(record)
+
+        if self.commit_future is None:
+            self.commit_future = asyncio.get_running_loop().create_future()
+            asyncio.create_task(self.__commit(self.commit_future))
+        future: asyncio.Future = self.commit_future
+        self.buffer.append((line, record))
+
+        await asyncio.shield(future)
+
+        return message["time_stamp"]
+
+    async def __write(self, records: List[Dict[str, Any]]) -> Optional[Exception]:
+        """
+        Writes ``records``, retrying transient failures with exponential backoff.
+
+        Returns:
+            Optional[Exception]: The permanent error Cassandra rejected the
+            records with, None once they are written.
+        """
+
+        delay: float = self.retry_backoff_seconds
+        while True:
+
+            try:
+                await self.message_writer.write_many(records)
+                return None
+
+            except asyncio.CancelledError:
+                raise
+
+            except self.PERMANENT_ERRORS as err:
+                self.flush_failures += 1
+                self.last_error = str(err)
+                return err
+
+            except Exception as err:
+                self.flush_failures += 1
+                self.last_error = str(err)
+                self.logger.warning(f"Failed to flush {len(records)} journaled messages, retrying in {delay}s: {err}")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, self.retry_backoff_max_seconds)
+
+    def __dead_letter(self, rejected: List[Tuple[int, Dict[str, Any], Exception]]) -> None:
+
+        with open(os.path.join(self.slot_directory, self.DEAD_LETTER_FILE_NAME), "ab") as dead_letter_file:
+            for id, record, err in rejected:
+                dead_letter_file.write(self.__serialize({"id": id, **record, "error": str(err)}))
+            dead_letter_file.flush()
+            os.fsync(dead_letter_file.fileno())
+
+        return None
+
+    async def __flush(self, batch: List[Tuple[int, int, Dict[str, Any]]]) -> None:
+
+        rejected: List[Tuple[int, Dict[str, Any], Exception]] = []
+        err: Optional[Exception] = await self.__write([record for _, _, record in batch])
+        if err is not None:
+
+            self.logger.warning(f"Cassandra rejected {len(batch)} journaled messages, writing them one by one: {err}")
+            for id, _, record in batch:
+                record_err: Optional[Exception] = err if len(batch) == 1 else await self.__write([record])
+                if record_err is not None:
+                    rejected.append((id, record, record_err))
+
+            delay: float = self.retry_backoff_seconds
+            while rejected:
+                try:
+                    await asyncio.get_running_loop().run_in_executor(None, self.__dead_letter, rejected)
+                    break
+                except OSError as dead_letter_err:
+                    self.logger.error(f"Failed to dead letter {len(rejected)} journaled messages, retrying in {delay}s: {dead_letter_err}")
+                    await asyncio.sleep(delay)
+                    delay = min(delay * 2, self.retry_backoff_max_seconds)
+
+            self.dead_lettered += len(rejected)
+            if rejected:
+                self.logger.error(f"Dead lettered {len(rejected)} journaled messages in {self.slot_directory}")
+
+        last_id, segment, _ = batch[-1]
+        try:
+            await asyncio.get_running_loop().run_in_executor(None, self.__write_checkpoint, segment, last_id)
+        except OSError as err:
+            self.logger.error(f"Failed to checkpoint the message journal, flushed messages are replayed on restart: {err}")
+        for _ in batch:
+            self.pending.popleft()
+        self.flushed += len(batch) - len(rejected)
+
+        return None
+
+    async def __flush_loop(self) -> None:
+
+        while True:
+
+            if not self.pending:
+                self.wake.clear()
+                await self.wake.wait()
+                continue
+
+            batch: List[Tuple[int, int, Dict[str, Any]]] = [
+                self.pending[index] for index in range(min(len(self.pending), self.flush_batch_size))
+            ]
+            self.logger.debug(f"Flushing {len(batch)} journaled messages")
+            await self.__flush(batch=batch)
+            self.logger.debug(f"Flushed {len(batch)} journaled messages")
+
+    async def start(self) -> None:
+
+        if not self.write_behind or self.running:
+            return None
+
+        self.logger.debug(f"Opening message journal in {self.directory}")
+        if not await asyncio.get_running_loop().run_in_executor(None, self.__open):
+            self.logger.warning(f"No free message journal slot in {self.directory}, writing messages directly")
+            return None
+
+        self.commit_lock = asyncio.Lock()
+        self.wake = asyncio.Event()
+        if self.pending:
+            self.logger.info(f"Replaying {self.replayed} journaled messages and {self.adopted} adopted from orphaned slots in {self.slot_directory}")
+            self.wake.set()
+        self.flusher_task = asyncio.create_task(self.__flush_loop())
+        self.logger.debug(f"Opened message journal in {self.slot_directory}")
+
+        return None
+
+    async def __drain(self) -> None:
+
+        while self.buffer or self.commit_future is not None or self.pending:
+            await asyncio.sleep(0.05)
+
+    async def stop(self) -> None:
+
+        if not self.running:
+            return None
+
+        self.logger.debug("Draining message journal")
+        try:
+            await asyncio.wait_for(self.__drain(), timeout=self.shutdown_flush_timeout_seconds)
+        except asyncio.TimeoutError:
+            self.logger.warning(f"{len(self.pending)} journaled messages not flushed, they are replayed on the next start")
+
+        self.flusher_task.cancel()
+        await asyncio.gather(self.flusher_task, return_exceptions=True)
+        self.flusher_task = None
+        await asyncio.get_running_loop().run_in_executor(None, self.__close)
+        self.logger.debug("Closed message journal")
+
+        return None
+
+    def metrics(self) -> Dict[str, Any]:
+
+        return {
+            "write_behind": self.write_behind,
+            "running": self.running,
+            "slot_directory": self.slot_directory,
+            "segment": self.segment,
+            "buffered": len(self.buffer),
+            "pending": len(self.pending),
+            "replayed": self.replayed,
+            "adopted": self.adopted,
+            "appended": self.appended,
+            "flushed": self.flushed,
+            "flush_failures": self.flush_failures,
+            "dead_lettered": self.dead_lettered,
+            "last_error": self.last_error
+        }
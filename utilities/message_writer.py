@@ -0,0 +1,209 @@
+import asyncio
+
+from cassandra.query import BatchStatement, BatchType
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from abstractions.utility import IUtility
+
+from models.nosql.cassandra.chats_by_user import ChatsByUser
+from models.nosql.cassandra.messages import Messages
+from models.nosql.cassandra.messages_by_user import MessagesByUser
+
+from utilities.cassandra import CassandraUtility
+
+
+class MessageWriter(IUtility):
+    """
+    Persists chat messages with prepared statements over ``execute_async``.
+
+    A message is written to ``messages`` and, per participant, to
+    ``messages_by_user`` and ``chats_by_user``. The statements run
+    concurrently, each routed to a replica of its own partition, instead of as
+    one logged batch through a single coordinator. Every row is an upsert keyed
+    by the message, so a failed write is safe to retry as a whole.
+    ``write_many`` drains the write-behind journal with one unlogged batch per
+    partition instead.
+    """
+
+    MESSAGE_COLUMNS: Tuple[str, ...] = (
+        "urn",
+        "chat_urn",
+        "time_stamp",
+        "text",
+        "sender_urn",
+        "receiver_urn",
+        "sender_name",
+        "receiver_name",
+        "message_type",
+        "chat_type",
+        "metadata",
+        "is_deleted",
+        "is_read",
+        "priority",
+    )
+
+    def __init__(self, cassandra_utility: CassandraUtility, ttl: int, batch_max_bytes: int = 32768, urn: str = None) -> None:
+        super().__init__(urn)
+        self.urn = urn
+        self.cassandra_utility = cassandra_utility
+        self.ttl = ttl
+        self.batch_max_bytes = batch_max_bytes
+        self.queries: Dict[str, str] = {
+            "message": self.__insert(Messages.column_family_name(), self.MESSAGE_COLUMNS),
+            "message_by_user": self.__insert(MessagesByUser.column_family_name(), ("user_urn", *self.MESSAGE_COLUMNS)),
+            "chat_by_user": self.__insert(ChatsByUser.column_family_name(), ("user_urn", "chat_type", "chat_urn", "last_message_at")),
+        }
+
+    @staticmethod
+    def __insert(table: str, columns: Tuple[str, ...]) -> str:
+        return f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)}) USING TTL ?"
+
+    @staticmethod
+    def participants(sender_urn: str, receiver_urn: str) -> List[str]:
+        """
+        The users whose ``messages_by_user`` partitions hold a copy of a message.
+        """
+        return list(dict.fromkeys(user_urn for user_urn in (sender_urn, receiver_urn) if user_urn))
+
+    def prepare(self) -> None:
+        for query in self.queries.values():
+            self.cassandra_utility.prepare(query)
+
+    async def __prepared(self) -> None:
+
+        if not all(query in self.cassandra_utility.prepared_statements for query in self.queries.values()):
+            await asyncio.get_running_loop().run_in_executor(None, self.prepare)
+
+    def __rows(self, message: Dict[str, Any]) -> List[Tuple[Tuple[str, str], str, List[Any]]]:
+        """
+        The rows of one message as (partition, query name, parameters).
+        """
+
+        values: Dict[str, Any] = {column: message.get(column) for column in self.MESSAGE_COLUMNS}
+        values.update({
+            "metadata": values["metadata"] or {},
+            "is_deleted": bool(values["is_deleted"]),
+            "is_read": bool(values["is_read"]),
+            "priority": values["priority"] or 0,
+        })
+        rows = [
+            (("message", values["chat_urn"]), "message", [*(values[column] for column in self.MESSAGE_COLUMNS), self.ttl])
+        ]
+
+        by_user_values: Dict[str, Any] = {**values, "chat_type": values["chat_type"] or ""}
+        for user_urn in self.participants(sender_urn=values["sender_urn"], receiver_urn=values["receiver_urn"]):
+            rows.append((
+                ("by_user", user_urn),
+                "message_by_user",
+                [user_urn, *(by_user_values[column] for column in self.MESSAGE_COLUMNS), self.ttl]
+            ))
+            rows.append((
+                ("by_user", user_urn),
+                "chat_by_user",
+                [user_urn, by_user_values["chat_type"], values["chat_urn"], values["time_stamp"], self.ttl]
+            ))
+
+        return rows
+
+    @staticmethod
+    def __row_size(parameters: List[Any]) -> int:
+        """
+        Rough size of a row, to keep batches under the server's batch size limit.
+        """
+
+        size: int = 0
+        for value in parameters:
+            if isinstance(value, str):
+                size += len(value)
+            elif isinstance(value, dict):
+                size += sum(len(key) + len(item or "") for key, item in value.items())
+            else:
+                size += 16
+
+        return size
+
+    async def write(
+        self,
+        urn: str,
+        chat_urn: str,
+        text: str,
+        sender_urn: str,
+        receiver_urn: str,
+        sender_name: str,
+        receiver_name: str,
+        message_type: str,
+        chat_type: Optional[str],
+        metadata: Optional[Dict[str, str]],
+        is_deleted: bool = False,
+        is_read: bool = False,
+        priority: int = 0,
+        time_stamp: Optional[datetime] = None
+    ) -> datetime:
+        """
+        Writes one message and its per user copies.
+
+        Returns:
+            datetime: The message's time stamp.
+        """
+
+        time_stamp = time_stamp or datetime.now()
+        await self.__prepared()
+
+        rows = self.__rows({
+            "urn": urn,
+            "chat_urn": chat_urn,
+            "time_stamp": time_stamp,
+            "text": text,
+            "sender_urn": sender_urn,
+            "receiver_urn": receiver_urn,
+            "sender_name": sender_name,
+            "receiver_name": receiver_name,
+            "message_type": message_type,
+            "chat_type": chat_type,
+            "metadata": metadata,
+            "is_deleted": is_deleted,
+            "is_read": is_read,
+            "priority": priority,
+        })
+
+        self.logger.debug(f"Writing message {urn} with {len(rows)} statements")
+        await asyncio.gather(*(
+            self.cassandra_utility.execute_async(self.cassandra_utility.prepare(self.queries[query_name]), parameters)
+            for _, query_name, parameters in rows
+        ))
+        self.logger.debug(f"Wrote message {urn}")
+
+        return time_stamp
+
+    async def write_many(self, messages: List[Dict[str, Any]]) -> None:
+        """
+        Writes ``messages`` as unlogged batches that each touch a single
+        partition, a chat's ``messages`` partition or a user's ``by_user``
+        partitions, so every batch is applied by one replica set as one
+        mutation. Batches are split at ``batch_max_bytes`` and run concurrently.
+        """
+
+        await self.__prepared()
+
+        partitions: Dict[Tuple[str, str], List[Tuple[str, List[Any]]]] = {}
+        for message in messages:
+            for partition, query_name, parameters in self.__rows(message):
+                partitions.setdefault(partition, []).append((query_name, parameters))
+
+        batches: List[BatchStatement] = []
+        for rows in partitions.values():
+
+            batch, batch_bytes = None, 0
+            for query_name, parameters in rows:
+
+                row_bytes: int = self.__row_size(parameters)
+                if batch is None or batch_bytes + row_bytes > self.batch_max_bytes:
+                    batch, batch_bytes = BatchStatement(batch_type=BatchType.UNLOGGED), 0
+                    batches.append(batch)
+                batch.add(self.cassandra_utility.prepare(self.queries[query_name]), parameters)
+                batch_bytes += row_bytes
+
+        self.logger.debug(f"Writing {len(messages)} messages in {len(batches)} batches over {len(partitions)} partitions")
+        await asyncio.gather(*(self.cassandra_utility.execute_async(batch) for batch in batches))
+        self.logger.debug(f"Wrote {len(messages)} messages")
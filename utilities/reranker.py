@@ -0,0 +1,162 @@
+import asyncio
+import hashlib
+import threading
+
+import torch
+
+from collections import OrderedDict
+from langchain.schema import Document
+from transformers import AutoModelForSequenceClassification, AutoTokenizer
+from typing_extensions import Any, Dict, List, Tuple
+
+from abstractions.utility import IUtility
+
+from errors.service_busy_error import ServiceBusyError
+
+from utilities.inference_scheduler import InferenceScheduler
+
+
+class CrossEncoderReranker(IUtility):
+    """
+    Reorders retrieved chunks by a local cross-encoder's relevance score.
+
+    All uncached (query, chunk) pairs of a request are scored in one batched
+    forward pass on the scheduler's rerank lane. Scores are cached by (query,
+    chunk id) in an LRU, so a repeated question is reranked without running the
+    model. The model is loaded on first use.
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        scheduler: InferenceScheduler,
+        max_length: int = 512,
+        cache_max_entries: int = 10000,
+        urn: str = None
+    ) -> None:
+        super().__init__(urn)
+        self.urn = urn
+        self.model_name = model_name
+        self.scheduler = scheduler
+        self.max_length = max_length
+        self.cache_max_entries = cache_max_entries
+        self.tokenizer = None
+        self.model = None
+        self.load_lock = threading.Lock()
+        self.cache_lock = threading.Lock()
+        self.scores: "OrderedDict[Tuple[str, str], float]" = OrderedDict()
+        self.hits: int = 0
+        self.misses: int = 0
+        self.timeouts: int = 0
+
+    def __load(self) -> None:
+
+        with self.load_lock:
+            if self.model is None:
+                self.logger.info(f"Loading reranker model: {self.model_name}")
+                self.tokenizer = AutoTokenizer.from_pretrained(self.model_name)
+                model = AutoModelForSequenceClassification.from_pretrained(self.model_name)
+                model.eval()
+                self.model = model
+                self.logger.info(f"Loaded reranker model: {self.model_name}")
+
+        return None
+
+    def key(self, query: str, chunk_id: str) -> Tuple[str, str]:
+        return hashlib.sha256(query.encode("utf-8")).hexdigest(), chunk_id
+
+    def chunk_id(self, document: Document) -> str:
+        return document.metadata.get("id") or hashlib.sha256(document.page_content.encode("utf-8")).hexdigest()
+
+    def score(self, query: str, documents: List[Document]) -> List[float]:
+
+        keys: List[Tuple[str, str]] = [self.key(query=query, chunk_id=self.chunk_id(document=document)) for document in documents]
+
+        with self.cache_lock:
+            scores: Dict[int, float] = {}
+            for index, key in enumerate(keys):
+                if key in self.scores:
+                    self.scores.move_to_end(key)
+                    scores[index] = self.scores[key]
+
+        missing: List[int] = [index for index in range(len(documents)) if index not in scores]
+        self.hits += len(scores)
+        self.misses += len(missing)
+
+        if missing:
+
+            if self.model is None:
+                self.__load()
+
+            inputs = self.tokenizer(
+                [query] * len(missing),
+                [documents[index].page_content for index in missing],
+                padding=True,
+                truncation=True,
+                max_length=self.max_length,
+                return_tensors="pt"
+            )
+            with torch.inference_mode():
+                logits = self.model(**inputs).logits
+            computed: List[float] = logits[:, -1].tolist()
+
+            with self.cache_lock:
+                for index, value in zip(missing, computed):
+                    scores[index] = value
+                    self.scores[keys[index]] = value
+                while len(self.scores) > self.cache_max_entries:
+                    self.scores.popitem(last=False)
+
+        return [scores[index] for index in range(len(documents))]
+
+    async def rerank(
+        self,
+        query: str,
+        documents: List[Document],
+        top_n: int,
+        budget_seconds: float,
+        priority: int = 0
+    ) -> List[Document]:
+        """
+        Return the ``top_n`` documents by cross-encoder score. If scoring does not
+        finish within ``budget_seconds``, or the rerank lane is busy, the first
+        ``top_n`` in retrieval order are returned; a late scoring pass still fills
+        the cache.
+        """
+        if len(documents) <= 1:
+            return documents[:top_n]
+
+        task: asyncio.Task = asyncio.ensure_future(
+            self.scheduler.run("rerank", self.score, query, documents, priority=priority)
+        )
+        try:
+
+            scores: List[float] = await asyncio.wait_for(asyncio.shield(task), timeout=budget_seconds)
+
+        except asyncio.TimeoutError:
+
+            self.timeouts += 1
+            self.logger.warning(f"Reranking exceeded {budget_seconds}s budget, keeping retrieval order")
+            task.add_done_callback(lambda done: done.cancelled() or done.exception())
+            return documents[:top_n]
+
+        except ServiceBusyError as err:
+
+            self.logger.warning(f"Reranking skipped: {err}")
+            return documents[:top_n]
+
+        ranked = sorted(zip(scores, range(len(documents))), key=lambda item: item[0], reverse=True)
+
+        return [documents[index] for _, index in ranked[:top_n]]
+
+    def metrics(self) -> Dict[str, Any]:
+
+        return {
+            "model": self.model_name,
+            "loaded": self.model is not None,
+            "cache_entries": len(self.scores),
+            "cache_max_entries": self.cache_max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "timeouts": self.timeouts
+        }
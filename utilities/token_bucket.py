@@ -0,0 +1,74 @@
+import asyncio
+import time
+
+from typing_extensions import Dict
+
+from abstractions.utility import IUtility
+
+
+class TokenBucket(IUtility):
+    """
+    Async token bucket refilled at ``rate_per_second`` up to ``capacity`` tokens.
+    ``penalize`` drains the bucket below zero so every caller backs off after the
+    provider reports an exhausted quota.
+    """
+
+    def __init__(self, rate_per_second: float, capacity: float, urn: str = None) -> None:
+        super().__init__(urn)
+        self.urn = urn
+        self.rate_per_second = rate_per_second
+        self.capacity = capacity
+        self.tokens: float = capacity
+        self.updated_at: float = time.monotonic()
+        self.wait_seconds_total: float = 0.0
+        self.penalties: int = 0
+
+    def __refill(self) -> None:
+
+        now: float = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate_per_second)
+        self.updated_at = now
+
+        return None
+
+    async def acquire(self, tokens: float = 1.0) -> float:
+        """
+        Wait until ``tokens`` are available and take them.
+
+        Returns:
+            float: Seconds spent waiting.
+        """
+        start_time: float = time.monotonic()
+        while True:
+
+            self.__refill()
+            if self.tokens >= tokens:
+                self.tokens -= tokens
+                break
+
+            await asyncio.sleep((tokens - self.tokens) / self.rate_per_second)
+
+        wait_seconds: float = time.monotonic() - start_time
+        self.wait_seconds_total += wait_seconds
+
+        return wait_seconds
+
+    def penalize(self, seconds: float) -> None:
+
+        self.__refill()
+        self.tokens = min(self.tokens, 0.0) - seconds * self.rate_per_second
+        self.penalties += 1
+
+        return None
+
+    def metrics(self) -> Dict[str, float]:
+
+        self.__refill()
+
+        return {
+            "tokens": self.tokens,
+            "capacity": self.capacity,
+            "rate_per_second": self.rate_per_second,
+            "wait_seconds_total": self.wait_seconds_total,
+            "penalties": self.penalties
+        }
@@ -0,0 +1,155 @@
+import asyncio
+import os
+
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing_extensions import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from abstractions.utility import IUtility
+
+
+@dataclass
+class VectorStoreCacheEntry:
+
+    vector_store: Any
+    resources: Dict[str, Any] = field(default_factory=dict)
+    version: Optional[Tuple[int, ...]] = None
+    nbytes: int = 0
+
+
+class VectorStoreCache(IUtility):
+    """
+    Process wide LRU of loaded vector stores keyed by their directory path.
+
+    An entry is valid while the files under the path are unchanged, so an index
+    rebuilt by another process is reloaded on the next lookup. Entries are evicted
+    least recently used first once either the byte or the entry budget is exceeded;
+    the on-disk size of the index stands in for its memory footprint. Builds
+    replace the index file last, so its version covers the whole store.
+    """
+
+    INDEX_FILES: Tuple[str, ...] = ("index.faiss",)
+
+    def __init__(self, max_bytes: int, max_entries: int, urn: str = None) -> None:
+        super().__init__(urn)
+        self.urn = urn
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.entries: "OrderedDict[str, VectorStoreCacheEntry]" = OrderedDict()
+        self.locks: Dict[str, asyncio.Lock] = {}
+        self.lock_holders: Dict[str, int] = {}
+        self.nbytes: int = 0
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+        self.invalidations: int = 0
+
+    def version(self, path: str) -> Tuple[Optional[Tuple[int, ...]], int]:
+        """
+        Returns:
+            Tuple: The modification times and sizes of the index files, or None if
+            any is missing, and their total size in bytes.
+        """
+        version, nbytes = [], 0
+        for file_name in self.INDEX_FILES:
+            try:
+                stat = os.stat(os.path.join(path, file_name))
+            except FileNotFoundError:
+                return None, 0
+            version.extend([stat.st_mtime_ns, stat.st_size])
+            nbytes += stat.st_size
+
+        return tuple(version), nbytes
+
+    def get(self, path: str) -> Optional[VectorStoreCacheEntry]:
+
+        entry: VectorStoreCacheEntry = self.entries.get(path)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        version, _ = self.version(path=path)
+        if version is None or version != entry.version:
+            self.logger.debug(f"Vector store changed on disk: {path}")
+            self.invalidate(path=path)
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self.entries.move_to_end(path)
+
+        return entry
+
+    def put(self, path: str, entry: VectorStoreCacheEntry) -> VectorStoreCacheEntry:
+
+        self.invalidate(path=path, count=False)
+        if entry.version is None:
+            entry.version, entry.nbytes = self.version(path=path)
+        if entry.version is None or entry.nbytes > self.max_bytes:
+            self.logger.debug(f"Not caching vector store: {path}")
+            return entry
+
+        self.entries[path] = entry
+        self.nbytes += entry.nbytes
+
+        while self.entries and (self.nbytes > self.max_bytes or len(self.entries) > self.max_entries):
+            evicted_path, evicted = self.entries.popitem(last=False)
+            self.nbytes -= evicted.nbytes
+            self.evictions += 1
+            self.logger.debug(f"Evicted vector store: {evicted_path}")
+
+        return entry
+
+    async def get_or_load(self, path: str, loader: Callable[[], Awaitable[VectorStoreCacheEntry]]) -> VectorStoreCacheEntry:
+        """
+        Return the cached entry for ``path`` or load it once with ``loader``, even if
+        several requests miss at the same time.
+        """
+        entry: VectorStoreCacheEntry = self.get(path=path)
+        if entry is not None:
+            return entry
+
+        lock: asyncio.Lock = self.locks.setdefault(path, asyncio.Lock())
+        self.lock_holders[path] = self.lock_holders.get(path, 0) + 1
+
+        try:
+            async with lock:
+
+                entry = self.entries.get(path)
+                if entry is not None and entry.version == self.version(path=path)[0]:
+                    return entry
+
+                version, nbytes = self.version(path=path)
+                entry = await loader()
+                entry.version, entry.nbytes = version, nbytes
+                entry = self.put(path=path, entry=entry)
+
+        finally:
+            self.lock_holders[path] -= 1
+            if not self.lock_holders[path]:
+                del self.lock_holders[path]
+                del self.locks[path]
+
+        return entry
+
+    def invalidate(self, path: str, count: bool = True) -> None:
+
+        entry: VectorStoreCacheEntry = self.entries.pop(path, None)
+        if entry is not None:
+            self.nbytes -= entry.nbytes
+            if count:
+                self.invalidations += 1
+
+        return None
+
+    def metrics(self) -> Dict[str, int]:
+
+        return {
+            "entries": len(self.entries),
+            "bytes": self.nbytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations
+        }
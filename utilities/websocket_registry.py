@@ -0,0 +1,218 @@
+import asyncio
+import base64
+import json
+
+from fastapi import WebSocket
+from redis.asyncio import Redis
+from typing_extensions import Any, Dict, List, Optional
+
+from abstractions.utility import IUtility
+
+
+class WebsocketSessionRegistry(IUtility):
+    """
+    Delivers websocket events to a session regardless of which process holds its socket.
+
+    Sockets accepted by this node live in the node-local ``websockets_store``.
+    A Redis hash maps every session id to the node that holds it, and each node
+    listens on its own pub/sub channel for events addressed to its sessions.
+    Processes without sockets (e.g. Celery workers) only publish.
+
+    The subscription blocks on its connection between events, so it uses its
+    own ``pubsub_session`` without a socket timeout. It resubscribes with
+    backoff whenever the connection fails.
+    """
+
+    SESSIONS_KEY: str = "websocket:sessions"
+    NODE_CHANNEL: str = "websocket:node:{node_id}"
+    LISTEN_RETRY_SECONDS: float = 0.5
+    LISTEN_RETRY_MAX_SECONDS: float = 30.0
+
+    UNREGISTER_SCRIPT: str = """
+    if redis.call('HGET', KEYS[1], ARGV[1]) == ARGV[2] then
+        return redis.call('HDEL', KEYS[1], ARGV[1])
+    end
+    return 0
+    """
+
+    def __init__(
+        self,
+        node_id: str,
+        redis_session: Redis,
+        websockets_store: Dict[str, WebSocket],
+        pubsub_session: Redis = None,
+        urn: str = None
+    ) -> None:
+        super().__init__(urn)
+        self.urn = urn
+        self.node_id = node_id
+        self.redis_session = redis_session
+        self.pubsub_session = pubsub_session or redis_session
+        self.websockets_store = websockets_store
+        self.channel = self.NODE_CHANNEL.format(node_id=node_id)
+        self.listener_task: Optional[asyncio.Task] = None
+        self.listen_retry_seconds: float = self.LISTEN_RETRY_SECONDS
+
+    async def register(self, session_id: str, websocket: WebSocket) -> None:
+
+        self.logger.debug(f"Registering session {session_id} on node {self.node_id}")
+        self.websockets_store[session_id] = websocket
+        await self.redis_session.hset(self.SESSIONS_KEY, session_id, self.node_id)
+        self.logger.debug(f"Registered session {session_id} on node {self.node_id}")
+
+        return None
+
+    async def unregister(self, session_id: str, websocket: WebSocket = None) -> None:
+
+        if websocket is not None and self.websockets_store.get(session_id) is not websocket:
+            self.logger.debug(f"Session {session_id} was re-registered by a newer connection")
+            return None
+
+        self.logger.debug(f"Unregistering session {session_id} from node {self.node_id}")
+        self.websockets_store.pop(session_id, None)
+        try:
+            await self.redis_session.eval(self.UNREGISTER_SCRIPT, 1, self.SESSIONS_KEY, session_id, self.node_id)
+        except Exception as err:
+            self.logger.error(f"Failed to remove session {session_id} from directory: {err}")
+        self.logger.debug(f"Unregistered session {session_id} from node {self.node_id}")
+
+        return None
+
+    async def is_online(self, session_id: str) -> bool:
+
+        if session_id in self.websockets_store:
+            return True
+
+        return bool(await self.redis_session.hexists(self.SESSIONS_KEY, session_id))
+
+    async def sessions(self) -> List[str]:
+
+        session_ids: List[Any] = await self.redis_session.hkeys(self.SESSIONS_KEY)
+
+        return [session_id.decode("utf-8") if isinstance(session_id, bytes) else session_id for session_id in session_ids]
+
+    async def __send_local(self, websocket: WebSocket, payload_type: str, data: Any) -> None:
+
+        if payload_type == "bytes":
+            await websocket.send_bytes(data=data)
+        elif payload_type == "text":
+            await websocket.send_text(data=data)
+        else:
+            await websocket.send_json(data=data)
+
+        return None
+
+    async def send(self, session_id: str, payload_type: str, data: Any) -> bool:
+        """
+        Send ``data`` to ``session_id`` as a json, text or bytes frame.
+
+        Returns:
+            bool: False if the session is not connected to any node.
+        """
+        websocket: Optional[WebSocket] = self.websockets_store.get(session_id)
+        if websocket is not None:
+            await self.__send_local(websocket=websocket, payload_type=payload_type, data=data)
+            return True
+
+        node_id = await self.redis_session.hget(self.SESSIONS_KEY, session_id)
+        if node_id is None:
+            self.logger.debug(f"No node holds session {session_id}")
+            return False
+
+        node_id: str = node_id.decode("utf-8") if isinstance(node_id, bytes) else node_id
+        if node_id == self.node_id:
+            self.logger.debug(f"Session {session_id} is registered to this node but has no socket")
+            return False
+
+        message: Dict[str, Any] = {
+            "session_id": session_id,
+            "payload_type": payload_type,
+            "data": base64.b64encode(data).decode("utf-8") if payload_type == "bytes" else data
+        }
+        receivers: int = await self.redis_session.publish(
+            self.NODE_CHANNEL.format(node_id=node_id),
+            json.dumps(message)
+        )
+
+        if not receivers:
+            self.logger.debug(f"Node {node_id} is gone, dropping session {session_id}")
+            await self.redis_session.eval(self.UNREGISTER_SCRIPT, 1, self.SESSIONS_KEY, session_id, node_id)
+            return False
+
+        return True
+
+    async def __subscribe(self) -> None:
+
+        pubsub = self.pubsub_session.pubsub()
+        await pubsub.subscribe(self.channel)
+        self.listen_retry_seconds = self.LISTEN_RETRY_SECONDS
+        self.logger.debug(f"Listening for websocket events on {self.channel}")
+
+        try:
+
+            async for message in pubsub.listen():
+
+                if message.get("type") != "message":
+                    continue
+
+                try:
+
+                    payload: Dict[str, Any] = json.loads(message.get("data"))
+                    payload_type: str = payload.get("payload_type")
+                    data: Any = payload.get("data")
+                    if payload_type == "bytes":
+                        data = base64.b64decode(data)
+
+                    websocket: Optional[WebSocket] = self.websockets_store.get(payload.get("session_id"))
+                    if websocket is not None:
+                        await self.__send_local(websocket=websocket, payload_type=payload_type, data=data)
+
+                except Exception as err:
+                    self.logger.error(f"Failed to deliver websocket event from {self.channel}: {err}")
+
+        finally:
+
+            try:
+                await pubsub.unsubscribe(self.channel)
+            finally:
+                await pubsub.close()
+
+    async def __listen(self) -> None:
+
+        while True:
+
+            try:
+                await self.__subscribe()
+                self.logger.warning(f"Websocket event subscription on {self.channel} ended")
+
+            except asyncio.CancelledError:
+                raise
+
+            except Exception as err:
+                self.logger.error(f"Websocket event listener on {self.channel} failed: {err}")
+
+            self.logger.debug(f"Resubscribing to {self.channel} in {self.listen_retry_seconds}s")
+            await asyncio.sleep(self.listen_retry_seconds)
+            self.listen_retry_seconds = min(self.listen_retry_seconds * 2, self.LISTEN_RETRY_MAX_SECONDS)
+
+    async def start(self) -> None:
+
+        self.logger.debug(f"Starting websocket session registry for node {self.node_id}")
+        self.listener_task = asyncio.create_task(self.__listen())
+        self.logger.debug(f"Started websocket session registry for node {self.node_id}")
+
+        return None
+
+    async def stop(self) -> None:
+
+        self.logger.debug(f"Stopping websocket session registry for node {self.node_id}")
+        if self.listener_task is not None:
+            self.listener_task.cancel()
+            await asyncio.gather(self.listener_task, return_exceptions=True)
+            self.listener_task = None
+
+        for session_id in list(self.websockets_store.keys()):
+            await self.unregister(session_id=session_id)
+        self.logger.debug(f"Stopped websocket session registry for node {self.node_id}")
+
+        return None
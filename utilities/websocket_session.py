@@ -0,0 +1,164 @@
+import asyncio
+
+from typing_extensions import Any, Awaitable, Callable, Dict, List, Set
+
+from abstractions.utility import IUtility
+
+
+class WebsocketSessionQueue(IUtility):
+    """
+    Bounded work queue with a small pool of worker tasks for a single websocket connection.
+
+    The receive loop only enqueues message events, so control frames keep being
+    read while inference runs, and in-flight work can be cancelled on request or
+    when the socket disconnects. Events of the same chat are serialized, so with
+    several workers the turns of a chat still run and reply in order.
+    """
+
+    def __init__(
+        self,
+        session_id: str,
+        handler: Callable[[dict], Awaitable[Any]],
+        queue_size: int,
+        workers: int,
+        urn: str = None
+    ) -> None:
+        super().__init__(urn)
+        self.urn = urn
+        self.session_id = session_id
+        self.handler = handler
+        self.workers = workers
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.worker_tasks: List[asyncio.Task] = []
+        self.in_flight_tasks: Set[asyncio.Task] = set()
+        self.chat_locks: Dict[str, asyncio.Lock] = {}
+        self.chat_lock_holders: Dict[str, int] = {}
+        self.submitted: int = 0
+        self.processed: int = 0
+        self.rejected: int = 0
+        self.cancelled: int = 0
+        self.failed: int = 0
+        self.max_depth: int = 0
+
+    def start(self) -> None:
+
+        self.logger.debug(f"Starting {self.workers} workers for session: {self.session_id}")
+        for _ in range(self.workers):
+            self.worker_tasks.append(asyncio.create_task(self.__work()))
+        self.logger.debug(f"Started {self.workers} workers for session: {self.session_id}")
+
+        return None
+
+    def submit(self, data: dict) -> bool:
+        """
+        Enqueue a message event without waiting.
+
+        Returns:
+            bool: False when the queue is full and the event was rejected.
+        """
+        try:
+            self.queue.put_nowait(data)
+        except asyncio.QueueFull:
+            self.rejected += 1
+            self.logger.debug(f"Work queue full for session: {self.session_id}")
+            return False
+
+        self.submitted += 1
+        self.max_depth = max(self.max_depth, self.queue.qsize())
+
+        return True
+
+    async def __handle(self, data: dict) -> Any:
+
+        chat_urn: str = str(data.get("chat_urn"))
+        lock: asyncio.Lock = self.chat_locks.setdefault(chat_urn, asyncio.Lock())
+        self.chat_lock_holders[chat_urn] = self.chat_lock_holders.get(chat_urn, 0) + 1
+
+        try:
+            async with lock:
+                return await self.handler(data)
+
+        finally:
+            self.chat_lock_holders[chat_urn] -= 1
+            if not self.chat_lock_holders[chat_urn]:
+                del self.chat_lock_holders[chat_urn]
+                del self.chat_locks[chat_urn]
+
+    async def __work(self) -> None:
+
+        while True:
+
+            data: dict = await self.queue.get()
+            task: asyncio.Task = asyncio.create_task(self.__handle(data))
+            self.in_flight_tasks.add(task)
+
+            try:
+
+                await asyncio.wait({task})
+
+                if task.cancelled():
+                    self.cancelled += 1
+                elif task.exception() is not None:
+                    self.failed += 1
+                    self.logger.error(f"Failed websocket event: {task.exception()}")
+                else:
+                    self.processed += 1
+
+            except asyncio.CancelledError:
+                task.cancel()
+                raise
+
+            finally:
+                self.in_flight_tasks.discard(task)
+                self.queue.task_done()
+
+    async def cancel_in_flight(self) -> int:
+        """
+        Drop queued events and cancel every event that is currently executing.
+
+        Returns:
+            int: Number of events dropped or cancelled.
+        """
+        self.logger.debug(f"Cancelling pending work for session: {self.session_id}")
+        dropped: int = 0
+        while not self.queue.empty():
+            self.queue.get_nowait()
+            self.queue.task_done()
+            dropped += 1
+        self.cancelled += dropped
+
+        tasks: List[asyncio.Task] = list(self.in_flight_tasks)
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.wait(tasks)
+        self.logger.debug(f"Cancelled pending work for session: {self.session_id}")
+
+        return dropped + len(tasks)
+
+    async def close(self) -> None:
+
+        self.logger.debug(f"Closing work queue for session: {self.session_id}")
+        await self.cancel_in_flight()
+
+        for worker_task in self.worker_tasks:
+            worker_task.cancel()
+        await asyncio.gather(*self.worker_tasks, return_exceptions=True)
+        self.worker_tasks.clear()
+        self.logger.debug(f"Closed work queue for session: {self.session_id}")
+
+        return None
+
+    def metrics(self) -> Dict[str, int]:
+
+        return {
+            "queue_depth": self.queue.qsize(),
+            "queue_size": self.queue.maxsize,
+            "max_queue_depth": self.max_depth,
+            "in_flight": len(self.in_flight_tasks),
+            "submitted": self.submitted,
+            "processed": self.processed,
+            "rejected": self.rejected,
+            "cancelled": self.cancelled,
+            "failed": self.failed
+        }
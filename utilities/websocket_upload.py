@@ -0,0 +1,76 @@
+import io
+
+from typing_extensions import Dict, Final, Set
+
+from abstractions.utility import IUtility
+
+
+class WebsocketUploadBuffer(IUtility):
+    """
+    Collects a binary media upload sent over the websocket.
+
+    The client announces the upload with a json header frame
+    ``{"event": "upload", "type": "audio" | "image", "size": <bytes>, ...}``
+    carrying the usual message fields, then sends the raw bytes as one or more
+    binary frames. Once ``size`` bytes have arrived the upload becomes a regular
+    message event whose ``<type>_buffer`` holds the bytes in memory.
+
+    Raises:
+        ValueError: If the header is invalid or a chunk breaks the size limits.
+    """
+
+    MEDIA_TYPES: Final[Set[str]] = {"audio", "image"}
+
+    def __init__(self, header: Dict[str, str], max_upload_bytes: int, max_chunk_bytes: int, urn: str = None) -> None:
+        super().__init__(urn)
+        self.urn = urn
+        self.header = header
+        self.max_chunk_bytes = max_chunk_bytes
+
+        media_type: str = header.get("type")
+        if media_type not in self.MEDIA_TYPES:
+            raise ValueError(f"Unsupported upload type: {media_type}")
+
+        try:
+            size: int = int(header.get("size"))
+        except (TypeError, ValueError):
+            raise ValueError("Upload size is missing or invalid")
+
+        if size <= 0 or size > max_upload_bytes:
+            raise ValueError(f"Upload size must be between 1 and {max_upload_bytes} bytes")
+
+        self.media_type = media_type
+        self.size = size
+        self.received: int = 0
+        self.buffer = io.BytesIO()
+
+    def feed(self, chunk: bytes) -> bool:
+        """
+        Append a binary frame to the upload.
+
+        Returns:
+            bool: True once every announced byte has been received.
+        """
+        if len(chunk) > self.max_chunk_bytes:
+            raise ValueError(f"Upload chunk exceeds {self.max_chunk_bytes} bytes")
+
+        if self.received + len(chunk) > self.size:
+            raise ValueError(f"Upload exceeds the announced size of {self.size} bytes")
+
+        self.buffer.write(chunk)
+        self.received += len(chunk)
+
+        return self.received == self.size
+
+    def to_message_event(self) -> dict:
+
+        self.buffer.seek(0)
+        data: dict = dict(self.header)
+        data.update(
+            {
+                "event": "message",
+                f"{self.media_type}_buffer": self.buffer
+            }
+        )
+
+        return data
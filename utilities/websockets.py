@@ -1,8 +1,9 @@
 from fastapi import WebSocket
-from typing_extensions import Dict, List, Union
+from typing_extensions import Any, Dict, List, Union
 
 from abstractions.utility import IUtility
 
+from start_utils import websocket_registry
 
 
 class WebsocketUtility(IUtility):
@@ -11,47 +12,92 @@ class WebsocketUtility(IUtility):
         super().__init__(urn)
         self.urn = urn
 
-    async def send_bytes(self, websocket: WebSocket, event_data: bytes) -> bool:
+    async def is_online(self, session_id: str) -> bool:
+
+        try:
+            return await websocket_registry.is_online(session_id=session_id)
+        except Exception as err:
+            self.logger.error(f"An error occured while looking up websocket session: {err}")
+            return False
+
+    async def __send(self, websocket: WebSocket, session_id: str, payload_type: str, event_data: Any) -> bool:
+
+        if websocket is not None:
+
+            if payload_type == "bytes":
+                await websocket.send_bytes(data=event_data)
+            elif payload_type == "text":
+                await websocket.send_text(data=event_data)
+            else:
+                await websocket.send_json(data=event_data)
+
+            return True
+
+        if session_id is None:
+            raise RuntimeError("Either a websocket or a session id is required")
+
+        return await websocket_registry.send(
+            session_id=session_id,
+            payload_type=payload_type,
+            data=event_data
+        )
+
+    async def send_bytes(self, websocket: WebSocket = None, event_data: bytes = None, session_id: str = None) -> bool:
 
         try:
 
             self.logger.debug("Sending bytes data over websocket")
-            await websocket.send_bytes(data=event_data)
+            sent: bool = await self.__send(
+                websocket=websocket,
+                session_id=session_id,
+                payload_type="bytes",
+                event_data=event_data
+            )
             self.logger.debug('Sent bytes data over websocket')
 
-            return True
+            return sent
 
         except Exception as err:
 
             self.logger.error(f"An error occured while send data over websocket: {err}")
             return False
 
-    async def send_json(self, websocket: WebSocket, event_data: Union[List[str], Dict[str, str]]) -> bool:
+    async def send_json(self, websocket: WebSocket = None, event_data: Union[List[str], Dict[str, str]] = None, session_id: str = None) -> bool:
 
         try:
 
             self.logger.debug("Sending json data over websocket")
-            await websocket.send_json(data=event_data)
+            sent: bool = await self.__send(
+                websocket=websocket,
+                session_id=session_id,
+                payload_type="json",
+                event_data=event_data
+            )
             self.logger.debug('Sent json data over websocket')
 
-            return True
+            return sent
 
         except Exception as err:
 
             self.logger.error(f"An error occured while send data over websocket: {err}")
             return False
         
-    async def send_text(self, websocket: WebSocket, event_data: str) -> bool:
+    async def send_text(self, websocket: WebSocket = None, event_data: str = None, session_id: str = None) -> bool:
 
         try:
 
             self.logger.debug("Sending text data over websocket")
-            await websocket.send_text(data=event_data)
+            sent: bool = await self.__send(
+                websocket=websocket,
+                session_id=session_id,
+                payload_type="text",
+                event_data=event_data
+            )
             self.logger.debug('Sent text data over websocket')
 
-            return True
+            return sent
 
         except Exception as err:
 
             self.logger.error(f"An error occured while send data over websocket: {err}")
-            return False
\ No newline at end of file
+            return False